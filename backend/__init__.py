@@ -1,27 +1,46 @@
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from backend.config import Config
+from backend.database import configure_engine
 from backend.extensions import db, migrate, jwt
 from backend.seed import seed_database
+from backend.static_assets import init_static_assets, send_static_asset
+from backend.uploads import SpooledUploadRequest
+from backend.services.intent_pattern_service import IntentPatternService
 
 
-def _bootstrap_database() -> None:
-    # Keep local setup resilient: create missing tables and seed a default admin once.
-    db.create_all()
-    seed_database(
+def seed_defaults() -> dict:
+    """Seed the default admin and bundled intents; needs an app context."""
+    summary = seed_database(
         admin_email=Config.DEFAULT_ADMIN_EMAIL,
         admin_password=Config.DEFAULT_ADMIN_PASSWORD,
         intents_json_path=Config.INTENTS_PATH,
     )
+    pattern_service = IntentPatternService()
+    summary["indexed"] = pattern_service.rebuild_if_renormalized()
+    if not summary["skipped"]:
+        summary["indexed"] += pattern_service.backfill_missing()
+    return summary
+
+
+def _bootstrap_database() -> None:
+    # Keep local setup resilient: create missing tables and seed a default admin once.
+    db.create_all()
+    seed_defaults()
 
-def create_app():
+def create_app(bootstrap: bool | None = None):
+    """Build the app; bootstrap defaults to Config.DB_BOOTSTRAP_ON_STARTUP."""
     app = Flask(
         __name__,
         static_folder="../frontend",
         static_url_path=""
     )
 
+    app.request_class = SpooledUploadRequest
     app.config.from_object(Config)
+    if Config.TRUSTED_PROXY_COUNT > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXY_COUNT, x_proto=Config.TRUSTED_PROXY_COUNT)
     CORS(app)
     db.init_app(app)
     migrate.init_app(app, db)
@@ -33,16 +52,19 @@ def create_app():
     app.register_blueprint(chat_bp)
     app.register_blueprint(result_bp)
     app.register_blueprint(admin_bp)
+    static_root = init_static_assets(app)
 
     @app.route("/")
     def home():
-        return send_from_directory(app.static_folder, "chat_interface.html")
+        return send_static_asset(static_root, "chat_interface.html")
 
     @app.route("/admin")
     def admin_home():
-        return send_from_directory(app.static_folder, "admin.html")
+        return send_static_asset(static_root, "admin.html")
 
     with app.app_context():
-        _bootstrap_database()
+        configure_engine(db.engine)
+        if Config.DB_BOOTSTRAP_ON_STARTUP if bootstrap is None else bootstrap:
+            _bootstrap_database()
 
     return app
@@ -24,17 +24,157 @@ def _build_database_uri() -> str:
     return raw
 
 
+def _build_engine_options(uri: str) -> dict:
+    """Pool settings per backend; SQLite pragmas are applied on connect (see backend/database.py)."""
+    if uri.startswith("sqlite"):
+        # Let the driver wait on a locked DB instead of failing immediately.
+        return {
+            "connect_args": {
+                "timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)) / 1000,
+                "check_same_thread": False,
+            }
+        }
+
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": True,
+    }
+
+
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "change-this-in-production")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "change-this-jwt-secret-in-production")
+    # Verified admin tokens are remembered (by digest) for this long, so polling
+    # skips the decode/signature work; 0 verifies every request.
+    JWT_VERIFY_CACHE_SECONDS = float(os.getenv("JWT_VERIFY_CACHE_SECONDS", 60))
+    JWT_VERIFY_CACHE_SIZE = int(os.getenv("JWT_VERIFY_CACHE_SIZE", 1024))
     SQLALCHEMY_DATABASE_URI = _build_database_uri()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = _build_engine_options(SQLALCHEMY_DATABASE_URI)
+    # Local default: create tables and seed on boot. Deployments run
+    # `python backend/scripts/migrate.py --seed` once and set this to false.
+    DB_BOOTSTRAP_ON_STARTUP = os.getenv("DB_BOOTSTRAP_ON_STARTUP", "true").lower() == "true"
+    # SQLite connection pragmas (ignored for other databases)
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 20000))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 128 * 1024 * 1024))
     DEFAULT_ADMIN_EMAIL = os.getenv("DEFAULT_ADMIN_EMAIL", "admin@example.com")
     DEFAULT_ADMIN_PASSWORD = os.getenv("DEFAULT_ADMIN_PASSWORD", "Admin@12345")
 
+    # Result history persistence: "sync" commits per upload, "buffered" batches
+    # inserts in a background thread (up to one batch/interval lost on a crash).
+    RESULT_HISTORY_DURABILITY = os.getenv("RESULT_HISTORY_DURABILITY", "sync").lower()
+    RESULT_HISTORY_BATCH_SIZE = int(os.getenv("RESULT_HISTORY_BATCH_SIZE", 50))
+    RESULT_HISTORY_FLUSH_INTERVAL = float(os.getenv("RESULT_HISTORY_FLUSH_INTERVAL", 2.0))
+    RESULT_HISTORY_MAX_QUEUE = int(os.getenv("RESULT_HISTORY_MAX_QUEUE", 10000))
+
     HOST = os.getenv("HOST", "127.0.0.1")
     PORT = int(os.getenv("PORT", 5000))
     USE_ML = os.getenv("USE_ML", "false").lower() == "true"
+    # Tiered chat router: Jaccard answers on its own at/above this score,
+    # below it the ML tier (if enabled) must reach CHAT_ML_THRESHOLD confidence.
+    CHAT_JACCARD_THRESHOLD = float(os.getenv("CHAT_JACCARD_THRESHOLD", 0.25))
+    CHAT_ML_THRESHOLD = float(os.getenv("CHAT_ML_THRESHOLD", 0.6))
+    # Semantic tier (between Jaccard and ML): cosine of hashed character
+    # n-gram TF-IDF vectors of the message and every pattern. Patterns take
+    # SEMANTIC_DIM float32s each; from SEMANTIC_ANN_MIN_ROWS patterns on the
+    # search probes SEMANTIC_ANN_PROBES k-means lists instead of every row.
+    USE_SEMANTIC = os.getenv("USE_SEMANTIC", "false").lower() == "true"
+    CHAT_SEMANTIC_THRESHOLD = float(os.getenv("CHAT_SEMANTIC_THRESHOLD", 0.5))
+    SEMANTIC_DIM = int(os.getenv("SEMANTIC_DIM", 1024))
+    SEMANTIC_ANN_MIN_ROWS = int(os.getenv("SEMANTIC_ANN_MIN_ROWS", 20000))
+    SEMANTIC_ANN_PROBES = int(os.getenv("SEMANTIC_ANN_PROBES", 8))
+    # Text normalization shared by every engine (and ml/train.py): "suffix"
+    # stemming, "wordnet" lemmas (needs the NLTK corpus) or "none"; message
+    # words outside the pattern vocabulary are spelling-corrected against it.
+    CHAT_STEMMER = os.getenv("CHAT_STEMMER", "suffix").lower()
+    CHAT_SPELL_CORRECTION = os.getenv("CHAT_SPELL_CORRECTION", "true").lower() == "true"
+    CHAT_TOKEN_CACHE_SIZE = int(os.getenv("CHAT_TOKEN_CACHE_SIZE", 10000))
+    # DB intent index: "memory" (built per worker) or "shared" (one mmap'd file
+    # per host in INTENT_INDEX_DIR, attached by every worker, spelling
+    # corrector included; admin edits are published by the worker that made
+    # them, other DB changes are picked up within INTENT_INDEX_REFRESH_SECONDS).
+    INTENT_INDEX_BACKEND = os.getenv("INTENT_INDEX_BACKEND", "memory").lower()
+    INTENT_INDEX_DIR = os.getenv("INTENT_INDEX_DIR", os.path.join(BASE_DIR, "intent_index"))
+    INTENT_INDEX_REFRESH_SECONDS = float(os.getenv("INTENT_INDEX_REFRESH_SECONDS", 1.0))
+    # Conversation sessions: "memory" (per worker) or "sqlite" (shared across workers)
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory").lower()
+    SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(BASE_DIR, "sessions.db"))
+    SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", 1800))
+    SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", 10000))
+    SESSION_HISTORY_SIZE = int(os.getenv("SESSION_HISTORY_SIZE", 5))
+    # Ranking bonus for the most recent intent in a session, halved per older turn;
+    # only applied to intents whose own Jaccard score reaches CHAT_JACCARD_THRESHOLD
+    SESSION_FOLLOWUP_BOOST = float(os.getenv("SESSION_FOLLOWUP_BOOST", 0.15))
+    # Chat query log: "sqlite" (CHAT_LOG_DB_PATH), "ndjson" (size-rotated files
+    # in CHAT_LOG_DIR) or "off". Requests only append to an in-memory ring of
+    # CHAT_LOG_BUFFER_SIZE rows (oldest dropped when full); a background thread
+    # writes batches. CHAT_LOG_STORE_TEXT=false keeps only the message hash.
+    CHAT_LOG_BACKEND = os.getenv("CHAT_LOG_BACKEND", "sqlite").lower()
+    CHAT_LOG_DB_PATH = os.getenv("CHAT_LOG_DB_PATH", os.path.join(BASE_DIR, "chat_log.db"))
+    CHAT_LOG_DIR = os.getenv("CHAT_LOG_DIR", os.path.join(BASE_DIR, "chat_logs"))
+    CHAT_LOG_ROTATE_BYTES = int(os.getenv("CHAT_LOG_ROTATE_BYTES", 10 * 1024 * 1024))
+    CHAT_LOG_KEEP_FILES = int(os.getenv("CHAT_LOG_KEEP_FILES", 10))
+    CHAT_LOG_RETENTION_DAYS = float(os.getenv("CHAT_LOG_RETENTION_DAYS", 30))
+    CHAT_LOG_BUFFER_SIZE = int(os.getenv("CHAT_LOG_BUFFER_SIZE", 10000))
+    CHAT_LOG_BATCH_SIZE = int(os.getenv("CHAT_LOG_BATCH_SIZE", 200))
+    CHAT_LOG_FLUSH_INTERVAL = float(os.getenv("CHAT_LOG_FLUSH_INTERVAL", 2.0))
+    CHAT_LOG_STORE_TEXT = os.getenv("CHAT_LOG_STORE_TEXT", "true").lower() == "true"
+    CHAT_LOG_MAX_TEXT = int(os.getenv("CHAT_LOG_MAX_TEXT", 500))
+    # Reply picked from an intent's responses: "random", "session" (stable per
+    # session and intent), "round_robin" or "weighted" (response i weighs
+    # CHAT_RESPONSE_WEIGHT_DECAY**i). A seed makes random/weighted reproducible.
+    CHAT_RESPONSE_STRATEGY = os.getenv("CHAT_RESPONSE_STRATEGY", "random").lower()
+    CHAT_RESPONSE_SEED = os.getenv("CHAT_RESPONSE_SEED") or None
+    CHAT_RESPONSE_WEIGHT_DECAY = float(os.getenv("CHAT_RESPONSE_WEIGHT_DECAY", 0.5))
+    # Words per `message` event on /chat/stream
+    CHAT_STREAM_CHUNK_WORDS = max(1, int(os.getenv("CHAT_STREAM_CHUNK_WORDS", 4)))
+    # Token-bucket rate limits per client (JWT identity, else IP): sustained
+    # requests per minute plus a burst allowance; a per-minute value of 0 disables it.
+    # "memory" buckets are per worker, "sqlite" shares them across workers.
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", os.path.join(BASE_DIR, "ratelimit.db"))
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+    CHAT_RATE_LIMIT_PER_MINUTE = float(os.getenv("CHAT_RATE_LIMIT_PER_MINUTE", 60))
+    CHAT_RATE_LIMIT_BURST = int(os.getenv("CHAT_RATE_LIMIT_BURST", 20))
+    OCR_RATE_LIMIT_PER_MINUTE = float(os.getenv("OCR_RATE_LIMIT_PER_MINUTE", 10))
+    OCR_RATE_LIMIT_BURST = int(os.getenv("OCR_RATE_LIMIT_BURST", 3))
+    # Admin login: attempts per client IP and per email share these buckets;
+    # password hashes are checked by LOGIN_HASH_WORKERS threads per worker with
+    # up to LOGIN_HASH_QUEUE waiting, beyond which logins get 503.
+    LOGIN_RATE_LIMIT_PER_MINUTE = float(os.getenv("LOGIN_RATE_LIMIT_PER_MINUTE", 10))
+    LOGIN_RATE_LIMIT_BURST = int(os.getenv("LOGIN_RATE_LIMIT_BURST", 5))
+    LOGIN_HASH_WORKERS = int(os.getenv("LOGIN_HASH_WORKERS", 2))
+    LOGIN_HASH_QUEUE = int(os.getenv("LOGIN_HASH_QUEUE", 8))
+    LOGIN_HASH_TIMEOUT = float(os.getenv("LOGIN_HASH_TIMEOUT", 5.0))
+    # Uploads: Flask rejects bodies over MAX_CONTENT_LENGTH with 413; files above
+    # UPLOAD_SPOOL_BYTES are buffered in a temp file instead of memory.
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+    UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", 1024 * 1024))
+    # Images above OCR_MAX_PIXELS are rejected from their header; larger than
+    # OCR_TARGET_PIXELS are decoded/reduced to about that size before OCR.
+    OCR_MAX_PIXELS = int(os.getenv("OCR_MAX_PIXELS", 25_000_000))
+    OCR_TARGET_PIXELS = int(os.getenv("OCR_TARGET_PIXELS", 9_000_000))
+    # Marks extraction: "lines" (image_to_string), "table" (image_to_data word
+    # boxes regrouped into rows) or "auto" (both from one image_to_data pass).
+    RESULT_EXTRACTION_MODE = os.getenv("RESULT_EXTRACTION_MODE", "lines").lower()
+    # Concurrent OCR jobs per worker; extra uploads wait up to OCR_QUEUE_TIMEOUT seconds, then get 503.
+    OCR_MAX_CONCURRENCY = max(1, int(os.getenv("OCR_MAX_CONCURRENCY", 2)))
+    OCR_QUEUE_TIMEOUT = float(os.getenv("OCR_QUEUE_TIMEOUT", 2.0))
+    OCR_RETRY_AFTER = int(os.getenv("OCR_RETRY_AFTER", 5))
+    # Reverse proxies in front of the app; their X-Forwarded-For is trusted for the client IP.
+    TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 0))
+    # Static assets: serve the fingerprinted/precompressed build from
+    # backend/scripts/build_assets.py when present; X-Sendfile hands file
+    # bodies to the front web server instead of a Python worker.
+    STATIC_USE_BUILD = os.getenv("STATIC_USE_BUILD", "true").lower() == "true"
+    STATIC_BUILD_DIR = os.getenv("STATIC_BUILD_DIR", os.path.join(PROJECT_ROOT, "frontend", "dist"))
+    STATIC_X_SENDFILE = os.getenv("STATIC_X_SENDFILE", "false").lower() == "true"
     # Path to intents relative to backend package
     BASE_DIR = BASE_DIR
     INTENTS_PATH = os.path.join(BASE_DIR, "nlp", "intents.json")
@@ -0,0 +1,46 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.config import Config
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def sqlite_pragmas(config=Config) -> list[str]:
+    """PRAGMA statements run on every new SQLite connection."""
+    journal_mode = config.SQLITE_JOURNAL_MODE.upper()
+    synchronous = config.SQLITE_SYNCHRONOUS.upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"Unsupported SQLITE_JOURNAL_MODE: {config.SQLITE_JOURNAL_MODE}")
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"Unsupported SQLITE_SYNCHRONOUS: {config.SQLITE_SYNCHRONOUS}")
+
+    return [
+        # WAL lets chat reads proceed while result/admin writes commit.
+        f"PRAGMA journal_mode={journal_mode}",
+        # NORMAL is durable across app crashes in WAL mode; only an OS crash can lose the last commits.
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}",
+        # Negative cache_size is in KiB rather than pages.
+        f"PRAGMA cache_size=-{int(config.SQLITE_CACHE_SIZE_KB)}",
+        f"PRAGMA mmap_size={int(config.SQLITE_MMAP_SIZE)}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def configure_engine(engine: Engine, config=Config) -> None:
+    """Attach per-connection tuning to an engine before it opens any connection."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
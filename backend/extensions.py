@@ -1,7 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
-from flask_jwt_extended import JWTManager
+
+from backend.services.auth_service import CachingJWTManager
 
 db = SQLAlchemy()
 migrate = Migrate()
-jwt = JWTManager()
+jwt = CachingJWTManager()
@@ -0,0 +1,17 @@
+CREATE TABLE IF NOT EXISTS intent_patterns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    intent_id INTEGER NOT NULL REFERENCES intents (id) ON DELETE CASCADE,
+    pattern TEXT NOT NULL,
+    normalized VARCHAR(500) NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_intent_patterns_intent_id ON intent_patterns (intent_id);
+CREATE INDEX IF NOT EXISTS ix_intent_patterns_normalized ON intent_patterns (normalized);
+
+CREATE TABLE IF NOT EXISTS intent_tokens (
+    token VARCHAR(100) NOT NULL,
+    intent_id INTEGER NOT NULL REFERENCES intents (id) ON DELETE CASCADE,
+    PRIMARY KEY (token, intent_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_intent_tokens_intent_id ON intent_tokens (intent_id);
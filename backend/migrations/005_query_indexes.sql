@@ -0,0 +1,6 @@
+-- Keeps the chat index signature query (max(updated_at)) off a table scan.
+CREATE INDEX IF NOT EXISTS ix_intents_updated_at ON intents (updated_at);
+
+-- Covering index for duplicate-pattern grouping (normalized, distinct intent_id).
+CREATE INDEX IF NOT EXISTS ix_intent_patterns_normalized_intent_id
+ON intent_patterns (normalized, intent_id);
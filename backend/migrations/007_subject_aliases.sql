@@ -0,0 +1,25 @@
+CREATE TABLE IF NOT EXISTS subject_aliases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    alias VARCHAR(100) NOT NULL UNIQUE,
+    subject VARCHAR(100) NOT NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO subject_aliases (alias, subject) VALUES
+    ('MATH', 'Maths'),
+    ('MATHS', 'Maths'),
+    ('MATHEMATICS', 'Maths'),
+    ('PHYSICS', 'Physics'),
+    ('CHEMISTRY', 'Chemistry'),
+    ('BIOLOGY', 'Biology'),
+    ('ENGLISH', 'English'),
+    ('COMPUTER', 'Computer'),
+    ('COMPUTER SCIENCE', 'Computer'),
+    ('INFORMATICS', 'Computer'),
+    ('ACCOUNTANCY', 'Accountancy'),
+    ('ECONOMICS', 'Economics'),
+    ('BUSINESS STUDIES', 'Business Studies'),
+    ('HISTORY', 'History'),
+    ('GEOGRAPHY', 'Geography'),
+    ('POLITICAL SCIENCE', 'Political Science');
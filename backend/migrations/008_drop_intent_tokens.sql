@@ -0,0 +1,3 @@
+-- The chat tiers match on in-memory term postings built with the shared text
+-- normalizer; the raw-token intent_tokens table had no reader left.
+DROP TABLE IF EXISTS intent_tokens;
@@ -0,0 +1,12 @@
+-- Re-create the intent term index dropped by 008. Rows now hold the shared
+-- text normalizer's terms; the app rebuilds them (and intent_patterns) at
+-- startup when the intent_terms_normalizer marker does not match.
+CREATE TABLE IF NOT EXISTS intent_tokens (
+    token VARCHAR(100) NOT NULL,
+    intent_id INTEGER NOT NULL REFERENCES intents (id) ON DELETE CASCADE,
+    PRIMARY KEY (token, intent_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_intent_tokens_intent_id ON intent_tokens (intent_id);
+
+DELETE FROM app_settings WHERE key = 'intent_terms_normalizer';
@@ -32,7 +32,7 @@ class Intent(db.Model):
     responses = db.Column(db.JSON, nullable=False, default=list)
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(
-        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
     )
 
     def to_dict(self) -> dict:
@@ -46,6 +46,60 @@ class Intent(db.Model):
         }
 
 
+class IntentPattern(db.Model):
+    """One row per intent pattern, derived from Intent.patterns for SQL-side lookups."""
+
+    __tablename__ = "intent_patterns"
+    __table_args__ = (db.Index("ix_intent_patterns_normalized_intent_id", "normalized", "intent_id"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    intent_id = db.Column(
+        db.Integer, db.ForeignKey("intents.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    pattern = db.Column(db.Text, nullable=False)
+    normalized = db.Column(db.String(500), nullable=False, index=True)
+
+
+class IntentToken(db.Model):
+    """Inverted index: distinct normalized pattern terms per intent."""
+
+    __tablename__ = "intent_tokens"
+
+    token = db.Column(db.String(100), primary_key=True)
+    intent_id = db.Column(
+        db.Integer, db.ForeignKey("intents.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+
+class AppSetting(db.Model):
+    """Small key/value store for app-managed markers (e.g. the seeded intents hash)."""
+
+    __tablename__ = "app_settings"
+
+    key = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class SubjectAlias(db.Model):
+    """OCR subject label (normalized upper case) mapped to a canonical subject name."""
+
+    __tablename__ = "subject_aliases"
+
+    id = db.Column(db.Integer, primary_key=True)
+    alias = db.Column(db.String(100), unique=True, nullable=False)
+    subject = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    def to_dict(self) -> dict:
+        return {"alias": self.alias, "subject": self.subject}
+
+
 class ResultAnalysisPreference(db.Model):
     __tablename__ = "result_analysis_preferences"
 
@@ -0,0 +1,126 @@
+# backend/nlp/intent_index.py
+import sys
+from array import array
+
+from backend.nlp.text_normalizer import TextNormalizer
+
+
+class IntentRecord:
+    """One intent as the chat path needs it: no timestamps, tuples instead of lists."""
+
+    __slots__ = ("id", "tag", "patterns", "responses")
+
+    def __init__(self, tag: str, patterns=(), responses=(), id: int | None = None):
+        self.id = id
+        self.tag = sys.intern(tag)
+        self.patterns = tuple(patterns or ())
+        self.responses = tuple(responses or ())
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IntentRecord":
+        return cls(data.get("tag") or "", data.get("patterns"), data.get("responses"), data.get("id"))
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "tag": self.tag, "patterns": list(self.patterns), "responses": list(self.responses)}
+
+    def __repr__(self) -> str:
+        return f"IntentRecord({self.tag!r}, {len(self.patterns)} patterns, {len(self.responses)} responses)"
+
+
+def pick_overlap(scores, boosts: dict[str, float] | None = None, boost_floor: float = 0.0) -> tuple[str | None, float]:
+    """Best (tag, Jaccard score) from `scores`, (tag, score) pairs in intent order.
+
+    A follow-up boost only reorders intents whose own score already reaches
+    `boost_floor`, so it settles near-ties between confident matches but
+    never lifts a one-word overlap over the real topic of a new question.
+    The returned score is always the unboosted Jaccard score. Ties go to
+    the earliest intent.
+    """
+    boosts = boosts or {}
+    best_tag, best_score, best_rank = None, 0.0, 0.0
+    for tag, score in scores:
+        rank = score + boosts.get(tag, 0.0) if score >= boost_floor else score
+        if rank > best_rank:
+            best_tag, best_score, best_rank = tag, score, rank
+    return best_tag, best_score
+
+
+class TokenIndex:
+    """Exact-pattern and token-overlap (Jaccard) matching over interned token ids.
+
+    Patterns and messages go through the same TextNormalizer, and message
+    words missing from the pattern vocabulary are spelling-corrected against
+    it. Each distinct term is stored once and referred to by an int id; every
+    intent keeps a sorted `array('I')` of its term ids and every term an
+    array of the intents using it, so scoring walks the postings of the
+    message's terms only instead of comparing string sets per intent.
+    Position i in `tags` is intent i, in the order the records were given;
+    ties go to the earliest intent. The first intent with a tag wins.
+    """
+
+    def __init__(self, records, normalizer: TextNormalizer | None = None):
+        self.normalizer = normalizer or TextNormalizer()
+        self.token_ids: dict[str, int] = {}
+        self.tags: list[str] = []
+        self.intent_tokens: list[array] = []
+        self.postings: list[array] = []
+        self.exact: dict[str, int] = {}
+        seen = set()
+        for record in records:
+            if not record.tag or record.tag in seen:
+                continue
+            seen.add(record.tag)
+            intent_id = len(self.tags)
+            token_ids = set()
+            for pattern in record.patterns:
+                tokens = self.normalizer.terms(pattern)
+                for token in tokens:
+                    token_id = self.token_ids.get(token)
+                    if token_id is None:
+                        token_id = self.token_ids[sys.intern(token)] = len(self.postings)
+                        self.postings.append(array("I"))
+                    token_ids.add(token_id)
+                if tokens:
+                    self.exact.setdefault(" ".join(tokens), intent_id)
+            for token_id in token_ids:
+                self.postings[token_id].append(intent_id)
+            self.tags.append(record.tag)
+            self.intent_tokens.append(array("I", sorted(token_ids)))
+        self.corrector = self.normalizer.corrector(
+            self.token_ids, {token: len(self.postings[i]) for token, i in self.token_ids.items()}
+        )
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def vocabulary(self) -> list[str]:
+        return sorted(self.token_ids)
+
+    def terms(self, message: str) -> list[str]:
+        """The message as index terms (normalized, then spelling-corrected)."""
+        terms = self.normalizer.terms(message)
+        if self.corrector is None:
+            return terms
+        return [self.corrector.correct(term) for term in terms]
+
+    def match_exact(self, message: str) -> str | None:
+        intent_id = self.exact.get(" ".join(self.terms(message)))
+        return None if intent_id is None else self.tags[intent_id]
+
+    def match_overlap(
+        self, message: str, boosts: dict[str, float] | None = None, boost_floor: float = 0.0
+    ) -> tuple[str | None, float]:
+        """Best Jaccard match; `boosts` apply as in pick_overlap."""
+        user_tokens = set(self.terms(message))
+        overlaps: dict[int, int] = {}
+        for token in user_tokens:
+            token_id = self.token_ids.get(token)
+            if token_id is not None:
+                for intent_id in self.postings[token_id]:
+                    overlaps[intent_id] = overlaps.get(intent_id, 0) + 1
+
+        scores = (
+            (self.tags[i], overlaps[i] / (len(user_tokens) + len(self.intent_tokens[i]) - overlaps[i]))
+            for i in sorted(overlaps)
+        )
+        return pick_overlap(scores, boosts, boost_floor)
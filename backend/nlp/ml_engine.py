@@ -1,7 +1,6 @@
 # backend/nlp/ml_engine.py
 import os
 import json
-import random
 import torch
 import numpy as np
 
@@ -28,7 +27,7 @@ class ChatbotModel(nn.Module):
         return x
 
 class ChatbotML:
-    def __init__(self, model_path, dims_path, intents_path):
+    def __init__(self, model_path, dims_path, intents_path, selector=None, normalizer=None):
         # validate files
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file not found at {model_path}")
@@ -44,13 +43,16 @@ class ChatbotML:
 
         # load intents + responses and vocabulary via the rule assistant parsing approach
         # We'll reuse the rule-based parser to build vocabulary/documents for consistency
-        self.rule_assistant = RuleAssistant(intents_path)
-        # train/prepare details were in your training script; we expect rule_assistant to have intent_word_sets,
-        # but ML requires exact vocabulary; for simplicity we create a 'vocabulary' from rule_assistant sets
-        vocab = set()
-        for s in self.rule_assistant.intent_word_sets.values():
-            vocab.update(s)
-        self.vocabulary = sorted(vocab)
+        self.rule_assistant = RuleAssistant(intents_path, selector, normalizer)
+        # ML requires the exact training vocabulary: ml/train.py builds it with the same
+        # TextNormalizer terms the rule assistant indexes patterns with
+        self.vocabulary = self.rule_assistant.token_index.vocabulary()
+        self._vocabulary_ids = {word: i for i, word in enumerate(self.vocabulary)}
+        if len(self.vocabulary) != self.input_size:
+            raise ValueError(
+                f"Model expects {self.input_size} input features but intents yield "
+                f"{len(self.vocabulary)}; retrain with ml/train.py"
+            )
 
         # initialize and load model
         self.model = ChatbotModel(self.input_size, self.output_size)
@@ -58,35 +60,41 @@ class ChatbotML:
         self.model.eval()
 
         # keep a map of intents (order matters)
-        self.intents = [intent.get("tag") for intent in self.rule_assistant.intents]
-        self.intents_responses = {intent.get("tag"): intent.get("responses") for intent in self.rule_assistant.intents}
-
-    def _clean_and_tokenize(self, text):
-        import re
-        text = (text or "").lower()
-        text = re.sub(r"[^\w\s]", " ", text)
-        tokens = [t for t in text.split() if t.strip()]
-        return tokens
+        self.intents = [intent.tag for intent in self.rule_assistant.intents]
+        self.response_table = self.rule_assistant.response_table
+        self.selector = self.rule_assistant.selector
 
     def _bag_of_words(self, words):
-        return [1 if w in words else 0 for w in self.vocabulary]
+        bag = [0] * len(self.vocabulary)
+        for w in words:
+            i = self._vocabulary_ids.get(w)
+            if i is not None:
+                bag[i] = 1
+        return bag
+
+    def predict(self, user_message):
+        """Return (tag, confidence) for the top class; tag is None if the index is unmapped."""
+        # Same stemming and spelling correction as the other tiers
+        words = self.rule_assistant.token_index.terms(user_message)
+        bag = self._bag_of_words(words)
+        with torch.no_grad():
+            inputs = torch.tensor([bag], dtype=torch.float32)
+            probs = torch.softmax(self.model(inputs), dim=1)
+            confidence, predicted = torch.max(probs, dim=1)
+            predicted_index = predicted.item()
+        if predicted_index < 0 or predicted_index >= len(self.intents):
+            return None, 0.0
+        return self.intents[predicted_index], float(confidence.item())
 
     def get_response(self, user_message):
         user_message = (user_message or "").strip()
         if not user_message:
             return "Please type a message."
-        words = self._clean_and_tokenize(user_message)
-        bag = self._bag_of_words(words)
-        import torch
-        with torch.no_grad():
-            inputs = torch.tensor([bag], dtype=torch.float32)
-            outputs = self.model(inputs)
-            predicted_index = torch.argmax(outputs, dim=1).item()
-            if predicted_index < 0 or predicted_index >= len(self.intents):
-                # fallback to rule-based
-                return random.choice(self.intents_responses.get("fallback", ["I'm not sure."]))
-            tag = self.intents[predicted_index]
-            responses = self.intents_responses.get(tag, [])
-            if responses:
-                return random.choice(responses)
-            return "I'm sorry, I don't have an answer for that yet."
+        tag, _ = self.predict(user_message)
+        if tag is None:
+            # fallback to rule-based
+            return self.selector.choose(self.response_table, "fallback") or "I'm not sure."
+        response = self.selector.choose(self.response_table, tag)
+        if response:
+            return response
+        return "I'm sorry, I don't have an answer for that yet."
@@ -0,0 +1,130 @@
+# backend/nlp/response_selector.py
+import bisect
+import hashlib
+import random
+import threading
+
+STRATEGIES = ("random", "session", "round_robin", "weighted")
+
+
+class ResponseTable:
+    """Responses of a set of intents as tag -> id -> tuple of strings.
+
+    Built once per intent set (bundled file or DB index rebuild). Intents
+    without responses are left out, so `id_for(tag) is not None` also means
+    "this tag can answer".
+    """
+
+    __slots__ = ("ids", "tags", "responses")
+
+    def __init__(self, intents):
+        """`intents` are IntentRecords (anything with `tag` and `responses`)."""
+        self.ids: dict[str, int] = {}
+        self.tags: list[str] = []
+        self.responses: list[tuple[str, ...]] = []
+        for intent in intents:
+            tag = intent.tag
+            responses = tuple(r for r in intent.responses or () if r)
+            if not tag or not responses or tag in self.ids:
+                continue
+            self.ids[tag] = len(self.tags)
+            self.tags.append(tag)
+            self.responses.append(responses)
+
+    def id_for(self, tag):
+        return self.ids.get(tag) if tag else None
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+
+class RandomSelector:
+    """Uniform choice; pass a seed for a reproducible sequence."""
+
+    def __init__(self, seed=None):
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def index(self, table: ResponseTable, tag_id: int, session_id=None) -> int:
+        with self._lock:
+            return self._random.randrange(len(table.responses[tag_id]))
+
+    def choose(self, table: ResponseTable, tag, session_id=None):
+        tag_id = table.id_for(tag)
+        if tag_id is None:
+            return None
+        return table.responses[tag_id][self.index(table, tag_id, session_id)]
+
+
+class SessionSelector(RandomSelector):
+    """Same session + same intent -> same response; random without a session."""
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.salt = str(seed if seed is not None else "")
+
+    def index(self, table, tag_id, session_id=None):
+        if not session_id:
+            return super().index(table, tag_id)
+        key = f"{self.salt}:{session_id}:{table.tags[tag_id]}".encode("utf-8")
+        digest = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+        return digest % len(table.responses[tag_id])
+
+
+class RoundRobinSelector(RandomSelector):
+    """Cycles through each intent's responses in order (per process)."""
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self._next: dict[str, int] = {}
+
+    def index(self, table, tag_id, session_id=None):
+        tag = table.tags[tag_id]
+        with self._lock:
+            position = self._next.get(tag, 0)
+            self._next[tag] = position + 1
+        return position % len(table.responses[tag_id])
+
+
+class WeightedSelector(RandomSelector):
+    """Earlier responses are preferred: response i has weight decay**i.
+
+    Cumulative weights depend only on the response count, so they are
+    computed once per count rather than per intent or per request.
+    """
+
+    def __init__(self, seed=None, decay: float = 0.5):
+        super().__init__(seed)
+        self.decay = min(1.0, max(0.0, decay))
+        self._cumulative: dict[int, list[float]] = {}
+
+    def _weights(self, count: int) -> list[float]:
+        cumulative = self._cumulative.get(count)
+        if cumulative is None:
+            total = 0.0
+            cumulative = []
+            for i in range(count):
+                total += self.decay ** i
+                cumulative.append(total)
+            self._cumulative[count] = cumulative
+        return cumulative
+
+    def index(self, table, tag_id, session_id=None):
+        cumulative = self._weights(len(table.responses[tag_id]))
+        with self._lock:
+            point = self._random.random() * cumulative[-1]
+        return min(bisect.bisect_right(cumulative, point), len(cumulative) - 1)
+
+
+def create_selector(strategy: str = "random", seed=None, decay: float = 0.5) -> RandomSelector:
+    """Selector for a CHAT_RESPONSE_STRATEGY value; unknown values fall back to random."""
+    strategy = (strategy or "random").lower()
+    if strategy == "session":
+        return SessionSelector(seed)
+    if strategy == "round_robin":
+        return RoundRobinSelector(seed)
+    if strategy == "weighted":
+        return WeightedSelector(seed, decay)
+    if strategy != "random":
+        print(f"Unknown response strategy '{strategy}', using random.")
+    return RandomSelector(seed)
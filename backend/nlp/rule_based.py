@@ -1,26 +1,31 @@
 # backend/nlp/rule_based.py
 import json
-import random
 import re
 import os
 
+from backend.nlp.intent_index import IntentRecord, TokenIndex
+from backend.nlp.response_selector import RandomSelector, ResponseTable
+from backend.nlp.text_normalizer import TextNormalizer, tokenize
+
 class ChatbotAssistant:
-    def __init__(self, intents_path=None):
+    def __init__(self, intents_path=None, selector=None, normalizer=None):
         if intents_path is None:
             base = os.path.dirname(__file__)
             intents_path = os.path.join(base, "intents.json")
         with open(intents_path, "r", encoding="utf-8") as f:
             data = json.load(f)
-        self.intents = data.get("intents", [])
-
-        # Build a union set of words for each intent (cleaned)
-        self.intent_word_sets = {}
+        self.intents = tuple(IntentRecord.from_dict(intent) for intent in data.get("intents", []))
+        self._intents_by_tag = {}
         for intent in self.intents:
-            words = set()
-            for patt in intent.get("patterns", []):
-                toks = self._clean_and_tokenize(patt)
-                words.update(toks)
-            self.intent_word_sets[intent["tag"]] = words
+            self._intents_by_tag.setdefault(intent.tag, intent)
+        # Responses by tag id, picked by a pluggable strategy (random by default)
+        self.response_table = ResponseTable(self.intents)
+        self.selector = selector or RandomSelector()
+
+        # Interned pattern terms per intent and normalized pattern text -> tag;
+        # messages are stemmed and spelling-corrected the same way
+        self.normalizer = normalizer or TextNormalizer()
+        self.token_index = TokenIndex(self.intents, self.normalizer)
 
         # Precompile regex-based routing rules (priority order)
         self.rules = [
@@ -35,54 +40,47 @@ class ChatbotAssistant:
 
     def _clean_and_tokenize(self, text):
         # Lower, remove punctuation, split
-        text = (text or "").lower()
-        text = re.sub(r"[^\w\s]", " ", text)   # remove punctuation
-        tokens = [t for t in text.split() if t.strip()]
-        return tokens
+        return tokenize(text)
+
+    def match_exact(self, user_message):
+        return self.token_index.match_exact(user_message)
+
+    def match_keyword(self, user_message):
+        cleaned = (user_message or "").lower()
+        for tag, pattern in self.rules:
+            if pattern.search(cleaned) and self._find_intent_by_tag(tag):
+                return tag
+        return None
+
+    def match_overlap(self, user_message, boosts=None, boost_floor=0.0):
+        # Jaccard over pattern tokens, plus a follow-up bonus for intents
+        # recently hit in this conversation
+        return self.token_index.match_overlap(user_message, boosts, boost_floor)
 
     def get_response(self, user_message):
         user_message = (user_message or "").strip()
         if not user_message:
             return "Please type a message."
 
-        cleaned = user_message.lower()
-
         # 1) Rule-based routing (explicit keywords) - priority
-        for tag, pattern in self.rules:
-            if pattern.search(cleaned):
-                intent = self._find_intent_by_tag(tag)
-                if intent:
-                    return random.choice(intent.get("responses", []))
+        tag = self.match_keyword(user_message)
+        if tag:
+            return self.selector.choose(self.response_table, tag)
 
         # 2) Word-overlap scoring fallback
-        user_tokens = set(self._clean_and_tokenize(user_message))
-        best_tag = None
-        best_score = 0
-        for tag, wordset in self.intent_word_sets.items():
-            if not wordset:
-                continue
-            overlap = len(user_tokens & wordset)
-            # normalize by union size to avoid bias to very large intents
-            union_size = len(user_tokens | wordset) if (len(user_tokens | wordset) > 0) else 1
-            score = overlap / union_size
-            if score > best_score:
-                best_score = score
-                best_tag = tag
+        best_tag, best_score = self.match_overlap(user_message)
 
         # require at least one overlapping token to accept intent
         if best_tag and best_score > 0.0:
-            intent = self._find_intent_by_tag(best_tag)
-            if intent:
-                return random.choice(intent.get("responses", []))
+            response = self.selector.choose(self.response_table, best_tag)
+            if response:
+                return response
 
         # final fallback
-        fallback_intent = self._find_intent_by_tag("fallback")
-        if fallback_intent:
-            return random.choice(fallback_intent.get("responses", []))
+        response = self.selector.choose(self.response_table, "fallback")
+        if response:
+            return response
         return "I'm sorry, I didn't catch that. Could you rephrase?"
 
     def _find_intent_by_tag(self, tag):
-        for intent in self.intents:
-            if intent.get("tag") == tag:
-                return intent
-        return None
+        return self._intents_by_tag.get(tag)
@@ -0,0 +1,286 @@
+# backend/nlp/semantic_engine.py
+import json
+import math
+import threading
+import zlib
+
+import numpy as np
+
+from backend.nlp.intent_index import IntentRecord
+from backend.nlp.text_normalizer import TextNormalizer
+
+
+class HashedNgramVectorizer:
+    """Character n-gram TF-IDF vectors hashed into `dim` buckets (no vocabulary to store).
+
+    Each normalized word contributes its padded 3- and 4-grams plus the word
+    itself, so inflections, typos and word-order changes still share most
+    features. Buckets come from crc32 (stable across processes) with a sign
+    bit to cancel collisions out on average; tf is sublinear (1 + log tf).
+    """
+
+    NGRAMS = (3, 4)
+
+    def __init__(self, dim: int = 1024, normalizer: TextNormalizer | None = None):
+        self.dim = dim
+        self.normalizer = normalizer or TextNormalizer(spelling=False)
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    def features(self, text: str) -> dict[int, float]:
+        counts: dict[int, float] = {}
+        for term in self.normalizer.terms(text):
+            padded = f" {term} "
+            grams = [f"w:{term}"]
+            for n in self.NGRAMS:
+                grams.extend(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+            for gram in grams:
+                h = zlib.crc32(gram.encode("utf-8"))
+                bucket = h % self.dim
+                counts[bucket] = counts.get(bucket, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+        return counts
+
+    def fit_idf(self, feature_rows: list[dict[int, float]]) -> None:
+        df = np.zeros(self.dim, dtype=np.float32)
+        for row in feature_rows:
+            df[list(row)] += 1
+        self.idf = (np.log((1 + len(feature_rows)) / (1 + df)) + 1).astype(np.float32)
+
+    def vector(self, features: dict[int, float]) -> tuple[np.ndarray, np.ndarray]:
+        """The L2-normalized TF-IDF vector as (buckets, weights); zero buckets are dropped."""
+        buckets = np.fromiter(features.keys(), dtype=np.intp, count=len(features))
+        counts = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+        keep = counts != 0
+        buckets, counts = buckets[keep], counts[keep]
+        weights = np.sign(counts) * (1 + np.log(np.abs(counts))) * self.idf[buckets]
+        norm = float(np.linalg.norm(weights))
+        if norm:
+            weights /= norm
+        return buckets, weights
+
+
+class _IVFIndex:
+    """Approximate search: pattern columns grouped under k-means centroids.
+
+    The owner reorders the matrix by `order` after building, so each list is
+    one contiguous column range (`ranges`) and probing a list is a slice, not
+    a scattered gather. Columns added later are kept per list in `extra`.
+    """
+
+    def __init__(self, matrix: np.ndarray, size: int, n_lists: int, seed: int = 0, iterations: int = 8):
+        rng = np.random.default_rng(seed)
+        sample = matrix[:, rng.choice(size, size=min(size, n_lists * 32), replace=False)].T
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        # Bucket-major like the pattern matrix, so a sparse query reads only its buckets.
+        self.centroids = np.ascontiguousarray(centroids.T)
+        assign = np.concatenate([
+            np.argmax(matrix[:, start:min(size, start + 8192)].T @ self.centroids, axis=1)
+            for start in range(0, size, 8192)
+        ])
+        self.order = np.argsort(assign, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))]).tolist()
+        self.ranges = list(zip(bounds[:-1], bounds[1:]))
+        self.extra: list[set[int]] = [set() for _ in range(n_lists)]
+        self.extra_of: dict[int, int] = {}
+
+    def nearest(self, buckets: np.ndarray, weights: np.ndarray, count: int) -> list[int]:
+        scores = weights @ self.centroids[buckets]
+        count = min(count, len(scores))
+        return np.argpartition(-scores, count - 1)[:count].tolist()
+
+    def add(self, row: int, buckets: np.ndarray, weights: np.ndarray) -> None:
+        c = self.nearest(buckets, weights, 1)[0]
+        self.extra[c].add(row)
+        self.extra_of[row] = c
+
+    def remove(self, row: int) -> None:
+        c = self.extra_of.pop(row, None)
+        if c is not None:
+            self.extra[c].discard(row)
+
+    def probe(self, buckets: np.ndarray, weights: np.ndarray, probes: int) -> tuple[list[tuple[int, int]], np.ndarray]:
+        """Column ranges and extra columns of the `probes` lists nearest to the query."""
+        lists = self.nearest(buckets, weights, probes)
+        extra = [row for c in lists for row in self.extra[c]]
+        return [self.ranges[c] for c in lists], np.fromiter(extra, dtype=np.intp, count=len(extra))
+
+
+class ChatbotSemantic:
+    """Paraphrase-tolerant intent retrieval over embedded patterns.
+
+    Pattern vectors are the columns of one contiguous float32 matrix stored
+    bucket-major (`dim` x patterns): a message only has a few dozen non-zero
+    buckets, so its cosine with every pattern is a product of those rows
+    with its weights, and a partial sort gives the top k. The score of an
+    intent is the cosine of its best pattern.
+
+    `sync(records)` only re-embeds intents whose patterns changed, reusing
+    freed columns; IDF weights are refitted by a full rebuild once more than
+    REFIT_FRACTION of the patterns changed since the last one. From
+    `ann_min_rows` patterns on, queries only score the patterns under the
+    `ann_probes` nearest of sqrt(patterns) k-means centroids (IVF).
+    """
+
+    REFIT_FRACTION = 0.2
+
+    def __init__(self, records=(), dim: int = 1024, normalizer: TextNormalizer | None = None,
+                 ann_min_rows: int = 20000, ann_probes: int = 8):
+        self.vectorizer = HashedNgramVectorizer(dim, normalizer)
+        self.ann_min_rows = ann_min_rows
+        self.ann_probes = ann_probes
+        self.matrix = np.zeros((dim, 0), dtype=np.float32)
+        self.row_intent = np.zeros(0, dtype=np.int32)  # -1 for free columns
+        self.size = 0
+        self.free: list[int] = []
+        self.tags: list[str] = []
+        self.intent_ids: dict[str, int] = {}
+        self.patterns: dict[str, tuple[str, ...]] = {}
+        self.rows: dict[str, list[int]] = {}
+        self.changed_rows = 0
+        self.ann: _IVFIndex | None = None
+        self._lock = threading.Lock()
+        self.sync(records)
+
+    @classmethod
+    def from_file(cls, intents_path: str, **kwargs) -> "ChatbotSemantic":
+        with open(intents_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls([IntentRecord.from_dict(intent) for intent in data.get("intents", [])], **kwargs)
+
+    def __len__(self) -> int:
+        return self.size - len(self.free)
+
+    def sync(self, records) -> dict:
+        """Bring the index in line with `records`; returns {"added", "removed", "rebuilt"}."""
+        wanted = {}
+        for record in records:
+            if record.tag and record.tag not in wanted:
+                wanted[record.tag] = tuple(p for p in record.patterns if p and p.strip())
+        with self._lock:
+            stale = [tag for tag in self.patterns if wanted.get(tag) != self.patterns[tag]]
+            new = [tag for tag, patterns in wanted.items() if self.patterns.get(tag) != patterns]
+            if not stale and not new and self.size:
+                return {"added": 0, "removed": 0, "rebuilt": False}
+            changed = sum(len(self.patterns[tag]) for tag in stale) + sum(len(wanted[tag]) for tag in new)
+            total = sum(len(patterns) for patterns in wanted.values())
+            if self.size == 0 or self.changed_rows + changed > self.REFIT_FRACTION * max(total, 1):
+                self._rebuild(wanted)
+                return {"added": len(wanted), "removed": 0, "rebuilt": True}
+            for tag in stale:
+                self._remove(tag)
+            for tag in new:
+                self._add(tag, wanted[tag])
+            self.changed_rows += changed
+            return {"added": len(new), "removed": len(stale), "rebuilt": False}
+
+    def _rebuild(self, wanted: dict[str, tuple[str, ...]]) -> None:
+        features, owners = [], []
+        self.tags, self.intent_ids, self.rows = [], {}, {}
+        for tag, patterns in wanted.items():
+            self.intent_ids[tag] = len(self.tags)
+            self.tags.append(tag)
+            self.rows[tag] = list(range(len(features), len(features) + len(patterns)))
+            for pattern in patterns:
+                features.append(self.vectorizer.features(pattern))
+                owners.append(self.intent_ids[tag])
+        self.vectorizer.fit_idf(features)
+        # Headroom so a few added patterns don't copy the whole matrix.
+        capacity = len(features) + len(features) // 8 + 16
+        self.matrix = np.zeros((self.vectorizer.dim, capacity), dtype=np.float32)
+        for row, feature in enumerate(features):
+            buckets, weights = self.vectorizer.vector(feature)
+            self.matrix[buckets, row] = weights
+        self.row_intent = np.full(self.matrix.shape[1], -1, dtype=np.int32)
+        self.row_intent[:len(owners)] = owners
+        self.size = len(features)
+        self.free = []
+        self.patterns = dict(wanted)
+        self.changed_rows = 0
+        self.ann = None
+        if self.size >= self.ann_min_rows:
+            self.ann = _IVFIndex(self.matrix, self.size, max(1, int(math.sqrt(self.size))))
+            order = self.ann.order
+            self.matrix[:, :self.size] = self.matrix[:, order]
+            self.row_intent[:self.size] = self.row_intent[order]
+            position = np.empty(self.size, dtype=np.intp)
+            position[order] = np.arange(self.size)
+            self.rows = {tag: position[rows].tolist() for tag, rows in self.rows.items()}
+
+    def _remove(self, tag: str) -> None:
+        for row in self.rows.pop(tag, []):
+            self.matrix[:, row] = 0
+            self.row_intent[row] = -1
+            self.free.append(row)
+            if self.ann is not None:
+                self.ann.remove(row)
+        self.patterns.pop(tag, None)
+
+    def _add(self, tag: str, patterns: tuple[str, ...]) -> None:
+        if tag not in self.intent_ids:
+            self.intent_ids[tag] = len(self.tags)
+            self.tags.append(tag)
+        rows = []
+        for pattern in patterns:
+            if self.free:
+                row = self.free.pop()
+            else:
+                if self.size == self.matrix.shape[1]:
+                    extra = self.size // 4 + 16
+                    grown = np.zeros((self.vectorizer.dim, self.size + extra), dtype=np.float32)
+                    grown[:, :self.size] = self.matrix
+                    self.matrix = grown
+                    self.row_intent = np.concatenate([self.row_intent, np.full(extra, -1, dtype=np.int32)])
+                row = self.size
+                self.size += 1
+            buckets, weights = self.vectorizer.vector(self.vectorizer.features(pattern))
+            self.matrix[buckets, row] = weights
+            self.row_intent[row] = self.intent_ids[tag]
+            if self.ann is not None:
+                self.ann.add(row, buckets, weights)
+            rows.append(row)
+        self.rows[tag] = rows
+        self.patterns[tag] = patterns
+
+    def top_k(self, message: str, k: int = 3) -> list[tuple[str, float]]:
+        """Best `k` intents as (tag, cosine of the closest pattern), highest first."""
+        buckets, weights = self.vectorizer.vector(self.vectorizer.features(message))
+        if not len(buckets):
+            return []
+        with self._lock:
+            if self.ann is not None:
+                ranges, extra = self.ann.probe(buckets, weights, self.ann_probes)
+                rows = np.concatenate([np.arange(start, stop) for start, stop in ranges] + [extra])
+                scores = np.concatenate(
+                    [weights @ self.matrix[buckets, start:stop] for start, stop in ranges]
+                    + [weights @ self.matrix[np.ix_(buckets, extra)]]
+                )
+            else:
+                rows = None
+                scores = weights @ self.matrix[buckets, :self.size]
+            # Enough patterns to cover k intents when several patterns of one intent lead.
+            take = min(len(scores), k * 8)
+            if take == 0:
+                return []
+            best = np.argpartition(-scores, take - 1)[:take]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            owners = self.row_intent[best if rows is None else rows[best]]
+            results, seen = [], set()
+            for owner, score in zip(owners.tolist(), scores[best].tolist()):
+                if owner < 0 or owner in seen or score <= 0:
+                    continue
+                seen.add(owner)
+                results.append((self.tags[owner], score))
+                if len(results) == k:
+                    break
+        return results
+
+    def predict(self, message: str) -> tuple[str | None, float]:
+        """(tag, cosine) of the best intent, like ChatbotML.predict."""
+        results = self.top_k(message, 1)
+        return results[0] if results else (None, 0.0)
@@ -0,0 +1,163 @@
+# backend/nlp/text_normalizer.py
+import re
+from functools import lru_cache
+
+_NON_WORD = re.compile(r"[^\w\s]")
+STEMMERS = ("none", "suffix", "wordnet")
+
+
+def tokenize(text) -> list[str]:
+    """Lowercase, replace punctuation with spaces, split on whitespace."""
+    return _NON_WORD.sub(" ", (text or "").lower()).split()
+
+
+def suffix_stem(token: str) -> str:
+    """Light English suffix stripping: plurals, -ing, -ed, -ly.
+
+    Deliberately conservative (no dictionary): it only has to map a pattern
+    word and the user's inflection of it to the same term.
+    """
+    if len(token) <= 3 or not token.isalpha():
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("sses"):
+        return token[:-2]
+    for suffix in ("ing", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            stem = token[:-len(suffix)]
+            # running -> run, stopped -> stop
+            if len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in "lsz":
+                stem = stem[:-1]
+            return stem
+    if token.endswith("ly") and len(token) > 5:
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def _wordnet_lemmatizer():
+    try:
+        from nltk.stem import WordNetLemmatizer
+
+        lemmatizer = WordNetLemmatizer()
+        lemmatizer.lemmatize("tests")  # raises LookupError when the corpus isn't downloaded
+        return lemmatizer.lemmatize
+    except Exception as e:
+        print("WordNet lemmatizer unavailable, using suffix stemming:", e)
+        return suffix_stem
+
+
+def symmetric_deletes(word: str, depth: int) -> set[str]:
+    """`word` plus every string reachable by deleting up to `depth` characters."""
+    results = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Edit distance counting an adjacent swap as one edit (optimal string alignment).
+
+    Returns limit + 1 as soon as the distance must exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        row = [i]
+        for j, char_b in enumerate(b, start=1):
+            cost = min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (char_a != char_b))
+            if before is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            row.append(cost)
+        if min(row) > limit:
+            return limit + 1
+        before, previous = previous, row
+    return previous[-1]
+
+
+class SpellingCorrector:
+    """Maps unknown tokens to the closest word of a fixed vocabulary.
+
+    Tokens of 4-7 letters may be 1 edit away, longer ones 2; shorter words
+    and numbers are never corrected. Vocabulary words are indexed with their
+    single-character deletes and a token probes the index with its own
+    deletes up to its limit, so a lookup costs a handful of dict probes
+    however large the vocabulary is. Keeping the vocabulary side at one
+    delete keeps the index small; the cost is that two edits are only found
+    when at most one of them is a wrong or missing letter (the other an
+    extra letter). Ties prefer
+    the smaller distance, then the more common word, then alphabetical
+    order. Results are memoized per token.
+    """
+
+    INDEX_DELETES = 1
+
+    def __init__(self, vocabulary, counts: dict[str, int] | None = None, cache_size: int = 10000):
+        self.vocabulary = frozenset(vocabulary)
+        self.counts = counts or {}
+        self.deletes: dict[str, list[str]] = {}
+        for word in sorted(self.vocabulary):
+            for variant in symmetric_deletes(word, min(self.INDEX_DELETES, self.max_distance(word))):
+                self.deletes.setdefault(variant, []).append(word)
+        self.correct = lru_cache(maxsize=cache_size)(self._correct)
+
+    @staticmethod
+    def max_distance(token: str) -> int:
+        if len(token) < 4 or not token.isalpha():
+            return 0
+        return 1 if len(token) < 8 else 2
+
+    def _correct(self, token: str) -> str:
+        limit = self.max_distance(token)
+        if token in self.vocabulary or limit == 0:
+            return token
+        best = None
+        seen = set()
+        for variant in symmetric_deletes(token, limit):
+            for word in self.deletes.get(variant, ()):
+                if word in seen:
+                    continue
+                seen.add(word)
+                distance = edit_distance(token, word, limit)
+                if distance <= limit:
+                    candidate = (distance, -self.counts.get(word, 0), word)
+                    if best is None or candidate < best:
+                        best = candidate
+        return best[2] if best else token
+
+
+class TextNormalizer:
+    """One text pipeline for every engine: tokenize -> stem/lemmatize -> (spelling).
+
+    `terms(text)` is what patterns are indexed with and what messages are
+    matched with; per-token stemming is memoized in an LRU. Spelling
+    correction needs a vocabulary, so indexes build it with `corrector()`.
+    """
+
+    def __init__(self, stemmer: str = "suffix", spelling: bool = True, cache_size: int = 10000):
+        self.stemmer = stemmer if stemmer in STEMMERS else "suffix"
+        self.spelling = spelling
+        self.cache_size = cache_size
+        if self.stemmer == "none":
+            stem = str
+        elif self.stemmer == "wordnet":
+            stem = _wordnet_lemmatizer()
+        else:
+            stem = suffix_stem
+        self.stem = lru_cache(maxsize=cache_size)(stem)
+
+    def terms(self, text) -> list[str]:
+        return [self.stem(token) for token in tokenize(text)]
+
+    def corrector(self, vocabulary, counts: dict[str, int] | None = None) -> SpellingCorrector | None:
+        if not self.spelling:
+            return None
+        return SpellingCorrector(vocabulary, counts, self.cache_size)
+
+    def __repr__(self) -> str:
+        return f"TextNormalizer(stemmer={self.stemmer!r}, spelling={self.spelling})"
@@ -1,16 +1,45 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from flask_jwt_extended import create_access_token, jwt_required
+from sqlalchemy.exc import IntegrityError
 import re
 
+from backend.config import Config
 from backend.extensions import db
 from backend.models import AdminUser, Intent
+from backend.services.auth_service import LoginBusyError, PasswordChecker
+from backend.services.chat_log_service import chat_log
+from backend.services.chat_service import tier_stats
+from backend.services import intent_bulk_service
+from backend.services.intent_bulk_service import BulkImportError
+from backend.services.intent_overlap_service import IntentOverlapService
+from backend.services.intent_pattern_service import IntentPatternService
 from backend.services.intent_service import IntentService
 from backend.models import ResultAnalysisHistory
+from backend.services.rate_limiter import create_rate_limiter, retry_after_response
 from backend.services.result_preference_service import ResultPreferenceService
+from backend.services.shared_intent_index import refresh_shared_intent_index
+from backend.services.subject_alias_service import subject_aliases
+from backend.services.table_version_service import payload_cache, table_versions
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin")
-intent_service = IntentService()
+pattern_service = IntentPatternService()
+intent_service = IntentService(normalizer=pattern_service.normalizer)
+overlap_service = IntentOverlapService()
 result_pref_service = ResultPreferenceService()
+login_limiter = create_rate_limiter("login", Config.LOGIN_RATE_LIMIT_PER_MINUTE, Config.LOGIN_RATE_LIMIT_BURST)
+password_checker = PasswordChecker(Config.LOGIN_HASH_WORKERS, Config.LOGIN_HASH_QUEUE, Config.LOGIN_HASH_TIMEOUT)
+MAX_SUBJECT_ALIASES = 5000
+
+
+@admin_bp.after_request
+def _publish_intent_changes(response: Response) -> Response:
+    # With the shared index, make this worker republish now so chat sees the edit
+    # on every worker at once, not after INTENT_INDEX_REFRESH_SECONDS.
+    if request.method in ("POST", "PUT", "DELETE") and response.status_code < 400 and (
+        request.path.startswith(f"{admin_bp.url_prefix}/intents")
+    ):
+        refresh_shared_intent_index()
+    return response
 
 
 def _validate_intent_payload(payload: dict) -> tuple[bool, str]:
@@ -30,22 +59,79 @@ def _validate_intent_payload(payload: dict) -> tuple[bool, str]:
     return True, ""
 
 
+def _versioned_json(table: str, build) -> Response:
+    """Serve build() as JSON with an ETag from the table's version counter.
+
+    A matching If-None-Match costs one app_settings lookup and returns 304;
+    otherwise the serialized body is reused until the version moves.
+    """
+    version = table_versions.get(table)
+    etag = f"{table}-{version}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = payload_cache.get(table, version)
+        if body is None:
+            body = current_app.json.dumps(build()) + "\n"
+            payload_cache.put(table, version, body)
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
 def _slugify(value: str) -> str:
     slug = re.sub(r"[^a-zA-Z0-9]+", "_", (value or "").strip().lower()).strip("_")
     return slug or "intent"
 
 
-def _build_unique_tag(base_tag: str, intent_id: int | None = None) -> str:
+TAG_ALLOCATION_ATTEMPTS = 5
+
+
+def _taken_tags(base_tag: str, intent_id: int | None = None) -> set[str]:
+    # One prefix query: the range keeps it on the unique tag index, LIKE keeps it exact.
+    q = db.session.query(Intent.tag).filter(
+        Intent.tag >= base_tag,
+        Intent.tag < base_tag + "\U0010ffff",
+        Intent.tag.startswith(base_tag, autoescape=True),
+    )
+    if intent_id is not None:
+        q = q.filter(Intent.id != intent_id)
+    return {row.tag for row in q}
+
+
+def _next_free_tag(base_tag: str, taken: set[str]) -> str:
+    """Pick the first free of base, base_2, base_3, ... and reserve it in `taken`."""
     candidate = base_tag
     index = 1
-    while True:
-        q = Intent.query.filter(Intent.tag == candidate)
-        if intent_id is not None:
-            q = q.filter(Intent.id != intent_id)
-        if not q.first():
-            return candidate
+    while candidate in taken:
         index += 1
         candidate = f"{base_tag}_{index}"
+    taken.add(candidate)
+    return candidate
+
+
+def _build_unique_tag(base_tag: str, intent_id: int | None = None) -> str:
+    return _next_free_tag(base_tag, _taken_tags(base_tag, intent_id))
+
+
+def _commit_with_unique_tag(apply, base_tag: str, intent_id: int | None = None) -> str | None:
+    """Allocate a tag, call apply(tag) to stage the row and commit.
+
+    A concurrent admin can grab the same tag between allocation and commit;
+    the unique constraint catches that and we retry with a fresh prefetch.
+    Returns None if every attempt conflicted.
+    """
+    for _ in range(TAG_ALLOCATION_ATTEMPTS):
+        tag = _build_unique_tag(base_tag, intent_id)
+        try:
+            apply(tag)
+            db.session.commit()
+            return tag
+        except IntegrityError:
+            db.session.rollback()
+    return None
 
 
 def _generate_patterns(topic: str, details: str) -> list[str]:
@@ -129,6 +215,24 @@ def _validate_result_rules(payload: dict) -> tuple[bool, str]:
     return True, ""
 
 
+def _validate_subject_aliases(payload: dict) -> tuple[bool, str]:
+    aliases = payload.get("aliases")
+    if not isinstance(aliases, list):
+        return False, "Aliases must be a list."
+    if len(aliases) > MAX_SUBJECT_ALIASES:
+        return False, f"At most {MAX_SUBJECT_ALIASES} aliases are allowed."
+    for idx, item in enumerate(aliases, start=1):
+        if not isinstance(item, dict):
+            return False, f"Alias {idx}: must be an object."
+        alias = item.get("alias")
+        subject = item.get("subject")
+        if not isinstance(alias, str) or not alias.strip() or len(alias.strip()) > 100:
+            return False, f"Alias {idx}: alias must be a non-empty string of at most 100 characters."
+        if not isinstance(subject, str) or not subject.strip() or len(subject.strip()) > 100:
+            return False, f"Alias {idx}: subject must be a non-empty string of at most 100 characters."
+    return True, ""
+
+
 @admin_bp.route("/auth/login", methods=["POST"])
 def admin_login():
     payload = request.get_json(silent=True) or {}
@@ -138,8 +242,21 @@ def admin_login():
     if not email or not password:
         return jsonify({"error": "Email and password are required."}), 400
 
+    if login_limiter is not None:
+        # Per IP against one client trying many accounts, per email against many clients trying one.
+        wait = max(
+            login_limiter.acquire(f"ip:{request.remote_addr or 'unknown'}"),
+            login_limiter.acquire(f"email:{email}"),
+        )
+        if wait > 0:
+            return retry_after_response("Too many login attempts. Please retry later.", 429, wait)
+
     user = AdminUser.query.filter_by(email=email).first()
-    if not user or not user.check_password(password):
+    try:
+        valid = user is not None and password_checker.check(user.password_hash, password)
+    except LoginBusyError:
+        return retry_after_response("Login is busy. Please retry shortly.", 503, 1)
+    if not valid:
         return jsonify({"error": "Invalid credentials."}), 401
 
     token = create_access_token(identity=str(user.id))
@@ -149,7 +266,7 @@ def admin_login():
 @admin_bp.route("/intents", methods=["GET"])
 @jwt_required()
 def list_intents():
-    return jsonify({"intents": intent_service.get_intents()}), 200
+    return _versioned_json("intents", lambda: {"intents": intent_service.get_intents()})
 
 
 @admin_bp.route("/intents", methods=["POST"])
@@ -171,6 +288,9 @@ def create_intent():
         responses=[x.strip() for x in payload["responses"] if x.strip()],
     )
     db.session.add(intent)
+    db.session.flush()
+    pattern_service.sync_intent(intent)
+    table_versions.bump("intents")
     db.session.commit()
     return jsonify({"intent": intent.to_dict()}), 201
 
@@ -187,14 +307,106 @@ def create_intent_smart():
     details = payload["details"].strip()
     responses = [x.strip() for x in payload["responses"] if x.strip()]
 
-    tag = _build_unique_tag(_slugify(topic))
     patterns = _generate_patterns(topic, details)
-    intent = Intent(tag=tag, patterns=patterns, responses=responses)
-    db.session.add(intent)
-    db.session.commit()
+    intent = Intent(patterns=patterns, responses=responses)
+
+    def apply(tag: str) -> None:
+        intent.tag = tag
+        db.session.add(intent)
+        db.session.flush()
+        pattern_service.sync_intent(intent)
+        table_versions.bump("intents")
+
+    tag = _commit_with_unique_tag(apply, _slugify(topic))
+    if tag is None:
+        return jsonify({"error": "Could not allocate a unique tag, please retry."}), 409
     return jsonify({"intent": intent.to_dict(), "generated": {"tag": tag, "patterns": patterns}}), 201
 
 
+@admin_bp.route("/intents/smart/bulk", methods=["POST"])
+@jwt_required()
+def create_intents_smart_bulk():
+    payload = request.get_json(silent=True) or {}
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Items must be a non-empty list."}), 400
+
+    prepared = []
+    for idx, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            return jsonify({"error": f"Item {idx}: must be an object."}), 400
+        ok, message = _validate_smart_payload(item)
+        if not ok:
+            return jsonify({"error": f"Item {idx}: {message}"}), 400
+        topic = item["topic"].strip()
+        prepared.append(
+            (
+                _slugify(topic),
+                _generate_patterns(topic, item["details"].strip()),
+                [x.strip() for x in item["responses"] if x.strip()],
+            )
+        )
+
+    for _ in range(TAG_ALLOCATION_ATTEMPTS):
+        # One prefix query per distinct topic slug, shared by every item on that topic.
+        taken = {base: _taken_tags(base) for base in {base for base, _, _ in prepared}}
+        intents = [
+            Intent(tag=_next_free_tag(base, taken[base]), patterns=patterns, responses=responses)
+            for base, patterns, responses in prepared
+        ]
+        try:
+            db.session.add_all(intents)
+            db.session.flush()
+            for intent in intents:
+                pattern_service.sync_intent(intent)
+            table_versions.bump("intents")
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+    else:
+        return jsonify({"error": "Could not allocate unique tags, please retry."}), 409
+
+    return jsonify({"intents": [x.to_dict() for x in intents]}), 201
+
+
+@admin_bp.route("/intents/import", methods=["POST"])
+@jwt_required()
+def import_intents():
+    upload = request.files.get("file")
+    if upload:
+        raw = upload.read()
+        detected = intent_bulk_service.detect_format(upload.filename, upload.mimetype)
+    else:
+        raw = request.get_data()
+        detected = intent_bulk_service.detect_format(content_type=request.content_type)
+    fmt = (request.args.get("format") or detected).lower()
+    update_existing = request.args.get("update_existing", "true").lower() != "false"
+
+    try:
+        records = intent_bulk_service.parse_records(raw, fmt)
+    except BulkImportError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    report = intent_bulk_service.import_intents(records, update_existing=update_existing)
+    return jsonify(report), 200
+
+
+@admin_bp.route("/intents/export", methods=["GET"])
+@jwt_required()
+def export_intents():
+    fmt = (request.args.get("format") or "json").lower()
+    if fmt not in intent_bulk_service.SUPPORTED_FORMATS:
+        return jsonify({"error": f"Unsupported format '{fmt}'."}), 400
+
+    mimetypes = {"json": "application/json", "ndjson": "application/x-ndjson", "csv": "text/csv"}
+    return Response(
+        stream_with_context(intent_bulk_service.iter_export(fmt)),
+        mimetype=mimetypes[fmt],
+        headers={"Content-Disposition": f"attachment; filename=intents.{fmt}"},
+    )
+
+
 @admin_bp.route("/intents/<int:intent_id>", methods=["PUT"])
 @jwt_required()
 def update_intent(intent_id: int):
@@ -212,6 +424,8 @@ def update_intent(intent_id: int):
     intent.tag = tag
     intent.patterns = [x.strip() for x in payload["patterns"] if x.strip()]
     intent.responses = [x.strip() for x in payload["responses"] if x.strip()]
+    pattern_service.sync_intent(intent)
+    table_versions.bump("intents")
     db.session.commit()
     return jsonify({"intent": intent.to_dict()}), 200
 
@@ -229,13 +443,18 @@ def update_intent_smart(intent_id: int):
     details = payload["details"].strip()
     responses = [x.strip() for x in payload["responses"] if x.strip()]
 
-    tag = _build_unique_tag(_slugify(topic), intent_id=intent_id)
     patterns = _generate_patterns(topic, details)
 
-    intent.tag = tag
-    intent.patterns = patterns
-    intent.responses = responses
-    db.session.commit()
+    def apply(tag: str) -> None:
+        intent.tag = tag
+        intent.patterns = patterns
+        intent.responses = responses
+        pattern_service.sync_intent(intent)
+        table_versions.bump("intents")
+
+    tag = _commit_with_unique_tag(apply, _slugify(topic), intent_id=intent_id)
+    if tag is None:
+        return jsonify({"error": "Could not allocate a unique tag, please retry."}), 409
     return jsonify({"intent": intent.to_dict(), "generated": {"tag": tag, "patterns": patterns}}), 200
 
 
@@ -243,22 +462,84 @@ def update_intent_smart(intent_id: int):
 @jwt_required()
 def delete_intent(intent_id: int):
     intent = Intent.query.get_or_404(intent_id)
+    pattern_service.remove_intent(intent.id)
     db.session.delete(intent)
+    table_versions.bump("intents")
     db.session.commit()
     return jsonify({"message": "Intent deleted."}), 200
 
 
+@admin_bp.route("/intents/duplicates", methods=["GET"])
+@jwt_required()
+def list_duplicate_patterns():
+    limit_raw = request.args.get("limit", "100")
+    try:
+        limit = max(1, min(1000, int(limit_raw)))
+    except ValueError:
+        limit = 100
+    return jsonify({"duplicates": pattern_service.duplicate_patterns(limit)}), 200
+
+
+@admin_bp.route("/intents/overlap-report", methods=["GET"])
+@jwt_required()
+def intent_overlap_report():
+    try:
+        limit = max(1, min(1000, int(request.args.get("limit", "100"))))
+    except ValueError:
+        limit = 100
+    thresholds = {}
+    for name in ("intent_threshold", "pattern_threshold"):
+        try:
+            thresholds[name] = max(0.1, min(1.0, float(request.args.get(name, "0.8"))))
+        except ValueError:
+            thresholds[name] = 0.8
+    report = overlap_service.report(table_versions.get("intents"), limit=limit, **thresholds)
+    return jsonify(report), 200
+
+
+@admin_bp.route("/intents/<int:intent_id>/overlaps", methods=["GET"])
+@jwt_required()
+def list_intent_overlaps(intent_id: int):
+    Intent.query.get_or_404(intent_id)
+    return jsonify({"overlaps": pattern_service.overlapping_intents(intent_id)}), 200
+
+
+@admin_bp.route("/intents/candidates", methods=["GET"])
+@jwt_required()
+def list_candidate_intents():
+    return jsonify({"candidates": intent_service.candidate_tags(request.args.get("message", ""))}), 200
+
+
 @admin_bp.route("/intents/<int:intent_id>/preview", methods=["GET"])
 @jwt_required()
 def preview_intent(intent_id: int):
     return jsonify({"preview": intent_service.preview_intent(intent_id)}), 200
 
 
+@admin_bp.route("/chat-stats", methods=["GET"])
+@jwt_required()
+def get_chat_stats():
+    return jsonify(tier_stats.snapshot()), 200
+
+
+@admin_bp.route("/chat-log/unanswered", methods=["GET"])
+@jwt_required()
+def list_unanswered_queries():
+    try:
+        limit = max(1, min(500, int(request.args.get("limit", "20"))))
+    except ValueError:
+        limit = 20
+    try:
+        hours = max(1.0, min(24.0 * 365, float(request.args.get("hours", "168"))))
+    except ValueError:
+        hours = 168.0
+    return jsonify(chat_log.top_unanswered(limit, hours)), 200
+
+
 @admin_bp.route("/result-preferences", methods=["GET"])
 @jwt_required()
 def get_result_preferences():
-    rules = result_pref_service.get_rules()
-    return jsonify({"rules": rules}), 200
+    return _versioned_json("result_preferences", lambda: {"rules": result_pref_service.get_rules()})
 
 
 @admin_bp.route("/result-preferences", methods=["PUT"])
@@ -273,6 +554,24 @@ def update_result_preferences():
     return jsonify(pref.to_dict()), 200
 
 
+@admin_bp.route("/subject-aliases", methods=["GET"])
+@jwt_required()
+def get_subject_aliases():
+    return _versioned_json("subject_aliases", lambda: {"aliases": subject_aliases.list_aliases()})
+
+
+@admin_bp.route("/subject-aliases", methods=["PUT"])
+@jwt_required()
+def update_subject_aliases():
+    payload = request.get_json(silent=True) or {}
+    ok, message = _validate_subject_aliases(payload)
+    if not ok:
+        return jsonify({"error": message}), 400
+
+    count = subject_aliases.replace_aliases(payload["aliases"])
+    return jsonify({"aliases": subject_aliases.list_aliases(), "stored": count}), 200
+
+
 @admin_bp.route("/result-history", methods=["GET"])
 @jwt_required()
 def get_result_history():
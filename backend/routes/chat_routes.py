@@ -1,11 +1,34 @@
 # backend/routes/chat_routes.py
-from flask import Blueprint, request, jsonify
+import json
+import re
+import time
+import uuid
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from backend.config import Config
+from backend.services.chat_log_service import chat_log
 from backend.services.chat_service import ChatService
+from backend.services.rate_limiter import create_rate_limiter, rate_limited
 
 chat_bp = Blueprint("chat", __name__)
 service = ChatService()
+chat_limiter = create_rate_limiter("chat", Config.CHAT_RATE_LIMIT_PER_MINUTE, Config.CHAT_RATE_LIMIT_BURST)
+MAX_SESSION_ID_LENGTH = 128
+
+
+def _session_id_from_request(payload: dict) -> str:
+    # Clients echo back the id we hand out; anything missing, non-string or oversized gets a fresh one.
+    session_id = payload.get("session_id") or request.headers.get("X-Session-Id") or ""
+    if not isinstance(session_id, str):
+        session_id = ""
+    session_id = session_id.strip()
+    if not session_id or len(session_id) > MAX_SESSION_ID_LENGTH:
+        session_id = uuid.uuid4().hex
+    return session_id
+
 
 @chat_bp.route("/chat", methods=["POST"])
+@rate_limited(chat_limiter)
 def chat():
     if not request.is_json:
         return jsonify({"error": "Request must be JSON"}), 400
@@ -13,8 +36,64 @@ def chat():
     if user_message is None:
         return jsonify({"error": "No message provided"}), 400
     try:
-        response_text = service.get_response(user_message)
-        return jsonify({"response": response_text})
+        session_id = _session_id_from_request(request.json)
+        started = time.perf_counter()
+        result = service.resolve(user_message, session_id=session_id)
+        chat_log.record(user_message, result, time.perf_counter() - started)
+        return jsonify({"response": result["response"], "session_id": session_id})
     except Exception as e:
         print("Server error:", e)
         return jsonify({"error": "An internal error occurred."}), 500
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _chunk_words(text: str, size: int):
+    # Keep whitespace attached so clients can concatenate deltas verbatim.
+    words = re.findall(r"\S+\s*", text)
+    for i in range(0, len(words), size):
+        yield "".join(words[i:i + size])
+
+
+@chat_bp.route("/chat/stream", methods=["GET", "POST"])
+@rate_limited(chat_limiter)
+def chat_stream():
+    """Server-sent events: `session`, then `intent`, then `message` deltas and `done`.
+
+    GET (query string) works with a plain EventSource; POST takes the same JSON
+    body as /chat.
+    """
+    if request.method == "POST":
+        if not request.is_json:
+            return jsonify({"error": "Request must be JSON"}), 400
+        payload = request.json
+    else:
+        payload = request.args
+    user_message = payload.get("message", "")
+    if user_message is None:
+        return jsonify({"error": "No message provided"}), 400
+
+    def generate():
+        try:
+            session_id = _session_id_from_request(payload)
+            # First bytes go out before any DB or model work.
+            yield _sse("session", {"session_id": session_id})
+            started = time.perf_counter()
+            result = service.resolve(user_message, session_id=session_id)
+            chat_log.record(user_message, result, time.perf_counter() - started)
+        except Exception as e:
+            print("Server error:", e)
+            yield _sse("error", {"error": "An internal error occurred."})
+            return
+        yield _sse("intent", {"tag": result["tag"], "tier": result["tier"], "score": result["score"]})
+        for delta in _chunk_words(result["response"], Config.CHAT_STREAM_CHUNK_WORDS):
+            yield _sse("message", {"delta": delta})
+        yield _sse("done", {})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
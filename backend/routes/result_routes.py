@@ -1,22 +1,37 @@
-from flask import Blueprint, jsonify, request
-from PIL import Image, UnidentifiedImageError
+import threading
+
+from flask import Blueprint, current_app, jsonify, request
+from PIL import UnidentifiedImageError
 import pytesseract
+from werkzeug.exceptions import RequestEntityTooLarge
 
-from backend.extensions import db
-from backend.models import ResultAnalysisHistory
-from backend.services.result_analysis_service import ResultAnalysisService
+from backend.config import Config
+from backend.services.rate_limiter import create_rate_limiter, rate_limited, retry_after_response
+from backend.services.result_analysis_service import ImageTooLargeError, ResultAnalysisService
+from backend.services.result_history_service import ResultHistoryService
 
 
 result_bp = Blueprint("result", __name__)
 analysis_service = ResultAnalysisService()
+history_service = ResultHistoryService()
 ALLOWED_EXTENSIONS = {"jpg", "jpeg", "png"}
+ocr_limiter = create_rate_limiter("ocr", Config.OCR_RATE_LIMIT_PER_MINUTE, Config.OCR_RATE_LIMIT_BURST)
+# Each analysis runs a tesseract subprocess; cap how many this worker runs at once.
+ocr_slots = threading.BoundedSemaphore(Config.OCR_MAX_CONCURRENCY)
 
 
 def _is_allowed_file(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+@result_bp.errorhandler(RequestEntityTooLarge)
+def upload_too_large(_exc):
+    limit_mb = round(Config.MAX_CONTENT_LENGTH / (1024 * 1024), 1)
+    return jsonify({"error": f"Upload is too large. The limit is {limit_mb} MB."}), 413
+
+
 @result_bp.route("/analyze-result", methods=["POST"])
+@rate_limited(ocr_limiter)
 def analyze_result():
     """Accept result image upload and return parsed analysis as JSON."""
     if "file" not in request.files:
@@ -29,26 +44,25 @@ def analyze_result():
     if not _is_allowed_file(file.filename):
         return jsonify({"error": "Invalid file type. Only JPG and PNG are allowed."}), 400
 
+    if not ocr_slots.acquire(timeout=Config.OCR_QUEUE_TIMEOUT):
+        return retry_after_response("Result analysis is busy. Please retry shortly.", 503, Config.OCR_RETRY_AFTER)
     try:
-        image = Image.open(file.stream)
+        image = analysis_service.load_image(file.stream)
         result = analysis_service.analyze(image)
-        history = ResultAnalysisHistory(
-            student_name=result.get("name", "Unknown"),
-            total=int(result.get("total", 0)),
-            average=float(result.get("average", 0)),
-            subjects=result.get("subjects", {}),
-            strength_subjects=result.get("strength_subjects", []),
-            recommended_courses=result.get("recommended_courses", []),
-            source_filename=file.filename,
+        history_service.record(
+            history_service.build_row(result, file.filename),
+            current_app._get_current_object(),
         )
-        db.session.add(history)
-        db.session.commit()
         return jsonify(result), 200
     except UnidentifiedImageError:
         return jsonify({"error": "Uploaded file is not a valid image."}), 400
+    except ImageTooLargeError as exc:
+        return jsonify({"error": str(exc)}), 413
     except pytesseract.TesseractNotFoundError:
         return jsonify({"error": "Tesseract OCR is not installed or not available in PATH."}), 500
     except ValueError as exc:
         return jsonify({"error": str(exc)}), 422
     except Exception:
         return jsonify({"error": "Failed to process the uploaded result image."}), 500
+    finally:
+        ocr_slots.release()
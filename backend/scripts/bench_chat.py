@@ -0,0 +1,349 @@
+"""Benchmark chat engines on labeled utterances: speed, memory, accuracy, confusions.
+
+Engines:
+- rule:       backend/nlp/rule_based.py (exact -> keyword rules -> token overlap)
+- db_jaccard: IntentService on a scratch SQLite database (exact -> indexed Jaccard)
+- router:     ChatService's tiered router (exact -> keyword -> Jaccard -> semantic -> ML, on the DB)
+- ml:         backend/nlp/ml_engine.py (skipped with the reason when the model can't load)
+- semantic:   backend/nlp/semantic_engine.py (char n-gram TF-IDF cosine, CHAT_SEMANTIC_THRESHOLD)
+
+Utterances are JSON (a list of {"message", "tag"}), NDJSON or CSV (message,tag).
+Without a file they are derived from the intents' patterns, with light noise:
+
+    python backend/scripts/bench_chat.py --utterances labeled.jsonl --output before.json
+    python backend/scripts/bench_chat.py --synthetic-intents 2000 --vocab 5000 --output scale.json
+    python backend/scripts/bench_chat.py --compare before.json after.json
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BASE_DIR)
+
+ENGINES = ("rule", "db_jaccard", "router", "ml", "semantic")
+FALLBACK_TAG = "fallback"
+
+
+def load_utterances(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        raw = f.read()
+    if path.endswith(".csv"):
+        rows = [{"message": r["message"], "tag": r["tag"]} for r in csv.DictReader(raw.splitlines())]
+    elif path.endswith((".jsonl", ".ndjson")):
+        rows = [json.loads(line) for line in raw.splitlines() if line.strip()]
+    else:
+        rows = json.loads(raw)
+    return [{"message": str(r["message"]), "tag": str(r["tag"])} for r in rows]
+
+
+def _noisy(pattern: str, rng: random.Random) -> str:
+    words = pattern.split()
+    choice = rng.random()
+    if choice < 0.3 and len(words) > 2:
+        words.pop(rng.randrange(len(words)))
+    elif choice < 0.5:
+        words.append(rng.choice(["please", "sir", "now", "again", "?"]))
+    elif choice < 0.6 and words:
+        i = rng.randrange(len(words))
+        if len(words[i]) > 3:
+            j = rng.randrange(len(words[i]) - 1)
+            word = list(words[i])
+            word[j], word[j + 1] = word[j + 1], word[j]
+            words[i] = "".join(word)
+    return " ".join(words)
+
+
+def utterances_from_intents(intents: list[dict], count: int, rng: random.Random) -> list[dict]:
+    labeled = [(p, i["tag"]) for i in intents if i["tag"] != FALLBACK_TAG for p in i.get("patterns", [])]
+    return [
+        {"message": _noisy(pattern, rng), "tag": tag}
+        for pattern, tag in (rng.choice(labeled) for _ in range(count))
+    ]
+
+
+def synthetic_intents(n_intents: int, vocab_size: int, patterns_per_intent: int, rng: random.Random) -> list[dict]:
+    """Intents over a made-up vocabulary; a few topic words per intent keep them separable."""
+    syllables = ["ka", "lo", "mi", "ra", "te", "su", "ven", "dor", "pa", "qui", "zo", "ne", "bri", "tal"]
+    vocab = set()
+    while len(vocab) < vocab_size:
+        vocab.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    vocab = sorted(vocab)
+    common = vocab[:50]
+    intents = []
+    for i in range(n_intents):
+        topic = rng.sample(vocab[50:], 3)
+        patterns = [
+            " ".join(rng.sample(topic, rng.randint(1, 3)) + rng.sample(common, rng.randint(1, 3)))
+            for _ in range(patterns_per_intent)
+        ]
+        intents.append({"tag": f"intent_{i}", "patterns": patterns, "responses": [f"answer {i}"]})
+    intents.append({"tag": FALLBACK_TAG, "patterns": [], "responses": ["Sorry?"]})
+    return intents
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+def _build_engines(intents_path: str, names: list[str]) -> tuple[dict, dict, object]:
+    """Return ({name: predict(message) -> tag}, {name: build memory/skip info}, app context)."""
+    from backend import create_app
+    from backend.extensions import db
+    from backend.services import intent_bulk_service
+
+    with open(intents_path, "r", encoding="utf-8") as f:
+        records = json.load(f).get("intents", [])
+
+    app = create_app(bootstrap=False)
+    ctx = app.app_context()
+    ctx.push()
+    db.create_all()
+    intent_bulk_service.import_intents(records)
+
+    engines, info = {}, {}
+
+    def measure(name, build):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            engine = build()
+            current, _ = tracemalloc.get_traced_memory()
+            engines[name] = engine
+            info[name] = {"build_kb": round(current / 1024, 1)}
+        except Exception as e:
+            info[name] = {"skipped": f"{type(e).__name__}: {e}"}
+        finally:
+            tracemalloc.stop()
+
+    if "rule" in names:
+        def build_rule():
+            from backend.nlp.rule_based import ChatbotAssistant
+
+            bot = ChatbotAssistant(intents_path)
+
+            def predict(message):
+                tag = bot.match_exact(message) or bot.match_keyword(message)
+                if tag:
+                    return tag
+                tag, score = bot.match_overlap(message)
+                return tag if tag and score > 0 else FALLBACK_TAG
+            return predict
+        measure("rule", build_rule)
+
+    if "db_jaccard" in names:
+        def build_db():
+            from backend.services.intent_service import IntentService
+
+            service = IntentService()
+            service.get_index()
+
+            def predict(message):
+                tag = service.match_exact(message)
+                if tag:
+                    return tag
+                tag, score = service.match_overlap(message)
+                return tag if tag and score > 0 else FALLBACK_TAG
+            return predict
+        measure("db_jaccard", build_db)
+
+    if "router" in names:
+        def build_router():
+            from backend.services.chat_service import ChatService
+
+            service = ChatService()
+            service.intent_service.get_index()
+            return lambda message: service._resolve(message, None)["tag"] or FALLBACK_TAG
+        measure("router", build_router)
+
+    if "ml" in names:
+        def build_ml():
+            from backend.config import Config
+            from backend.nlp.ml_engine import ChatbotML
+
+            bot = ChatbotML(Config.ML_MODEL_PATH, Config.ML_DIMENSIONS_PATH, intents_path)
+            return lambda message: bot.predict(message)[0] or FALLBACK_TAG
+        measure("ml", build_ml)
+
+    if "semantic" in names:
+        def build_semantic():
+            from backend.config import Config
+            from backend.nlp.semantic_engine import ChatbotSemantic
+
+            bot = ChatbotSemantic.from_file(intents_path, dim=Config.SEMANTIC_DIM)
+
+            def predict(message):
+                tag, score = bot.predict(message)
+                return tag if tag and score >= Config.CHAT_SEMANTIC_THRESHOLD else FALLBACK_TAG
+            return predict
+        measure("semantic", build_semantic)
+
+    return engines, info, ctx
+
+
+def run_engine(predict, utterances: list[dict], repeat: int, warmup: int) -> dict:
+    for item in utterances[:warmup]:
+        predict(item["message"])
+
+    latencies = []
+    predictions = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        predictions = []
+        for item in utterances:
+            t0 = time.perf_counter()
+            predictions.append(predict(item["message"]))
+            latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - started
+
+    # A separate traced pass: tracemalloc slows calls down, so it is not timed.
+    gc.collect()
+    tracemalloc.start()
+    for item in utterances:
+        predict(item["message"])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    confusion = defaultdict(Counter)
+    correct = 0
+    for item, predicted in zip(utterances, predictions):
+        confusion[item["tag"]][predicted] += 1
+        correct += predicted == item["tag"]
+
+    latencies.sort()
+    top_confusions = sorted(
+        (
+            {"expected": expected, "predicted": predicted, "count": count}
+            for expected, row in confusion.items()
+            for predicted, count in row.items()
+            if predicted != expected
+        ),
+        key=lambda x: -x["count"],
+    )[:10]
+    return {
+        "throughput_per_sec": round(len(latencies) / wall, 1) if wall else 0.0,
+        "latency_us": {
+            "p50": round(_percentile(latencies, 0.50) * 1e6, 1),
+            "p90": round(_percentile(latencies, 0.90) * 1e6, 1),
+            "p99": round(_percentile(latencies, 0.99) * 1e6, 1),
+            "max": round(latencies[-1] * 1e6, 1) if latencies else 0.0,
+        },
+        "run_peak_kb": round(peak / 1024, 1),
+        "accuracy": round(correct / len(utterances), 4) if utterances else 0.0,
+        "confusion": {expected: dict(row) for expected, row in sorted(confusion.items())},
+        "top_confusions": top_confusions,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(before_path: str, after_path: str) -> None:
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)
+    print(f"{'engine':<12} {'metric':<20} {'before':>12} {'after':>12} {'change':>9}")
+    for engine, result in after["engines"].items():
+        old = before["engines"].get(engine, {})
+        if "skipped" in result or "skipped" in old or not old:
+            continue
+        rows = [
+            ("throughput_per_sec", old["throughput_per_sec"], result["throughput_per_sec"]),
+            ("latency_p50_us", old["latency_us"]["p50"], result["latency_us"]["p50"]),
+            ("latency_p99_us", old["latency_us"]["p99"], result["latency_us"]["p99"]),
+            ("accuracy", old["accuracy"], result["accuracy"]),
+            ("build_kb", old.get("build_kb", 0), result.get("build_kb", 0)),
+        ]
+        for metric, a, b in rows:
+            change = f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+            print(f"{engine:<12} {metric:<20} {a:>12} {b:>12} {change:>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--utterances", help="labeled utterances (.json, .jsonl/.ndjson or .csv)")
+    parser.add_argument("--intents", help="intents JSON (default: backend/nlp/intents.json)")
+    parser.add_argument("--engines", default=",".join(ENGINES), help=f"comma-separated subset of {','.join(ENGINES)}")
+    parser.add_argument("--samples", type=int, default=1000, help="generated utterances when no file is given")
+    parser.add_argument("--synthetic-intents", type=int, default=0, help="generate this many intents instead")
+    parser.add_argument("--vocab", type=int, default=2000, help="vocabulary size for synthetic intents")
+    parser.add_argument("--patterns-per-intent", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes over the utterances")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="diff two reports and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    rng = random.Random(args.seed)
+    names = [name.strip() for name in args.engines.split(",") if name.strip() in ENGINES]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Engines read Config at import time, so point it at scratch files first.
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault("SESSION_BACKEND", "memory")
+        # Same replies on every run, so router timings are comparable.
+        os.environ.setdefault("CHAT_RESPONSE_SEED", str(args.seed))
+
+        intents_path = args.intents or os.path.join(BASE_DIR, "backend", "nlp", "intents.json")
+        if args.synthetic_intents:
+            intents = synthetic_intents(args.synthetic_intents, args.vocab, args.patterns_per_intent, rng)
+            intents_path = os.path.join(tmp, "intents.json")
+            with open(intents_path, "w", encoding="utf-8") as f:
+                json.dump({"intents": intents}, f)
+        else:
+            with open(intents_path, "r", encoding="utf-8") as f:
+                intents = json.load(f)["intents"]
+
+        if args.utterances:
+            utterances = load_utterances(args.utterances)
+        else:
+            utterances = utterances_from_intents(intents, args.samples, rng)
+
+        engines, info, ctx = _build_engines(intents_path, names)
+        results = {}
+        for name in names:
+            if name not in engines:
+                results[name] = info[name]
+                continue
+            results[name] = {**info[name], **run_engine(engines[name], utterances, args.repeat, args.warmup)}
+            print(f"{name}: {results[name]['throughput_per_sec']}/s, accuracy {results[name]['accuracy']}", file=sys.stderr)
+        ctx.pop()
+
+    report = {
+        "commit": _git_commit(),
+        "config": {k: v for k, v in vars(args).items() if k != "compare"},
+        "dataset": {"intents": len(intents), "utterances": len(utterances)},
+        "engines": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Concurrent read/write throughput on SQLite, default settings vs tuned pragmas.
+
+Readers mimic chat lookups (intent signature + token candidate query),
+writers mimic /analyze-result history commits. Example:
+
+    python backend/scripts/bench_db_concurrency.py --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.config import _build_engine_options  # noqa: E402
+from backend.database import configure_engine  # noqa: E402
+from backend.extensions import db  # noqa: E402
+from backend.models import Intent, IntentToken, ResultAnalysisHistory  # noqa: E402
+
+READ_SQL = [
+    text("SELECT count(id), max(id), max(updated_at) FROM intents"),
+    text("SELECT DISTINCT intent_id FROM intent_tokens WHERE token IN ('fees', 'hostel', 'admission')"),
+]
+
+
+def _seed(engine, intents: int) -> None:
+    db.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Intent),
+            [
+                {"tag": f"intent_{i}", "patterns": [f"question {i}"], "responses": [f"answer {i}"],
+                 "created_at": now, "updated_at": now}
+                for i in range(intents)
+            ],
+        )
+        conn.execute(
+            insert(IntentToken),
+            [{"token": token, "intent_id": i + 1} for i in range(intents) for token in ("question", f"t{i % 50}")],
+        )
+
+
+def _run(engine, readers: int, writers: int, seconds: float) -> dict:
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    write_latencies: list[float] = []
+
+    def reader():
+        done = errors = 0
+        while not stop.is_set():
+            try:
+                with engine.connect() as conn:
+                    for stmt in READ_SQL:
+                        conn.execute(stmt).all()
+                done += 1
+            except Exception:
+                errors += 1
+        with lock:
+            counts["reads"] += done
+            counts["errors"] += errors
+
+    def writer():
+        done = errors = 0
+        latencies = []
+        row = {
+            "student_name": "Bench", "total": 270, "average": 90.0, "subjects": {"Maths": 90},
+            "strength_subjects": ["Maths"], "recommended_courses": ["BCA"], "source_filename": "bench.png",
+        }
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(ResultAnalysisHistory), [{**row, "analyzed_at": datetime.utcnow()}])
+                done += 1
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+        with lock:
+            counts["writes"] += done
+            counts["errors"] += errors
+            write_latencies.extend(latencies)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    write_latencies.sort()
+    p95 = write_latencies[int(len(write_latencies) * 0.95)] if write_latencies else 0.0
+    return {
+        "reads_per_sec": round(counts["reads"] / seconds, 1),
+        "writes_per_sec": round(counts["writes"] / seconds, 1),
+        "write_p95_ms": round(p95 * 1000, 2),
+        "errors": counts["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--intents", type=int, default=1000)
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("default", "tuned"):
+        with tempfile.TemporaryDirectory() as tmp:
+            uri = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            if mode == "tuned":
+                engine = create_engine(uri, **_build_engine_options(uri))
+                configure_engine(engine)
+            else:
+                engine = create_engine(uri, connect_args={"check_same_thread": False})
+            _seed(engine, args.intents)
+            results[mode] = _run(engine, args.readers, args.writers, args.seconds)
+            engine.dispose()
+
+    print(json.dumps({"config": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Memory per intent of the chat-path intent representations, at scale.
+
+Compares, for the same synthetic intents (loaded from a JSON string, as from
+the file or the DB):
+- dicts:   the previous layout: `Intent.to_dict()` rows (with ISO timestamps),
+           per-intent token string sets and an exact-pattern -> tag dict
+- records: IntentRecord (__slots__, tuples) + TokenIndex (interned token ids,
+           array('I') per intent and per token, plus the spelling corrector's
+           delete index) + ResponseTable, as built by IntentService.get_index
+           and ChatbotAssistant with the default TextNormalizer
+- shared:  the INTENT_INDEX_BACKEND=shared file (including the corrector's
+           delete index); per worker only the mapped pages (shared by all
+           workers) plus a few Python views
+
+    python backend/scripts/bench_intent_memory.py --patterns 100000 --patterns-per-intent 10
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.nlp.intent_index import IntentRecord, TokenIndex  # noqa: E402
+from backend.nlp.response_selector import ResponseTable  # noqa: E402
+from backend.nlp.text_normalizer import TextNormalizer  # noqa: E402
+from backend.scripts.bench_chat import synthetic_intents  # noqa: E402
+from backend.services.intent_service import IntentService  # noqa: E402
+from backend.services.shared_intent_index import CompiledIntentIndex, compile_intents  # noqa: E402
+
+tokenize = IntentService._clean_and_tokenize
+
+
+def build_dicts(raw: str):
+    intents = json.loads(raw)
+    word_sets, exact = {}, {}
+    for intent in intents:
+        tokens = set()
+        for pattern in intent["patterns"]:
+            pattern_tokens = tokenize(pattern)
+            tokens.update(pattern_tokens)
+            if pattern_tokens:
+                exact.setdefault(" ".join(pattern_tokens), intent["tag"])
+        word_sets[intent["tag"]] = tokens
+    return {"intents": {i["tag"]: i for i in intents}, "word_sets": word_sets, "exact": exact}
+
+
+def build_records(raw: str):
+    records = [IntentRecord.from_dict(item) for item in json.loads(raw)]
+    return {
+        "intents": {record.tag: record for record in records},
+        "tokens": TokenIndex(records, TextNormalizer()),
+        "responses": ResponseTable(records),
+    }
+
+
+def build_shared(raw: str):
+    normalizer = TextNormalizer()
+    records = [IntentRecord.from_dict(item) for item in json.loads(raw)]
+    data = compile_intents(records, normalizer.terms, 1, b"\0" * 16)
+    view = CompiledIntentIndex(data, normalizer)
+    view.terms("")  # a worker's first message sets up the spelling corrector
+    return data, view
+
+
+def _retained(build, raw: str) -> tuple[object, int, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = build(raw)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def _dict_overlap(index, message: str):
+    user_tokens = set(tokenize(message))
+    best_tag, best_score = None, 0.0
+    for tag, word_set in index["word_sets"].items():
+        overlap = len(user_tokens & word_set)
+        if overlap:
+            score = overlap / len(user_tokens | word_set)
+            if score > best_score:
+                best_tag, best_score = tag, score
+    return best_tag, best_score
+
+
+def _time_us(fn, messages: list[str]) -> float:
+    started = time.perf_counter()
+    for message in messages:
+        fn(message)
+    return round((time.perf_counter() - started) / len(messages) * 1e6, 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patterns", type=int, default=100000, help="total patterns")
+    parser.add_argument("--patterns-per-intent", type=int, default=10)
+    parser.add_argument("--vocab", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=200, help="messages timed per layout")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    n_intents = max(1, args.patterns // args.patterns_per_intent)
+    intents = synthetic_intents(n_intents, args.vocab, args.patterns_per_intent, rng)
+    stamp = "2024-01-01T00:00:00.000000"
+    for i, intent in enumerate(intents, start=1):
+        intent.update({"id": i, "created_at": stamp, "updated_at": stamp})
+    raw = json.dumps(intents)
+    patterns = sum(len(i["patterns"]) for i in intents)
+    messages = rng.sample([p for i in intents for p in i["patterns"]], args.messages)
+
+    results = {}
+    dicts, current, peak = _retained(build_dicts, raw)
+    results["dicts"] = {"retained_kb": current // 1024, "build_peak_kb": peak // 1024,
+                        "match_us": _time_us(lambda t: _dict_overlap(dicts, t), messages)}
+    del dicts
+    records, current, peak = _retained(build_records, raw)
+    results["records"] = {"retained_kb": current // 1024, "build_peak_kb": peak // 1024,
+                          "match_us": _time_us(records["tokens"].match_overlap, messages)}
+    del records
+    (data, view), current, peak = _retained(build_shared, raw)
+    results["shared"] = {"file_kb": len(data) // 1024, "per_worker_kb": (current - len(data)) // 1024,
+                         "build_peak_kb": peak // 1024, "match_us": _time_us(view.match_overlap, messages)}
+    for name, entry in results.items():
+        retained = entry.get("retained_kb", entry.get("file_kb"))
+        entry["bytes_per_intent"] = round(retained * 1024 / len(intents))
+        entry["bytes_per_pattern"] = round(retained * 1024 / patterns)
+
+    print(json.dumps({"config": {**vars(args), "intents": len(intents), "patterns": patterns}, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
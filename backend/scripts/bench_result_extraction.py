@@ -0,0 +1,168 @@
+"""Accuracy and latency of marks extraction: line regex vs word-box table rows vs auto.
+
+Fixtures are `image_to_data` dicts with the expected subject marks, so the
+parsers can be compared without Tesseract. By default they are generated for
+three layouts (one OCR line per subject, subject/mark columns that OCR reads as
+separate blocks, and a bordered grid with a max-marks column):
+
+    python backend/scripts/bench_result_extraction.py --sheets 200
+
+A fixture directory can be used instead. `*.json` files hold
+{"data": <image_to_data dict>, "expected": {"Maths": 92, ...}}; `*.png`/`*.jpg`
+files with a `<name>.json` sidecar of {"expected": {...}} are run through
+Tesseract end to end (one OCR call per mode, so latency includes OCR):
+
+    python backend/scripts/bench_result_extraction.py --fixtures path/to/marksheets
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.services.result_analysis_service import ResultAnalysisService  # noqa: E402
+
+MODES = ("lines", "table", "auto")
+SUBJECTS = [
+    "Maths", "Physics", "Chemistry", "Biology", "English", "Computer Science",
+    "Economics", "Accountancy", "Business Studies", "History", "Geography", "Political Science",
+]
+CHAR_WIDTH = 14
+WORD_HEIGHT = 24
+
+
+class _Sheet:
+    """Builds an image_to_data-style dict one word at a time."""
+
+    def __init__(self):
+        self.data = {key: [] for key in ("text", "conf", "left", "top", "width", "height", "block_num", "par_num", "line_num")}
+
+    def words(self, text: str, left: int, top: int, block: int, line: int) -> None:
+        for word in text.split():
+            for key, value in (
+                ("text", word), ("conf", 90), ("left", left), ("top", top), ("width", len(word) * CHAR_WIDTH),
+                ("height", WORD_HEIGHT), ("block_num", block), ("par_num", 1), ("line_num", line),
+            ):
+                self.data[key].append(value)
+            left += (len(word) + 1) * CHAR_WIDTH
+
+
+def _generate(layout: str, rng: random.Random) -> dict:
+    picked = rng.sample(SUBJECTS, rng.randint(4, 7))
+    marks = {subject: rng.randint(35, 100) for subject in picked}
+    sheet = _Sheet()
+    sheet.words("Name: Asha Kumar", 80, 40, 1, 1)
+    top = 120
+
+    if layout == "inline":
+        for line, subject in enumerate(picked, start=2):
+            separator = rng.choice([" ", " : ", " - "])
+            suffix = rng.choice(["", "/100"])
+            sheet.words(f"{subject}{separator}{marks[subject]}{suffix}", 80, top, 1, line)
+            top += 40
+        sheet.words(f"Total {sum(marks.values())}", 80, top, 1, len(picked) + 2)
+    elif layout == "columns":
+        # Tesseract segments the two columns into separate blocks: all subjects, then all marks.
+        for line, subject in enumerate(picked, start=1):
+            sheet.words(subject, 80, top + line * 40, 2, line)
+        for line, subject in enumerate(picked, start=1):
+            sheet.words(str(marks[subject]), 620, top + line * 40 + rng.randint(-4, 4), 3, line)
+    else:
+        sheet.words("Subject", 80, top, 2, 1)
+        sheet.words("Max Marks", 420, top, 3, 1)
+        sheet.words("Marks Obtained", 620, top, 4, 1)
+        for line, subject in enumerate(picked, start=1):
+            row_top = top + line * 40
+            sheet.words(f"| {subject} |", 60, row_top + rng.randint(-3, 3), 5 + line * 3, 1)
+            sheet.words("100", 450, row_top + rng.randint(-3, 3), 6 + line * 3, 1)
+            sheet.words(str(marks[subject]), 660, row_top + rng.randint(-3, 3), 7 + line * 3, 1)
+
+    service = ResultAnalysisService()
+    expected = {service._normalize_subject(subject): mark for subject, mark in marks.items()}
+    return {"layout": layout, "data": sheet.data, "expected": expected}
+
+
+def _parse(service: ResultAnalysisService, data: dict, mode: str) -> dict:
+    if mode == "lines":
+        words = service._words_from_data(data)
+        return service._extract_subject_marks(service._clean_text(service._data_to_text(words)))
+    return service.extract_from_data(data, mode)[1]
+
+
+def _ocr_and_parse(service: ResultAnalysisService, path: Path, mode: str) -> dict:
+    with open(path, "rb") as f:
+        image = service.load_image(f)
+    if mode == "lines":
+        return service._extract_subject_marks(service._clean_text(service._extract_text(image)))
+    return service.extract_from_data(service._extract_data(image), mode)[1]
+
+
+def _load_fixtures(directory: Path) -> list[dict]:
+    fixtures = []
+    for path in sorted(directory.iterdir()):
+        if path.suffix.lower() in (".png", ".jpg", ".jpeg"):
+            sidecar = path.with_suffix(".json")
+            if sidecar.exists():
+                expected = json.loads(sidecar.read_text(encoding="utf-8"))["expected"]
+                fixtures.append({"layout": "image", "image": path, "expected": expected})
+        elif path.suffix == ".json" and not any(path.with_suffix(s).exists() for s in (".png", ".jpg", ".jpeg")):
+            fixture = json.loads(path.read_text(encoding="utf-8"))
+            fixtures.append({"layout": fixture.get("layout", path.stem), "data": fixture["data"], "expected": fixture["expected"]})
+    return fixtures
+
+
+def _score(results: list[tuple[dict, dict, float]]) -> dict:
+    exact = correct = found = wanted = 0
+    latencies = []
+    for expected, got, seconds in results:
+        exact += got == expected
+        correct += sum(1 for subject, mark in got.items() if expected.get(subject) == mark)
+        found += len(got)
+        wanted += len(expected)
+        latencies.append(seconds)
+    latencies.sort()
+    return {
+        "sheets": len(results),
+        "exact_sheet_rate": round(exact / len(results), 3) if results else 0.0,
+        "precision": round(correct / found, 3) if found else 0.0,
+        "recall": round(correct / wanted, 3) if wanted else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 3) if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", type=Path, help="directory of fixtures (default: generated)")
+    parser.add_argument("--sheets", type=int, default=100, help="generated sheets per layout")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        fixtures = _load_fixtures(args.fixtures)
+    else:
+        rng = random.Random(args.seed)
+        fixtures = [_generate(layout, rng) for layout in ("inline", "columns", "grid") for _ in range(args.sheets)]
+
+    service = ResultAnalysisService()
+    by_layout: dict[str, dict[str, list]] = {}
+    for fixture in fixtures:
+        for mode in MODES:
+            started = time.perf_counter()
+            if "image" in fixture:
+                got = _ocr_and_parse(service, fixture["image"], mode)
+            else:
+                got = _parse(service, fixture["data"], mode)
+            elapsed = time.perf_counter() - started
+            by_layout.setdefault(fixture["layout"], {}).setdefault(mode, []).append((fixture["expected"], got, elapsed))
+
+    results = {layout: {mode: _score(runs) for mode, runs in modes.items()} for layout, modes in by_layout.items()}
+    print(json.dumps({"config": {k: str(v) for k, v in vars(args).items()}, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Build frontend/dist: fingerprinted assets, precompressed variants and WebP thumbnails.
+
+    python backend/scripts/build_assets.py [--src frontend] [--out frontend/dist]
+
+- every non-HTML asset is copied as `name.<hash8>.ext`, and references to it in
+  HTML/CSS/JS are rewritten, so it can be cached forever
+- HTML keeps its name (pages are revalidated with ETags)
+- text assets get `.gz` (and `.br` when the optional `brotli` package is
+  installed) siblings that the app or the web server can send as-is
+- JPG/PNG images under IMG/ get resized WebP variants, and `<img>` tags
+  pointing at them get a `srcset`
+- `manifest.json` maps original paths to built ones
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from pathlib import Path, PurePosixPath
+from urllib.parse import quote
+
+try:
+    import brotli
+except ImportError:  # optional: gzip alone is fine
+    brotli = None
+
+from PIL import Image
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+SRC_DIR = BASE_DIR / "frontend"
+OUT_DIR = SRC_DIR / "dist"
+MANIFEST_NAME = "manifest.json"
+
+TEXT_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt"}
+REWRITE_SUFFIXES = {".html", ".css", ".js"}
+THUMB_SUFFIXES = {".jpg", ".jpeg", ".png"}
+THUMB_WIDTHS = (320, 640, 1280)
+IMG_SIZES = "(max-width: 768px) 100vw, 50vw"
+SKIP_DIRS = {".vscode", "dist"}
+
+# Quoted strings and url(...) values that end in an asset extension.
+REFERENCE_PATTERN = re.compile(
+    r"""(?P<open>["'(])(?P<path>[^"'()<>\n]+?\.(?:png|jpe?g|webp|gif|svg|ico|css|js|json))(?P<close>["')])""",
+    re.IGNORECASE,
+)
+IMG_TAG_PATTERN = re.compile(r"<img\b[^>]*>", re.IGNORECASE)
+IMG_SRC_PATTERN = re.compile(r"""\bsrc=(["'])(?P<src>[^"']+)\1""", re.IGNORECASE)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:8]
+
+
+def _fingerprinted(rel: str, digest: str, suffix: str | None = None) -> str:
+    path = PurePosixPath(rel)
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix if suffix is None else suffix}"))
+
+
+class AssetBuilder:
+    def __init__(self, src: Path, out: Path):
+        self.src = src
+        self.out = out
+        self.assets: dict[str, str] = {}
+        self.webp: dict[str, list[dict]] = {}
+
+    def _sources(self) -> list[str]:
+        rels = []
+        for root, dirs, files in os.walk(self.src):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS and Path(root, d) != self.out)
+            for name in sorted(files):
+                rels.append(Path(root, name).relative_to(self.src).as_posix())
+        return rels
+
+    def _resolve(self, referrer: str, ref: str) -> str | None:
+        if "://" in ref or ref.startswith(("data:", "//", "#")):
+            return None
+        if ref.startswith("/"):
+            target = PurePosixPath(ref.lstrip("/"))
+        elif referrer.endswith(".js"):
+            # Paths in scripts resolve against the page, and every page sits at the root.
+            target = PurePosixPath(ref)
+        else:
+            target = PurePosixPath(referrer).parent / ref
+        parts = []
+        for part in target.parts:
+            if part == "..":
+                if not parts:
+                    return None
+                parts.pop()
+            elif part != ".":
+                parts.append(part)
+        return "/".join(parts)
+
+    def _built_ref(self, referrer: str, ref: str) -> str | None:
+        target = self._resolve(referrer, ref)
+        if target not in self.assets:
+            return None
+        built = self.assets[target]
+        if ref.startswith("/"):
+            return "/" + built
+        if referrer.endswith(".js"):
+            return built
+        return os.path.relpath(built, PurePosixPath(referrer).parent.as_posix() or ".").replace(os.sep, "/")
+
+    def _rewrite(self, rel: str, text: str) -> str:
+        def replace(match):
+            built = self._built_ref(rel, match.group("path"))
+            if built is None:
+                return match.group(0)
+            return f"{match.group('open')}{built}{match.group('close')}"
+
+        text = REFERENCE_PATTERN.sub(replace, text)
+        if rel.endswith(".html"):
+            text = IMG_TAG_PATTERN.sub(lambda m: self._add_srcset(rel, m.group(0)), text)
+        return text
+
+    def _add_srcset(self, rel: str, tag: str) -> str:
+        if "srcset=" in tag.lower():
+            return tag
+        src = IMG_SRC_PATTERN.search(tag)
+        if not src:
+            return tag
+        built_src = src.group("src")
+        original = next((o for o, b in self.assets.items() if built_src.endswith(b)), None)
+        variants = self.webp.get(original)
+        if not variants:
+            return tag
+        base = built_src[: len(built_src) - len(self.assets[original])]
+        srcset = ", ".join(f"{quote(base + v['path'])} {v['width']}w" for v in variants)
+        return tag[:-1].rstrip("/ ") + f' srcset="{srcset}" sizes="{IMG_SIZES}"' + (" />" if tag.endswith("/>") else ">")
+
+    def _write(self, rel: str, data: bytes) -> None:
+        target = self.out / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        if target.suffix.lower() in TEXT_SUFFIXES:
+            self._precompress(target, data)
+
+    @staticmethod
+    def _precompress(target: Path, data: bytes) -> None:
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(gz) < len(data):
+            target.with_name(target.name + ".gz").write_bytes(gz)
+        if brotli is not None:
+            br = brotli.compress(data, quality=11)
+            if len(br) < len(data):
+                target.with_name(target.name + ".br").write_bytes(br)
+
+    def _thumbnails(self, rel: str, digest: str) -> None:
+        if not rel.startswith("IMG/") or PurePosixPath(rel).suffix.lower() not in THUMB_SUFFIXES:
+            return
+        try:
+            image = Image.open(self.src / rel)
+            image.load()
+        except (OSError, Image.DecompressionBombError) as e:
+            print(f"Skipping thumbnails for {rel}: {e}", file=sys.stderr)
+            return
+        with image:
+            variants = []
+            source = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+            for width in THUMB_WIDTHS:
+                if width >= image.width:
+                    break
+                height = max(1, round(image.height * width / image.width))
+                thumb = source.resize((width, height), Image.LANCZOS)
+                path = _fingerprinted(rel, digest, f".w{width}.webp")
+                (self.out / path).parent.mkdir(parents=True, exist_ok=True)
+                thumb.save(self.out / path, "WEBP", quality=80, method=4)
+                variants.append({"width": width, "path": path})
+        if variants:
+            variants.append({"width": image.width, "path": self.assets[rel]})
+            self.webp[rel] = variants
+
+    def build(self) -> dict:
+        if self.out.exists():
+            shutil.rmtree(self.out)
+        self.out.mkdir(parents=True)
+
+        sources = self._sources()
+        # Binary assets first, then CSS/JS (which reference them), then HTML.
+        order = {".css": 1, ".js": 1, ".html": 2}
+        for rel in sorted(sources, key=lambda r: order.get(PurePosixPath(r).suffix.lower(), 0)):
+            suffix = PurePosixPath(rel).suffix.lower()
+            data = (self.src / rel).read_bytes()
+            if suffix in REWRITE_SUFFIXES:
+                data = self._rewrite(rel, data.decode("utf-8")).encode("utf-8")
+            if suffix == ".html":
+                self._write(rel, data)
+                continue
+            digest = _digest(data)
+            built = _fingerprinted(rel, digest)
+            self.assets[rel] = built
+            self._write(built, data)
+            self._thumbnails(rel, digest)
+
+        manifest = {"assets": self.assets, "webp": self.webp}
+        (self.out / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+        return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build fingerprinted, precompressed frontend assets.")
+    parser.add_argument("--src", type=Path, default=SRC_DIR)
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    manifest = AssetBuilder(args.src.resolve(), args.out.resolve()).build()
+    print(
+        f"Built {len(manifest['assets'])} assets, {sum(len(v) - 1 for v in manifest['webp'].values())} WebP "
+        f"thumbnails into {args.out}{'' if brotli else ' (install brotli for .br variants)'}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,157 @@
-import sqlite3
+"""Apply pending SQL migrations from backend/migrations to the configured database.
+
+Uses Config.SQLALCHEMY_DATABASE_URI (DATABASE_URL) with the same engine
+options and SQLite pragmas as the app. Applied versions are recorded in
+schema_migrations, and each migration runs in its own transaction.
+
+Files are applied in name order. `NNN_name.sql` applies to every database;
+a `NNN_name.<dialect>.sql` variant (for example `.postgresql.sql`) replaces it
+on that dialect. The bundled files are written for SQLite.
+
+    python backend/scripts/migrate.py            # apply pending migrations
+    python backend/scripts/migrate.py --seed     # ...then seed admin/intents
+    python backend/scripts/migrate.py --status   # list applied/pending
+"""
+import argparse
+import sys
 from pathlib import Path
 
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
 
 BASE_DIR = Path(__file__).resolve().parents[2]
-DB_PATH = BASE_DIR / "backend" / "app.db"
 MIGRATIONS_DIR = BASE_DIR / "backend" / "migrations"
 
+sys.path.insert(0, str(BASE_DIR))
+
+from backend.config import Config, _build_engine_options  # noqa: E402
+from backend.database import configure_engine  # noqa: E402
+
 
-def ensure_migrations_table(conn: sqlite3.Connection) -> None:
+def create_migration_engine(uri: str = Config.SQLALCHEMY_DATABASE_URI) -> Engine:
+    engine = create_engine(uri, **_build_engine_options(uri))
+    configure_engine(engine)
+    return engine
+
+
+def ensure_migrations_table(conn: Connection) -> None:
     conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS schema_migrations (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            version TEXT NOT NULL UNIQUE,
-            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                id INTEGER PRIMARY KEY,
+                version VARCHAR(255) NOT NULL UNIQUE,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+            """
         )
-        """
     )
-    conn.commit()
 
 
-def already_applied(conn: sqlite3.Connection, version: str) -> bool:
-    row = conn.execute(
-        "SELECT 1 FROM schema_migrations WHERE version = ? LIMIT 1", (version,)
-    ).fetchone()
-    return row is not None
+def applied_versions(conn: Connection) -> set[str]:
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def discover_migrations(dialect: str, migrations_dir: Path = MIGRATIONS_DIR) -> list[tuple[str, Path]]:
+    """Return (version, path) pairs; the version is always the generic file name."""
+    chosen: dict[str, Path] = {}
+    for path in sorted(migrations_dir.glob("*.sql")):
+        parts = path.name.split(".")
+        if len(parts) == 2:
+            chosen.setdefault(path.name, path)
+        elif len(parts) == 3 and parts[1] == dialect:
+            chosen[f"{parts[0]}.sql"] = path
+    return sorted(chosen.items())
+
+
+def split_statements(sql: str) -> list[str]:
+    """Split a script on semicolons that are outside quotes and comments."""
+    statements = []
+    current = []
+    quote = None
+    i = 0
+    while i < len(sql):
+        char = sql[i]
+        if quote:
+            current.append(char)
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+            current.append(char)
+        elif sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = len(sql) if end == -1 else end
+            continue
+        elif char == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
 
 
-def apply_migrations() -> None:
-    conn = sqlite3.connect(DB_PATH)
-    ensure_migrations_table(conn)
+def apply_migrations(engine: Engine | None = None) -> list[str]:
+    engine = engine or create_migration_engine()
+    with engine.begin() as conn:
+        ensure_migrations_table(conn)
+        done = applied_versions(conn)
 
-    migration_files = sorted(MIGRATIONS_DIR.glob("*.sql"))
-    for file_path in migration_files:
-        version = file_path.name
-        if already_applied(conn, version):
+    applied = []
+    for version, path in discover_migrations(engine.dialect.name):
+        if version in done:
             print(f"Skipping {version} (already applied)")
             continue
 
-        sql = file_path.read_text(encoding="utf-8")
-        conn.executescript(sql)
-        conn.execute("INSERT INTO schema_migrations (version) VALUES (?)", (version,))
-        conn.commit()
+        with engine.begin() as conn:
+            for statement in split_statements(path.read_text(encoding="utf-8")):
+                conn.exec_driver_sql(statement)
+            conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:version)"), {"version": version})
+        applied.append(version)
         print(f"Applied {version}")
 
-    conn.close()
-    print(f"Database ready: {DB_PATH}")
+    print(f"Database ready: {engine.url.render_as_string(hide_password=True)}")
+    return applied
+
+
+def print_status(engine: Engine) -> None:
+    with engine.begin() as conn:
+        ensure_migrations_table(conn)
+        done = applied_versions(conn)
+    for version, _ in discover_migrations(engine.dialect.name):
+        print(f"{'applied' if version in done else 'pending'}  {version}")
+
+
+def seed() -> None:
+    from backend import create_app, seed_defaults
+
+    app = create_app(bootstrap=False)
+    with app.app_context():
+        summary = seed_defaults()
+    print(f"Seed completed: {summary}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply pending SQL migrations.")
+    parser.add_argument("--seed", action="store_true", help="seed the default admin and intents afterwards")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying them")
+    args = parser.parse_args()
+
+    engine = create_migration_engine()
+    if args.status:
+        print_status(engine)
+        return
+    apply_migrations(engine)
+    engine.dispose()
+    if args.seed:
+        seed()
 
 
 if __name__ == "__main__":
-    apply_migrations()
+    main()
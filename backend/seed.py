@@ -1,28 +1,101 @@
+import hashlib
 import json
 import os
 
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError, OperationalError
+
 from backend.extensions import db
-from backend.models import AdminUser, Intent
+from backend.models import AdminUser, AppSetting
+from backend.services.intent_bulk_service import import_intents
+
+SEED_MARKER_KEY = "seed:intents_sha256"
+
+
+def _seed_digest(intents_json_path: str, admin_email: str) -> str:
+    digest = hashlib.sha256()
+    with open(intents_json_path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    digest.update(b"\0" + admin_email.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _is_lock_contention(exc: OperationalError) -> bool:
+    # SQLite reports a writer holding the lock past the busy timeout this way.
+    return "database is locked" in str(exc.orig or exc).lower()
+
+
+def _claim_seed_marker(digest: str) -> bool:
+    """Compare-and-set the seed marker inside the current transaction.
+
+    Only the worker whose insert/update wins goes on to seed; others see
+    the unique key or the changed value and back off. The claim is held by
+    the open write transaction until the caller commits.
+    """
+    current = db.session.get(AppSetting, SEED_MARKER_KEY)
+    if current is None:
+        db.session.add(AppSetting(key=SEED_MARKER_KEY, value=digest))
+        try:
+            db.session.flush()
+        except IntegrityError:
+            # Another worker inserted the marker first and is seeding.
+            db.session.rollback()
+            return False
+        return True
+    if current.value == digest:
+        return False
+    result = db.session.execute(
+        update(AppSetting)
+        .where(AppSetting.key == SEED_MARKER_KEY, AppSetting.value == current.value)
+        .values(value=digest)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
 
 
 def seed_database(
     admin_email: str = "admin@example.com",
     admin_password: str = "Admin@12345",
     intents_json_path: str = "backend/nlp/intents.json",
+    force: bool = False,
 ) -> dict:
+    """Seed the default admin and intents.json, skipping when nothing changed.
+
+    A sha256 of intents.json (plus the admin email) is stored in app_settings;
+    when it matches, seeding costs a single primary-key lookup. With force=True
+    the marker is ignored (used by the seed-admin CLI command).
+    """
     if not os.path.isabs(intents_json_path):
         intents_json_path = os.path.abspath(intents_json_path)
 
-    admin_created = False
-    if not AdminUser.query.filter_by(email=admin_email).first():
-        admin = AdminUser(email=admin_email)
-        admin.set_password(admin_password)
-        db.session.add(admin)
-        admin_created = True
+    summary = {"admin_created": False, "added": 0, "updated": 0, "skipped": False}
+    digest = _seed_digest(intents_json_path, admin_email)
+
+    try:
+        if not _claim_seed_marker(digest) and not force:
+            db.session.rollback()
+            summary["skipped"] = True
+            return summary
 
-    added, updated = sync_intents_from_file(intents_json_path, update_existing=False)
-    db.session.commit()
-    return {"admin_created": admin_created, "added": added, "updated": updated}
+        if not AdminUser.query.filter_by(email=admin_email).first():
+            admin = AdminUser(email=admin_email)
+            admin.set_password(admin_password)
+            db.session.add(admin)
+            summary["admin_created"] = True
+
+        summary["added"], summary["updated"] = sync_intents_from_file(intents_json_path, update_existing=False)
+        db.session.commit()
+    except OperationalError as exc:
+        db.session.rollback()
+        if not _is_lock_contention(exc):
+            raise  # missing table, readonly database, ...: not another worker seeding
+        # Another worker holds the write lock and is seeding.
+        summary["skipped"] = True
+    except Exception:
+        db.session.rollback()
+        raise
+    return summary
 
 
 def sync_intents_from_file(intents_json_path: str, update_existing: bool = False) -> tuple[int, int]:
@@ -32,26 +105,6 @@ def sync_intents_from_file(intents_json_path: str, update_existing: bool = False
     with open(intents_json_path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    added = 0
-    updated = 0
-
-    for item in data.get("intents", []):
-        tag = (item.get("tag") or "").strip()
-        if not tag:
-            continue
-
-        patterns = item.get("patterns", [])
-        responses = item.get("responses", [])
-
-        existing = Intent.query.filter_by(tag=tag).first()
-        if existing:
-            if update_existing:
-                existing.patterns = patterns
-                existing.responses = responses
-                updated += 1
-            continue
-
-        db.session.add(Intent(tag=tag, patterns=patterns, responses=responses))
-        added += 1
-
-    return added, updated
+    # One prefetch query plus batched inserts/updates; the caller commits.
+    report = import_intents(data.get("intents", []), update_existing=update_existing, commit=False)
+    return report["added"], report["updated"]
@@ -0,0 +1,146 @@
+import hashlib
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended import utils as jwt_utils
+from werkzeug.security import check_password_hash
+
+
+class LoginBusyError(Exception):
+    """All password-hash slots are taken; the caller should answer 503."""
+
+
+class PasswordChecker:
+    """Password hash checks on a small bounded thread pool.
+
+    Hash checks are deliberately slow CPU work. At most `workers` run at once
+    per process, `queue_size` more may wait, and anything beyond that fails
+    fast with LoginBusyError instead of piling up on request threads. hashlib
+    releases the GIL while hashing, so other requests keep running.
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 8, timeout: float = 5.0):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max(1, workers) + max(0, queue_size))
+
+    def check(self, password_hash: str, password: str) -> bool:
+        if not self._slots.acquire(blocking=False):
+            raise LoginBusyError()
+        try:
+            future = self._executor.submit(check_password_hash, password_hash, password)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the hash finishes, even if this request gives up waiting.
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise LoginBusyError() from None
+
+
+class VerifiedTokenCache:
+    """Claims of recently verified JWTs, keyed by a digest of the token.
+
+    Entries live for `ttl_seconds` and never past the token's own `exp`; the
+    least recently used are dropped beyond `max_entries`. Raw tokens are not
+    kept in memory.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def put(self, token: str, claims: dict) -> None:
+        expires = time.time() + self.ttl_seconds
+        if isinstance(claims.get("exp"), (int, float)):
+            expires = min(expires, claims["exp"])
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires, dict(claims))
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def decode_hook_supported() -> bool:
+    """Whether the installed flask_jwt_extended still decodes through the hook CachingJWTManager overrides.
+
+    Every token check goes through `utils.decode_token`, which calls
+    JWTManager._decode_jwt_from_config(encoded_token, csrf_value,
+    allow_expired) as of 4.7. The library has no public hook before
+    signature verification (the blocklist and claims loaders run after it),
+    so the private one is checked at startup rather than trusted.
+    """
+    method = getattr(JWTManager, "_decode_jwt_from_config", None)
+    if method is None or "_decode_jwt_from_config" not in jwt_utils.decode_token.__code__.co_names:
+        return False
+    params = list(inspect.signature(method).parameters)
+    return params[:4] == ["self", "encoded_token", "csrf_value", "allow_expired"]
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that skips re-verifying a token it verified moments ago.
+
+    Admin pages poll with the same bearer token; a cache hit costs one
+    blake2b digest instead of three base64/JSON decodes and the signature
+    check. Set JWT_VERIFY_CACHE_SECONDS=0 to verify every request. If the
+    installed flask_jwt_extended no longer decodes through the overridden
+    method, the cache is switched off at startup with a warning and tokens
+    are verified as usual.
+    """
+
+    def __init__(self, app=None, **kwargs):
+        self.token_cache = None
+        super().__init__(app, **kwargs)
+
+    def init_app(self, app) -> None:
+        super().init_app(app)
+        ttl = float(app.config.get("JWT_VERIFY_CACHE_SECONDS", 0))
+        size = int(app.config.get("JWT_VERIFY_CACHE_SIZE", 1024))
+        if ttl > 0 and not decode_hook_supported():
+            print("flask_jwt_extended decode hook changed; verified-token cache disabled.")
+            ttl = 0
+        self.token_cache = VerifiedTokenCache(ttl, size) if ttl > 0 else None
+
+    def _decode_jwt_from_config(self, encoded_token: str, *args, **kwargs) -> dict:
+        cache = self.token_cache
+        # Only the plain check is cached: no CSRF value, expired tokens rejected (any extra
+        # argument a newer release adds must also be falsy).
+        if cache is None or any(args) or any(kwargs.values()):
+            return super()._decode_jwt_from_config(encoded_token, *args, **kwargs)
+        claims = cache.get(encoded_token)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token, *args, **kwargs)
+            cache.put(encoded_token, claims)
+        return claims
@@ -0,0 +1,162 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+# Child of the Flask app logger ("backend"), so records reach its handlers.
+logger = logging.getLogger(__name__)
+
+
+class BufferedWriter:
+    """Write-behind buffer flushed by a background thread.
+
+    Rows are handed to `flush_fn` in lists of at most `batch_size`, either as
+    soon as a full batch is queued or every `flush_interval` seconds. When the
+    queue is full, `submit` returns False so the caller can write inline
+    instead of dropping data. Pending rows are flushed on `close()`, which is
+    also registered with atexit.
+
+    A batch whose write fails (say "database is locked") goes back to the
+    front of the queue and is retried after an exponential backoff starting
+    at `retry_backoff` seconds; it is only dropped, with an error logged,
+    after `max_retries` failed retries in a row. Requeued rows never push the
+    queue past `max_queue`: the oldest rows of the batch are dropped instead.
+
+    With `drop_oldest=True` the queue is a ring of `max_queue` rows for data
+    that may be lost but must never slow the caller down: `submit` appends
+    without taking the lock (deque appends are atomic), overwriting the
+    oldest row when full (counted in `dropped`), and only wakes the flusher
+    if the lock is free.
+    """
+
+    def __init__(
+        self,
+        flush_fn: Callable[[list[Any]], None],
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+        max_queue: int = 10000,
+        name: str = "buffered-writer",
+        drop_oldest: bool = False,
+        max_retries: int = 5,
+        retry_backoff: float = 0.5,
+    ):
+        self.flush_fn = flush_fn
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.01, flush_interval)
+        self.max_queue = max(self.batch_size, max_queue)
+        self.name = name
+        self.drop_oldest = drop_oldest
+        self.dropped = 0
+        self.max_retries = max(0, max_retries)
+        self.retry_backoff = max(0.01, retry_backoff)
+        self._failures = 0
+        self._retry_at = 0.0
+        self._queue: deque = deque(maxlen=self.max_queue if drop_oldest else None)
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row: Any) -> bool:
+        if self.drop_oldest:
+            return self._submit_ring(row)
+        with self._cond:
+            if self._closed or len(self._queue) >= self.max_queue:
+                return False
+            self._queue.append(row)
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _submit_ring(self, row: Any) -> bool:
+        if self._closed:
+            return False
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1  # approximate under concurrency
+        self._queue.append(row)
+        if len(self._queue) >= self.batch_size and self._cond.acquire(blocking=False):
+            try:
+                self._cond.notify()
+            finally:
+                self._cond.release()
+        return True
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def _take_batch(self) -> list[Any]:
+        with self._cond:
+            count = min(self.batch_size, len(self._queue))
+            return [self._queue.popleft() for _ in range(count)]
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of rows flushed."""
+        flushed = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return flushed
+                try:
+                    self.flush_fn(batch)
+                except Exception as e:
+                    if not self._retry_later(batch, e):
+                        continue
+                    return flushed
+                self._failures = 0
+                flushed += len(batch)
+
+    def _retry_later(self, batch: list[Any], error: Exception) -> bool:
+        """Requeue a failed batch; False when it ran out of retries and was dropped."""
+        self._failures += 1
+        if self._failures > self.max_retries:
+            logger.error("%s: dropping %d rows after %d failed writes: %s",
+                         self.name, len(batch), self._failures, error)
+            self._failures = 0
+            self.dropped += len(batch)
+            return False
+        delay = min(30.0, self.retry_backoff * 2 ** (self._failures - 1))
+        with self._cond:
+            room = max(0, self.max_queue - len(self._queue))
+            if room < len(batch):
+                self.dropped += len(batch) - room
+                logger.warning("%s: queue full, dropping %d of %d rows to retry",
+                               self.name, len(batch) - room, len(batch))
+                batch = batch[len(batch) - room:]
+            self._queue.extendleft(reversed(batch))
+            self._retry_at = time.monotonic() + delay
+        logger.warning("%s: failed to write %d rows (attempt %d), retrying in %.2fs: %s",
+                       self.name, len(batch), self._failures, delay, error)
+        return True
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            with self._cond:
+                while not self._closed:
+                    # A full batch goes out at once, unless a failed write is backing off.
+                    until = deadline if len(self._queue) < self.batch_size else self._retry_at
+                    remaining = max(until, self._retry_at) - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                closed = self._closed
+            self.flush()
+            deadline = time.monotonic() + self.flush_interval
+            if closed:
+                return
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=max(5.0, self.flush_interval * 2))
+        self.flush()
+        if self._queue:
+            logger.error("%s: %d rows not written at shutdown", self.name, len(self._queue))
@@ -0,0 +1,225 @@
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from backend.config import Config
+from backend.nlp.text_normalizer import tokenize
+from backend.services.buffered_writer import BufferedWriter
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def message_hash(message: str) -> str:
+    """Hash of the tokenized message, so case, punctuation and spacing variants group together."""
+    normalized = " ".join(tokenize(message))
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class SQLiteChatLogSink:
+    """chat_log rows in a SQLite file of their own (WAL), shared by all workers."""
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str, retention_days: float = 30):
+        self.path = path
+        self.retention_days = retention_days
+        self._local = threading.local()
+        self._batches = 0
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chat_log (
+                id INTEGER PRIMARY KEY,
+                created_at REAL NOT NULL,
+                message_hash TEXT NOT NULL,
+                message TEXT,
+                tag TEXT,
+                tier TEXT,
+                score REAL NOT NULL,
+                latency_ms REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_chat_log_created_at ON chat_log (created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_chat_log_tier_created_at ON chat_log (tier, created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def write(self, rows: list[dict]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                """
+                INSERT INTO chat_log (created_at, message_hash, message, tag, tier, score, latency_ms)
+                VALUES (:created_at, :message_hash, :message, :tag, :tier, :score, :latency_ms)
+                """,
+                rows,
+            )
+        self._batches += 1
+        if self.retention_days and self._batches % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM chat_log WHERE created_at < ?", (time.time() - self.retention_days * 86400,))
+
+    def top_unanswered(self, since: float, limit: int) -> list[dict]:
+        rows = self._connect().execute(
+            """
+            SELECT message_hash, MAX(message), COUNT(*), MAX(created_at)
+            FROM chat_log
+            WHERE tier = 'fallback' AND created_at >= ?
+            GROUP BY message_hash
+            ORDER BY COUNT(*) DESC, MAX(created_at) DESC
+            LIMIT ?
+            """,
+            (since, limit),
+        ).fetchall()
+        return [
+            {"message_hash": row[0], "message": row[1], "count": row[2], "last_seen": _iso(row[3])}
+            for row in rows
+        ]
+
+
+class NDJSONChatLogSink:
+    """One JSON object per line in CHAT_LOG_DIR, a file per worker process.
+
+    `chat-<pid>.ndjson` is renamed to `chat-<pid>-<time>.ndjson` once it
+    passes `rotate_bytes`; only the newest `keep_files` rotated files are kept.
+    """
+
+    def __init__(self, directory: str, rotate_bytes: int = 10 * 1024 * 1024, keep_files: int = 10):
+        self.directory = directory
+        self.rotate_bytes = max(1024, rotate_bytes)
+        self.keep_files = max(1, keep_files)
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self) -> str:
+        return os.path.join(self.directory, f"chat-{os.getpid()}.ndjson")
+
+    def write(self, rows: list[dict]) -> None:
+        path = self._path()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+            size = f.tell()
+        if size >= self.rotate_bytes:
+            os.replace(path, os.path.join(self.directory, f"chat-{os.getpid()}-{time.time_ns()}.ndjson"))
+            rotated = sorted(
+                glob.glob(os.path.join(self.directory, "chat-*-*.ndjson")), key=os.path.getmtime
+            )
+            for old in rotated[:-self.keep_files]:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    def top_unanswered(self, since: float, limit: int) -> list[dict]:
+        counts: Counter = Counter()
+        samples: dict[str, str | None] = {}
+        last_seen: dict[str, float] = {}
+        for path in glob.glob(os.path.join(self.directory, "chat-*.ndjson")):
+            if os.path.getmtime(path) < since:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    if row.get("tier") != "fallback" or row.get("created_at", 0) < since:
+                        continue
+                    key = row["message_hash"]
+                    counts[key] += 1
+                    samples[key] = row.get("message") or samples.get(key)
+                    last_seen[key] = max(last_seen.get(key, 0), row["created_at"])
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], -last_seen[item[0]]))[:limit]
+        return [
+            {"message_hash": key, "message": samples[key], "count": count, "last_seen": _iso(last_seen[key])}
+            for key, count in ranked
+        ]
+
+
+class ChatLogService:
+    """Records every chat request (message, tag, tier, score, latency) off the request path.
+
+    `record` only appends to an in-memory ring (a BufferedWriter with
+    drop_oldest); a background thread writes batches to the CHAT_LOG_BACKEND
+    sink. When the sink falls behind, the oldest unwritten rows are dropped
+    rather than the request waiting. The sink is opened on first use.
+    """
+
+    def __init__(self):
+        self._writer = None
+        self._sink = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return Config.CHAT_LOG_BACKEND in ("sqlite", "ndjson")
+
+    def _get_writer(self) -> BufferedWriter:
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    if Config.CHAT_LOG_BACKEND == "ndjson":
+                        self._sink = NDJSONChatLogSink(
+                            Config.CHAT_LOG_DIR, Config.CHAT_LOG_ROTATE_BYTES, Config.CHAT_LOG_KEEP_FILES
+                        )
+                    else:
+                        os.makedirs(os.path.dirname(Config.CHAT_LOG_DB_PATH) or ".", exist_ok=True)
+                        self._sink = SQLiteChatLogSink(Config.CHAT_LOG_DB_PATH, Config.CHAT_LOG_RETENTION_DAYS)
+                    self._writer = BufferedWriter(
+                        self._sink.write,
+                        batch_size=Config.CHAT_LOG_BATCH_SIZE,
+                        flush_interval=Config.CHAT_LOG_FLUSH_INTERVAL,
+                        max_queue=Config.CHAT_LOG_BUFFER_SIZE,
+                        name="chat-log-writer",
+                        drop_oldest=True,
+                    )
+        return self._writer
+
+    def record(self, message: str, result: dict, latency_seconds: float) -> None:
+        if not self.enabled:
+            return
+        message = (message or "").strip()
+        self._get_writer().submit({
+            "created_at": time.time(),
+            "message_hash": message_hash(message),
+            "message": message[:Config.CHAT_LOG_MAX_TEXT] if Config.CHAT_LOG_STORE_TEXT else None,
+            "tag": result.get("tag"),
+            "tier": result.get("tier"),
+            "score": float(result.get("score") or 0.0),
+            "latency_ms": round(latency_seconds * 1000, 3),
+        })
+
+    def top_unanswered(self, limit: int = 20, hours: float = 168) -> dict:
+        """Most frequent messages answered by the fallback tier in the last `hours`."""
+        if not self.enabled:
+            return {"backend": "off", "queries": []}
+        writer = self._get_writer()
+        writer.flush()  # include this worker's buffered rows
+        queries = self._sink.top_unanswered(time.time() - hours * 3600, limit)
+        return {
+            "backend": Config.CHAT_LOG_BACKEND,
+            "queries": queries,
+            "pending": writer.pending(),
+            "dropped": writer.dropped,
+        }
+
+    def flush(self) -> int:
+        return self._writer.flush() if self._writer else 0
+
+
+chat_log = ChatLogService()
@@ -1,36 +1,237 @@
 # backend/services/chat_service.py
+import threading
+import time
+
 from backend.config import Config
 
+from backend.nlp.response_selector import create_selector
+from backend.nlp.text_normalizer import TextNormalizer
 # Two possible engines: rule-based and ML wrapper
 from backend.nlp.rule_based import ChatbotAssistant as RuleAssistant
 from backend.services.intent_service import IntentService
+from backend.services.session_store import create_session_store
+from backend.services.shared_intent_index import create_shared_intent_index
+
+FALLBACK_TEXT = "I'm sorry, I didn't catch that. Could you rephrase?"
+TIERS = ("exact", "keyword", "jaccard", "semantic", "ml", "fallback")
+
+
+class TierStats:
+    """Thread-safe per-tier call/hit counters and cumulative latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tiers = {name: {"calls": 0, "hits": 0, "seconds": 0.0} for name in TIERS}
+            self._requests = 0
+
+    def record(self, tier: str, elapsed: float, hit: bool) -> None:
+        with self._lock:
+            entry = self._tiers[tier]
+            entry["calls"] += 1
+            entry["seconds"] += elapsed
+            if hit:
+                entry["hits"] += 1
+
+    def record_hit(self, tier: str) -> None:
+        with self._lock:
+            self._tiers[tier]["hits"] += 1
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._requests += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            requests = self._requests
+            tiers = {}
+            for name, entry in self._tiers.items():
+                calls = entry["calls"]
+                tiers[name] = {
+                    "calls": calls,
+                    "hits": entry["hits"],
+                    "hit_rate": round(entry["hits"] / requests, 4) if requests else 0.0,
+                    "avg_latency_ms": round(entry["seconds"] * 1000 / calls, 4) if calls else 0.0,
+                }
+        return {"requests": requests, "tiers": tiers}
+
+
+tier_stats = TierStats()
+
 
 class ChatService:
+    """Tiered router: exact -> keyword -> Jaccard -> semantic -> ML, cheapest first.
+
+    DB intents are the answer source when any exist (admin edits apply
+    immediately); otherwise the bundled intents.json is used. The semantic
+    and ML tiers are only consulted when the Jaccard score is below
+    CHAT_JACCARD_THRESHOLD. The semantic index follows the answer source:
+    whenever its response table is rebuilt, only the changed intents are
+    re-embedded.
+    Tiers only resolve a tag; the reply comes from that source's response
+    table via CHAT_RESPONSE_STRATEGY.
+    """
+
     def __init__(self):
-        self.intent_service = IntentService()
+        self.selector = create_selector(
+            Config.CHAT_RESPONSE_STRATEGY, Config.CHAT_RESPONSE_SEED, Config.CHAT_RESPONSE_WEIGHT_DECAY
+        )
+        self.normalizer = TextNormalizer(
+            Config.CHAT_STEMMER, Config.CHAT_SPELL_CORRECTION, Config.CHAT_TOKEN_CACHE_SIZE
+        )
+        self.intent_service = IntentService(self.selector, create_shared_intent_index(), self.normalizer)
+        self.sessions = create_session_store()
         intents_path = Config.INTENTS_PATH
+        self.rule_engine = RuleAssistant(intents_path, self.selector, self.normalizer)
+        self.semantic_engine = None
+        self._semantic_table = None
+        self._semantic_lock = threading.Lock()
+        if Config.USE_SEMANTIC:
+            from backend.nlp.semantic_engine import ChatbotSemantic
+            self.semantic_engine = ChatbotSemantic(dim=Config.SEMANTIC_DIM,
+                                                   normalizer=self.normalizer,
+                                                   ann_min_rows=Config.SEMANTIC_ANN_MIN_ROWS,
+                                                   ann_probes=Config.SEMANTIC_ANN_PROBES)
+            print("Semantic tier enabled.")
+        self.ml_engine = None
         if Config.USE_ML:
-            # Try ML engine; fallback to rule-based if ML fails
+            # ML is optional; the cheaper tiers keep working without it.
             try:
                 from backend.nlp.ml_engine import ChatbotML
-                self.engine = ChatbotML(model_path=Config.ML_MODEL_PATH,
-                                       dims_path=Config.ML_DIMENSIONS_PATH,
-                                       intents_path=intents_path)
-                print("Using ML engine.")
+                self.ml_engine = ChatbotML(model_path=Config.ML_MODEL_PATH,
+                                           dims_path=Config.ML_DIMENSIONS_PATH,
+                                           intents_path=intents_path,
+                                           selector=self.selector,
+                                           normalizer=self.normalizer)
+                print("ML tier enabled.")
             except Exception as e:
                 print("Failed to initialize ML engine:", e)
-                print("Falling back to rule-based engine.")
-                self.engine = RuleAssistant(intents_path)
-        else:
-            self.engine = RuleAssistant(intents_path)
+                print("Continuing with exact/keyword/Jaccard tiers only.")
 
-    def get_response(self, message: str) -> str:
-        # Admin updates are stored in DB and should take effect immediately.
+    def _source(self):
+        """(matcher, response table): DB intents when any exist, else the bundled file.
+
+        Resolved once per message; every tier matches against this pair.
+        """
         try:
-            db_intents = self.intent_service.get_intents()
-            if db_intents:
-                return self.intent_service.get_response(message)
+            snapshot = self.intent_service.snapshot()
+            if snapshot is not None:
+                return snapshot
         except Exception:
-            # If DB is unavailable, fallback to the previous file/ML behavior.
+            # If DB is unavailable, fallback to the bundled intents file.
             pass
-        return self.engine.get_response(message)
+        return self.rule_engine, self.rule_engine.response_table
+
+    def _semantic_predict(self, source, table, message: str) -> tuple[str | None, float]:
+        if self._semantic_table is not table:
+            with self._semantic_lock:
+                if self._semantic_table is not table:
+                    if source is self.rule_engine:
+                        records = self.rule_engine.intents
+                    else:
+                        records = self.intent_service.current_records()
+                    self.semantic_engine.sync(records)
+                    self._semantic_table = table
+        return self.semantic_engine.predict(message)
+
+    @staticmethod
+    def _timed(fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        return result, time.perf_counter() - started
+
+    def _followup_boosts(self, session_id: str | None) -> dict[str, float]:
+        if not session_id:
+            return {}
+        boosts = {}
+        weight = Config.SESSION_FOLLOWUP_BOOST
+        for tag in reversed(self.sessions.get_history(session_id)):
+            boosts.setdefault(tag, weight)
+            weight /= 2
+        return boosts
+
+    def resolve(self, message: str, session_id: str | None = None) -> dict:
+        """Return {"tag", "tier", "score", "response"} for a user message."""
+        result = self._resolve(message, session_id)
+        if session_id and result["tag"] and result["tier"] != "fallback":
+            self.sessions.record(session_id, result["tag"])
+        return result
+
+    def _resolve(self, message: str, session_id: str | None) -> dict:
+        message = (message or "").strip()
+        if not message:
+            return {"tag": None, "tier": None, "score": 0.0, "response": "Please type a message."}
+
+        tier_stats.record_request()
+        source, table = self._source()
+
+        # 1) Exact normalized pattern match.
+        tag, elapsed = self._timed(source.match_exact, message)
+        hit = table.id_for(tag) is not None
+        tier_stats.record("exact", elapsed, hit)
+        if hit:
+            return self._answer(table, tag, "exact", 1.0, session_id)
+
+        # 2) Explicit keyword rules.
+        tag, elapsed = self._timed(self.rule_engine.match_keyword, message)
+        hit = table.id_for(tag) is not None
+        tier_stats.record("keyword", elapsed, hit)
+        if hit:
+            return self._answer(table, tag, "keyword", 1.0, session_id)
+
+        # 3) Jaccard token overlap. Session boosts only break ties between intents that are
+        # confident on their own; the score judged below is always the unboosted one.
+        (jaccard_tag, jaccard_score), elapsed = self._timed(
+            source.match_overlap, message, self._followup_boosts(session_id), Config.CHAT_JACCARD_THRESHOLD
+        )
+        jaccard_hit = jaccard_score > 0 and table.id_for(jaccard_tag) is not None
+        confident = jaccard_hit and jaccard_score >= Config.CHAT_JACCARD_THRESHOLD
+        tier_stats.record("jaccard", elapsed, confident)
+        if confident:
+            return self._answer(table, jaccard_tag, "jaccard", jaccard_score, session_id)
+
+        # 4) Semantic similarity, for paraphrases sharing few exact words.
+        if self.semantic_engine is not None:
+            (semantic_tag, semantic_score), elapsed = self._timed(self._semantic_predict, source, table, message)
+            hit = semantic_score >= Config.CHAT_SEMANTIC_THRESHOLD and table.id_for(semantic_tag) is not None
+            tier_stats.record("semantic", elapsed, hit)
+            if hit:
+                return self._answer(table, semantic_tag, "semantic", semantic_score, session_id)
+
+        # 5) ML model, only for messages the cheap tiers are unsure about.
+        if self.ml_engine is not None:
+            (ml_tag, ml_score), elapsed = self._timed(self.ml_engine.predict, message)
+            ml_table = None
+            if ml_score >= Config.CHAT_ML_THRESHOLD:
+                # The model is trained on the bundled file, so its tags may only exist there.
+                for candidate in (table, self.rule_engine.response_table):
+                    if candidate.id_for(ml_tag) is not None:
+                        ml_table = candidate
+                        break
+            tier_stats.record("ml", elapsed, ml_table is not None)
+            if ml_table is not None:
+                return self._answer(ml_table, ml_tag, "ml", ml_score, session_id)
+
+        # A weak overlap still beats the generic fallback.
+        if jaccard_hit:
+            tier_stats.record_hit("jaccard")
+            return self._answer(table, jaccard_tag, "jaccard", jaccard_score, session_id)
+
+        tier_stats.record("fallback", 0.0, True)
+        if table.id_for("fallback") is not None:
+            return self._answer(table, "fallback", "fallback", 0.0, session_id)
+        return {"tag": None, "tier": "fallback", "score": 0.0, "response": FALLBACK_TEXT}
+
+    def _answer(self, table, tag: str, tier: str, score: float, session_id: str | None) -> dict:
+        return {
+            "tag": tag,
+            "tier": tier,
+            "score": round(float(score), 4),
+            "response": self.selector.choose(table, tag, session_id),
+        }
+
+    def get_response(self, message: str, session_id: str | None = None) -> str:
+        return self.resolve(message, session_id)["response"]
@@ -0,0 +1,240 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import insert, update
+
+from backend.extensions import db
+from backend.models import Intent
+from backend.services.intent_pattern_service import IntentPatternService
+from backend.services.table_version_service import table_versions
+
+SUPPORTED_FORMATS = ("json", "ndjson", "csv")
+CSV_FIELDS = ("tag", "patterns", "responses")
+
+
+class BulkImportError(ValueError):
+    """Raised when an import payload cannot be parsed at all."""
+
+
+class InvalidLine:
+    """Placeholder for an NDJSON line that is not valid JSON; skipped and reported on import."""
+
+    __slots__ = ("line", "error")
+
+    def __init__(self, line: int, error: str):
+        self.line = line
+        self.error = error
+
+
+def detect_format(filename: str | None = None, content_type: str | None = None, default: str = "json") -> str:
+    name = (filename or "").lower()
+    for fmt, suffixes in (("ndjson", (".ndjson", ".jsonl")), ("csv", (".csv",)), ("json", (".json",))):
+        if name.endswith(suffixes):
+            return fmt
+    content_type = (content_type or "").lower()
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    if "csv" in content_type:
+        return "csv"
+    return default
+
+
+def _split_cell(value: str) -> list[str]:
+    # CSV cells hold either a JSON array or "|"-separated text.
+    value = (value or "").strip()
+    if value.startswith("["):
+        try:
+            parsed = json.loads(value)
+            if isinstance(parsed, list):
+                return parsed
+        except ValueError:
+            pass
+    return [x for x in value.split("|")] if value else []
+
+
+def _parse_ndjson(raw: str) -> list[Any]:
+    records: list[Any] = []
+    for number, line in enumerate(raw.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError as exc:
+            records.append(InvalidLine(number, f"Invalid JSON on line {number}: {exc.msg}."))
+    return records
+
+
+def parse_records(raw: str | bytes, fmt: str) -> list[Any]:
+    """Parse a JSON ({"intents": [...]} or a bare list), NDJSON or CSV payload.
+
+    NDJSON is parsed line by line: a line that is not valid JSON becomes an
+    InvalidLine that import_intents skips and reports, instead of failing the
+    whole payload.
+    """
+    if fmt not in SUPPORTED_FORMATS:
+        raise BulkImportError(f"Unsupported format '{fmt}'. Use one of: {', '.join(SUPPORTED_FORMATS)}.")
+    if isinstance(raw, bytes):
+        try:
+            raw = raw.decode("utf-8-sig")
+        except UnicodeDecodeError as exc:
+            raise BulkImportError(f"Payload is not valid UTF-8: {exc}") from exc
+
+    try:
+        if fmt == "json":
+            data = json.loads(raw or "[]")
+            records = data.get("intents", []) if isinstance(data, dict) else data
+        elif fmt == "ndjson":
+            records = _parse_ndjson(raw)
+        else:
+            records = [
+                {
+                    "tag": row.get("tag"),
+                    "patterns": _split_cell(row.get("patterns")),
+                    "responses": _split_cell(row.get("responses")),
+                }
+                for row in csv.DictReader(io.StringIO(raw))
+            ]
+    except (ValueError, csv.Error) as exc:
+        raise BulkImportError(f"Could not parse {fmt} payload: {exc}") from exc
+
+    if not isinstance(records, list):
+        raise BulkImportError("Payload must contain a list of intents.")
+    return records
+
+
+def _normalize_record(item: Any) -> tuple[dict | None, str]:
+    if isinstance(item, InvalidLine):
+        return None, item.error
+    if not isinstance(item, dict):
+        return None, "Intent must be an object."
+    tag = str(item.get("tag") or "").strip()
+    patterns = item.get("patterns") or []
+    responses = item.get("responses") or []
+    if not tag:
+        return None, "Tag is required."
+    if len(tag) > 100:
+        return None, "Tag must be at most 100 characters."
+    if not isinstance(patterns, list) or not all(isinstance(x, str) for x in patterns):
+        return None, "Patterns must be a list of strings."
+    if not isinstance(responses, list) or not all(isinstance(x, str) for x in responses):
+        return None, "Responses must be a list of strings."
+    responses = [x.strip() for x in responses if x.strip()]
+    if not responses:
+        return None, "At least one response is required."
+    return {"tag": tag, "patterns": [x.strip() for x in patterns if x.strip()], "responses": responses}, ""
+
+
+def import_intents(
+    records: Iterable[Any],
+    update_existing: bool = True,
+    batch_size: int = 500,
+    commit: bool = True,
+) -> dict[str, Any]:
+    """Upsert intents in batches inside one transaction.
+
+    Existing intents are prefetched with a single query; inserts and updates
+    are then issued as executemany batches. Unchanged intents, duplicates
+    within the payload and (with update_existing=False) existing tags are
+    counted as skipped. Invalid records are skipped and reported in `errors`.
+    """
+    existing = {
+        row.tag: row
+        for row in db.session.query(Intent.id, Intent.tag, Intent.patterns, Intent.responses)
+    }
+    seen: set[str] = set()
+    to_insert: list[dict] = []
+    to_update: list[dict] = []
+    changed: list[str] = []
+    report = {"added": 0, "updated": 0, "skipped": 0, "errors": []}
+    now = datetime.utcnow()
+
+    for position, item in enumerate(records, start=1):
+        record, error = _normalize_record(item)
+        if record is None:
+            report["skipped"] += 1
+            if len(report["errors"]) < 100:
+                entry = {"index": position, "error": error}
+                if isinstance(item, InvalidLine):
+                    entry["line"] = item.line
+                report["errors"].append(entry)
+            continue
+
+        tag = record["tag"]
+        if tag in seen:
+            report["skipped"] += 1
+            continue
+        seen.add(tag)
+
+        current = existing.get(tag)
+        if current is None:
+            to_insert.append({**record, "created_at": now, "updated_at": now})
+            report["added"] += 1
+        elif not update_existing or (
+            (current.patterns or []) == record["patterns"] and (current.responses or []) == record["responses"]
+        ):
+            report["skipped"] += 1
+        else:
+            changed.append(tag)
+            to_update.append(
+                {"id": current.id, "patterns": record["patterns"], "responses": record["responses"], "updated_at": now}
+            )
+            report["updated"] += 1
+
+    try:
+        for start in range(0, len(to_insert), batch_size):
+            db.session.execute(insert(Intent), to_insert[start:start + batch_size])
+        for start in range(0, len(to_update), batch_size):
+            db.session.execute(update(Intent), to_update[start:start + batch_size])
+        changed_tags = [row["tag"] for row in to_insert] + changed
+        IntentPatternService().sync_tags(changed_tags)
+        if changed_tags:
+            table_versions.bump("intents")
+        if commit:
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return report
+
+
+def iter_export(fmt: str = "json", chunk_size: int = 500) -> Iterator[str]:
+    """Stream every intent, ordered by tag, without materializing the table."""
+    if fmt not in SUPPORTED_FORMATS:
+        raise BulkImportError(f"Unsupported format '{fmt}'. Use one of: {', '.join(SUPPORTED_FORMATS)}.")
+
+    rows = (
+        db.session.query(Intent.tag, Intent.patterns, Intent.responses)
+        .order_by(Intent.tag.asc())
+        .execution_options(yield_per=chunk_size)
+    )
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_FIELDS)
+        for row in rows:
+            writer.writerow([row.tag, json.dumps(row.patterns or []), json.dumps(row.responses or [])])
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+        return
+
+    first = True
+    if fmt == "json":
+        # Same shape as backend/nlp/intents.json so exports can be re-seeded.
+        yield '{"intents": ['
+    for row in rows:
+        item = json.dumps({"tag": row.tag, "patterns": row.patterns or [], "responses": row.responses or []})
+        if fmt == "ndjson":
+            yield item + "\n"
+        else:
+            yield ("\n  " if first else ",\n  ") + item
+        first = False
+    if fmt == "json":
+        yield "\n]}\n"
@@ -0,0 +1,196 @@
+import threading
+import time
+from typing import Any
+
+import numpy as np
+
+from backend.config import Config
+from backend.nlp.text_normalizer import TextNormalizer
+from backend.services.intent_service import IntentService
+
+# Memo of triu_indices per posting length; lengths repeat a lot.
+_PAIR_INDEX_CACHE: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _pair_indices(count: int) -> tuple[np.ndarray, np.ndarray]:
+    pairs = _PAIR_INDEX_CACHE.get(count)
+    if pairs is None:
+        pairs = np.triu_indices(count, 1)
+        if count <= 256:
+            _PAIR_INDEX_CACHE[count] = pairs
+    return pairs
+
+
+def similar_pairs(token_sets: list[list[int]], vocab_size: int, threshold: float, common_df: int,
+                  block: int = 1024):
+    """Pairs of rows whose token-set Jaccard is at least `threshold` (> 0).
+
+    `token_sets[i]` holds the distinct token ids of row i. The shared-token
+    counts are the off-diagonal of A·Aᵀ for the sparse row x token incidence
+    matrix A, split by token frequency:
+
+    - rare tokens (in at most `common_df` rows): taken over the postings;
+      every token contributes the pairs of rows containing it and counting
+      equal pair keys gives the shared count. These pairs are the candidates.
+    - common tokens ("tell", "me", "about"): a dense row x common-token
+      matrix C. Their shared count is added to each candidate from C, and
+      pairs sharing only common tokens come from C·Cᵀ in row blocks, over
+      the rows that can reach `threshold` that way: Jaccard is at most
+      shared / max(size), so both rows must be at least `threshold` common
+      tokens (the "tell me about X" templates).
+
+    Returns (left, right, shared, similarity) arrays with left < right.
+    """
+    empty = (np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.float32))
+    rows = len(token_sets)
+    if rows < 2:
+        return empty
+    sizes = np.fromiter((len(tokens) for tokens in token_sets), dtype=np.int64, count=rows)
+    row_of = np.repeat(np.arange(rows, dtype=np.int64), sizes)
+    token_of = np.fromiter((t for tokens in token_sets for t in tokens), dtype=np.int64, count=int(sizes.sum()))
+    df = np.bincount(token_of, minlength=vocab_size)
+
+    # Postings: rows grouped by token, ascending within each token.
+    order = np.lexsort((row_of, token_of))
+    postings = row_of[order]
+    bounds = np.concatenate([[0], np.cumsum(df)])
+    keys = [np.zeros(0, np.int64)]
+    for token in np.flatnonzero((df >= 2) & (df <= common_df)).tolist():
+        members = postings[bounds[token]:bounds[token + 1]]
+        left, right = _pair_indices(len(members))
+        keys.append(members[left] * rows + members[right])
+    pair_keys, shared = np.unique(np.concatenate(keys), return_counts=True)
+
+    common = np.flatnonzero(df > common_df)
+    if len(common):
+        column = np.full(vocab_size, -1, dtype=np.int64)
+        column[common] = np.arange(len(common))
+        dense = np.zeros((rows, len(common)), dtype=np.float32)
+        mask = column[token_of] >= 0
+        dense[row_of[mask], column[token_of[mask]]] = 1
+        left, right = np.divmod(pair_keys, rows)
+        for start in range(0, len(pair_keys), 1 << 16):
+            stop = start + (1 << 16)
+            shared[start:stop] += np.einsum(
+                "ij,ij->i", dense[left[start:stop]], dense[right[start:stop]]
+            ).astype(np.int64)
+
+        templated = np.flatnonzero(dense.sum(axis=1) >= threshold * sizes)
+        extra_keys, extra_shared = [], []
+        templates = dense[templated]
+        for start in range(0, len(templated), block):
+            # Each block against itself and every later row; j > i keeps each pair once.
+            counts = templates[start:start + block] @ templates[start:].T
+            i, j = np.nonzero(counts)
+            keep = j > i
+            i, j = i[keep], j[keep]
+            left, right = templated[start + i], templated[start + j]
+            count = counts[i, j].astype(np.int64)
+            similar = count >= threshold * (sizes[left] + sizes[right] - count)
+            extra_keys.append(left[similar] * rows + right[similar])
+            extra_shared.append(count[similar])
+        if extra_keys:
+            extra_keys = np.concatenate(extra_keys)
+            extra_shared = np.concatenate(extra_shared)
+            # Pairs that also share a rare token are already candidates, with the full count.
+            new = ~np.isin(extra_keys, pair_keys)
+            pair_keys = np.concatenate([pair_keys, extra_keys[new]])
+            shared = np.concatenate([shared, extra_shared[new]])
+
+    left, right = np.divmod(pair_keys, rows)
+    similarity = (shared / (sizes[left] + sizes[right] - shared)).astype(np.float32)
+    keep = similarity >= threshold
+    return left[keep], right[keep], shared[keep], similarity[keep]
+
+
+class IntentOverlapService:
+    """Near-duplicate intents and conflicting patterns across all DB intents.
+
+    Intents and patterns are compared as sets of the terms the chat path
+    matches on (same stemming, no spelling correction), so a reported pair
+    is one the Jaccard tier has trouble telling apart. The last report is
+    kept until the intents table version or the parameters change.
+    """
+
+    def __init__(self, normalizer: TextNormalizer | None = None):
+        self.normalizer = normalizer or TextNormalizer(Config.CHAT_STEMMER, spelling=False)
+        self.intent_service = IntentService(normalizer=self.normalizer)
+        self._cached: tuple[tuple, dict[str, Any]] | None = None
+        self._lock = threading.Lock()
+
+    def report(self, version: int, intent_threshold: float = 0.8, pattern_threshold: float = 0.8,
+               limit: int = 100) -> dict[str, Any]:
+        key = (version, intent_threshold, pattern_threshold, limit)
+        cached = self._cached
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with self._lock:
+            if self._cached is None or self._cached[0] != key:
+                result = self.analyze(self.intent_service.get_records(), intent_threshold, pattern_threshold, limit)
+                self._cached = (key, result)
+            return self._cached[1]
+
+    def analyze(self, records, intent_threshold: float = 0.8, pattern_threshold: float = 0.8,
+                limit: int = 100) -> dict[str, Any]:
+        started = time.perf_counter()
+        token_ids: dict[str, int] = {}
+        intent_sets: list[list[int]] = []
+        pattern_sets: list[list[int]] = []
+        pattern_owner: list[int] = []
+        pattern_text: list[str] = []
+        for intent_id, record in enumerate(records):
+            intent_tokens = set()
+            for pattern in record.patterns:
+                tokens = {token_ids.setdefault(term, len(token_ids)) for term in self.normalizer.terms(pattern)}
+                if not tokens:
+                    continue
+                intent_tokens |= tokens
+                pattern_sets.append(sorted(tokens))
+                pattern_owner.append(intent_id)
+                pattern_text.append(pattern)
+            intent_sets.append(sorted(intent_tokens))
+
+        def common_df(rows: int) -> int:
+            return max(50, rows // 100)
+
+        left, right, shared, similarity = similar_pairs(
+            intent_sets, len(token_ids), intent_threshold, common_df(len(intent_sets))
+        )
+        intent_pairs = len(similarity)
+        ranked = np.lexsort((left, -similarity))[:limit]
+        intents = [
+            {
+                "tags": [records[left[i]].tag, records[right[i]].tag],
+                "similarity": round(float(similarity[i]), 4),
+                "shared_tokens": int(shared[i]),
+            }
+            for i in ranked.tolist()
+        ]
+
+        left, right, shared, similarity = similar_pairs(
+            pattern_sets, len(token_ids), pattern_threshold, common_df(len(pattern_sets))
+        )
+        owners = np.asarray(pattern_owner, dtype=np.int64)
+        across = owners[left] != owners[right]
+        left, right, similarity = left[across], right[across], similarity[across]
+        ranked = np.lexsort((left, -similarity))[:limit]
+        patterns = [
+            {
+                "similarity": round(float(similarity[i]), 4),
+                "patterns": [
+                    {"tag": records[pattern_owner[left[i]]].tag, "pattern": pattern_text[left[i]]},
+                    {"tag": records[pattern_owner[right[i]]].tag, "pattern": pattern_text[right[i]]},
+                ],
+            }
+            for i in ranked.tolist()
+        ]
+
+        return {
+            "intents": len(intent_sets),
+            "patterns": len(pattern_sets),
+            "near_duplicate_intents": intents,
+            "near_duplicate_intent_count": intent_pairs,
+            "conflicting_patterns": patterns,
+            "conflicting_pattern_count": len(similarity),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
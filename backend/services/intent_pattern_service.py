@@ -0,0 +1,159 @@
+from typing import Any, Iterable
+
+from sqlalchemy import delete, func, insert, select
+
+from backend.config import Config
+from backend.extensions import db
+from backend.models import AppSetting, Intent, IntentPattern, IntentToken
+from backend.nlp.text_normalizer import TextNormalizer
+
+MAX_TOKEN_LENGTH = 100
+MAX_NORMALIZED_LENGTH = 500
+SQL_IN_CHUNK = 500
+NORMALIZER_MARKER_KEY = "intent_terms_normalizer"
+
+
+class IntentPatternService:
+    """Keeps intent_patterns/intent_tokens in step with Intent.patterns.
+
+    The JSON columns stay the source of truth for the API; these tables are a
+    derived, indexed view used for candidate lookups and duplicate detection.
+    Both hold the chat tiers' normalized terms, so "same pattern" and "shared
+    term" mean what they mean when a message is matched.
+    """
+
+    def __init__(self, normalizer: TextNormalizer | None = None):
+        self.normalizer = normalizer or TextNormalizer(Config.CHAT_STEMMER, spelling=False)
+
+    def _rows_for(self, intent_id: int, patterns: list[str]) -> tuple[list[dict], list[dict]]:
+        pattern_rows = []
+        tokens = set()
+        for pattern in patterns or []:
+            pattern_tokens = self.normalizer.terms(pattern)
+            if not pattern_tokens:
+                continue
+            pattern_rows.append(
+                {
+                    "intent_id": intent_id,
+                    "pattern": pattern,
+                    "normalized": " ".join(pattern_tokens)[:MAX_NORMALIZED_LENGTH],
+                }
+            )
+            tokens.update(t for t in pattern_tokens if len(t) <= MAX_TOKEN_LENGTH)
+        token_rows = [{"intent_id": intent_id, "token": token} for token in sorted(tokens)]
+        return pattern_rows, token_rows
+
+    def _replace(self, intents: list[tuple[int, list[str]]]) -> None:
+        ids = [intent_id for intent_id, _ in intents]
+        self._delete_ids(ids)
+        pattern_rows = []
+        token_rows = []
+        for intent_id, patterns in intents:
+            p_rows, t_rows = self._rows_for(intent_id, patterns)
+            pattern_rows.extend(p_rows)
+            token_rows.extend(t_rows)
+        if pattern_rows:
+            db.session.execute(insert(IntentPattern), pattern_rows)
+        if token_rows:
+            db.session.execute(insert(IntentToken), token_rows)
+
+    @staticmethod
+    def _delete_ids(ids: list[int]) -> None:
+        for start in range(0, len(ids), SQL_IN_CHUNK):
+            chunk = ids[start:start + SQL_IN_CHUNK]
+            db.session.execute(delete(IntentPattern).where(IntentPattern.intent_id.in_(chunk)))
+            db.session.execute(delete(IntentToken).where(IntentToken.intent_id.in_(chunk)))
+
+    def sync_intent(self, intent: Intent) -> None:
+        """Re-derive rows for one intent; call after flush, before commit."""
+        if intent.id is None:
+            db.session.flush()
+        self._replace([(intent.id, intent.patterns or [])])
+
+    def sync_tags(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        for start in range(0, len(tags), SQL_IN_CHUNK):
+            rows = db.session.execute(
+                select(Intent.id, Intent.patterns).where(Intent.tag.in_(tags[start:start + SQL_IN_CHUNK]))
+            ).all()
+            self._replace([(row.id, row.patterns) for row in rows])
+
+    def remove_intent(self, intent_id: int) -> None:
+        # SQLite does not enforce ON DELETE CASCADE unless foreign_keys is on.
+        self._delete_ids([intent_id])
+
+    def rebuild_all(self) -> int:
+        rows = db.session.execute(select(Intent.id, Intent.patterns)).all()
+        db.session.execute(delete(IntentPattern))
+        db.session.execute(delete(IntentToken))
+        self._replace([(row.id, row.patterns) for row in rows])
+        return len(rows)
+
+    def rebuild_if_renormalized(self) -> int:
+        """Re-derive every row once when they were built with another normalizer.
+
+        Rows from another CHAT_STEMMER (or from before terms were stored) no
+        longer match the chat tiers. Costs one primary-key lookup otherwise.
+        """
+        current = repr(self.normalizer)
+        marker = db.session.get(AppSetting, NORMALIZER_MARKER_KEY)
+        if marker is not None and marker.value == current:
+            return 0
+        rebuilt = self.rebuild_all()
+        if marker is None:
+            db.session.add(AppSetting(key=NORMALIZER_MARKER_KEY, value=current))
+        else:
+            marker.value = current
+        db.session.commit()
+        return rebuilt
+
+    def backfill_missing(self) -> int:
+        """Index intents written outside the app (older databases, SQL seeds)."""
+        has_rows = select(IntentPattern.id).where(IntentPattern.intent_id == Intent.id).exists()
+        rows = db.session.execute(select(Intent.id, Intent.patterns).where(~has_rows)).all()
+        rows = [row for row in rows if row.patterns]
+        if not rows:
+            return 0
+        self._replace([(row.id, row.patterns) for row in rows])
+        db.session.commit()
+        return len(rows)
+
+    def duplicate_patterns(self, limit: int = 100) -> list[dict[str, Any]]:
+        """Normalized patterns that appear in more than one intent."""
+        groups = (
+            db.session.query(IntentPattern.normalized)
+            .group_by(IntentPattern.normalized)
+            .having(func.count(func.distinct(IntentPattern.intent_id)) > 1)
+            .order_by(func.count(func.distinct(IntentPattern.intent_id)).desc(), IntentPattern.normalized)
+            .limit(limit)
+            .all()
+        )
+        normalized = [row.normalized for row in groups]
+        if not normalized:
+            return []
+
+        tags_by_pattern: dict[str, set[str]] = {key: set() for key in normalized}
+        rows = (
+            db.session.query(IntentPattern.normalized, Intent.tag)
+            .join(Intent, Intent.id == IntentPattern.intent_id)
+            .filter(IntentPattern.normalized.in_(normalized))
+            .all()
+        )
+        for row in rows:
+            tags_by_pattern[row.normalized].add(row.tag)
+        return [{"pattern": key, "tags": sorted(tags_by_pattern[key])} for key in normalized]
+
+    def overlapping_intents(self, intent_id: int, limit: int = 20) -> list[dict[str, Any]]:
+        """Other intents ranked by how many pattern terms they share with this one."""
+        own_tokens = select(IntentToken.token).where(IntentToken.intent_id == intent_id)
+        shared = func.count(IntentToken.token).label("shared_tokens")
+        rows = (
+            db.session.query(Intent.id, Intent.tag, shared)
+            .join(IntentToken, IntentToken.intent_id == Intent.id)
+            .filter(IntentToken.token.in_(own_tokens), Intent.id != intent_id)
+            .group_by(Intent.id, Intent.tag)
+            .order_by(shared.desc(), Intent.tag)
+            .limit(limit)
+            .all()
+        )
+        return [{"id": row.id, "tag": row.tag, "shared_tokens": row.shared_tokens} for row in rows]
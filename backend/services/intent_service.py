@@ -1,54 +1,145 @@
+import hashlib
 import random
 import re
 from typing import Any
 
-from backend.models import Intent
+from sqlalchemy import func, select
+
+from backend.extensions import db
+from backend.models import Intent, IntentToken
+from backend.nlp.intent_index import IntentRecord, TokenIndex
+from backend.nlp.response_selector import RandomSelector, ResponseTable
+from backend.nlp.text_normalizer import TextNormalizer, tokenize
 
 
 class IntentService:
+    """DB intents: exact/Jaccard matching and replies.
+
+    With a SharedIntentIndex the matching data comes from the host-wide mmap'd
+    index instead of a per-process dict index.
+    """
+
+    def __init__(self, selector=None, shared_index=None, normalizer=None):
+        self.selector = selector or RandomSelector()
+        self.normalizer = normalizer or TextNormalizer()
+        self.shared_index = shared_index
+        self._index = None
+        self._index_signature = None
+
     @staticmethod
     def _clean_and_tokenize(text: str) -> list[str]:
-        cleaned = re.sub(r"[^\w\s]", " ", (text or "").lower())
-        return [token for token in cleaned.split() if token.strip()]
+        return tokenize(text)
 
     def get_intents(self) -> list[dict[str, Any]]:
         rows = Intent.query.order_by(Intent.tag.asc()).all()
         return [row.to_dict() for row in rows]
 
-    def get_response(self, user_message: str) -> str:
-        message = (user_message or "").strip()
-        if not message:
-            return "Please type a message."
+    def get_records(self) -> list[IntentRecord]:
+        """Intents for the chat path: only the columns matching needs, no timestamps."""
+        rows = db.session.query(Intent.id, Intent.tag, Intent.patterns, Intent.responses).order_by(Intent.tag.asc())
+        return [IntentRecord(row.tag, row.patterns, row.responses, row.id) for row in rows]
 
-        intents = self.get_intents()
-        if not intents:
-            return "No intents are configured yet."
+    def _signature(self) -> tuple:
+        # One aggregate query instead of a full table scan per message.
+        return tuple(
+            db.session.query(
+                func.count(Intent.id), func.max(Intent.id), func.max(Intent.updated_at)
+            ).one()
+        )
+
+    def _fingerprint(self) -> bytes:
+        state = repr((self._signature(), self.normalizer.stemmer))
+        return hashlib.blake2b(state.encode("utf-8"), digest_size=16).digest()
+
+    def _shared_view(self):
+        if self.shared_index is None:
+            return None
+        return self.shared_index.view(self._fingerprint, self.get_records, self.normalizer)
 
-        user_tokens = set(self._clean_and_tokenize(message))
-        best_intent = None
-        best_score = 0.0
+    def snapshot(self):
+        """(matcher, response table) from one index check, or None when no intents are stored.
 
-        for intent in intents:
-            token_set = set()
-            for pattern in intent.get("patterns", []):
-                token_set.update(self._clean_and_tokenize(pattern))
+        The matcher has match_exact/match_overlap; the shared view doubles as
+        the table. Take one per chat message so every tier sees the same
+        intents and the table signature is queried once.
+        """
+        view = self._shared_view()
+        if view is not None:
+            return (view, view) if len(view) else None
+        index = self.get_index()
+        return (index["tokens"], index["responses"]) if index["intents"] else None
 
-            if not token_set:
-                continue
+    def response_table(self):
+        """Responses by tag id for the selector, or None when no intents are stored."""
+        snapshot = self.snapshot()
+        return snapshot[1] if snapshot is not None else None
 
-            overlap = len(user_tokens & token_set)
-            union_size = len(user_tokens | token_set) or 1
-            score = overlap / union_size
-            if score > best_score:
-                best_score = score
-                best_intent = intent
+    def get_index(self) -> dict[str, Any]:
+        """Return the compiled intent index, rebuilding it only when the table changed."""
+        signature = self._signature()
+        if self._index is None or signature != self._index_signature:
+            records = self.get_records()
+            self._index = {
+                "intents": {record.tag: record for record in records},
+                "tokens": TokenIndex(records, self.normalizer),
+                "responses": ResponseTable(records),
+            }
+            self._index_signature = signature
+        return self._index
 
-        if best_intent and best_intent.get("responses"):
-            return random.choice(best_intent["responses"])
+    def current_records(self) -> list[IntentRecord]:
+        """The intents behind the current response table (for indexes kept outside this service)."""
+        if self.shared_index is not None:
+            return self.get_records()
+        return list(self.get_index()["intents"].values())
+
+    def find_intent(self, tag: str) -> IntentRecord | None:
+        return self.get_index()["intents"].get(tag)
+
+    def match_exact(self, user_message: str) -> str | None:
+        view = self._shared_view()
+        if view is not None:
+            return view.match_exact(user_message)
+        return self.get_index()["tokens"].match_exact(user_message)
+
+    def candidate_tags(self, user_message: str) -> list[str]:
+        """Tags sharing at least one pattern term with the message, via the intent_tokens index."""
+        terms = set(self.normalizer.terms(user_message))
+        if not terms:
+            return []
+        rows = db.session.execute(
+            select(Intent.tag)
+            .join(IntentToken, IntentToken.intent_id == Intent.id)
+            .where(IntentToken.token.in_(terms))
+            .distinct()
+            .order_by(Intent.tag)
+        ).all()
+        return [row.tag for row in rows]
+
+    def match_overlap(
+        self, user_message: str, boosts: dict[str, float] | None = None, boost_floor: float = 0.0
+    ) -> tuple[str | None, float]:
+        view = self._shared_view()
+        if view is not None:
+            return view.match_overlap(user_message, boosts, boost_floor)
+        # Only intents sharing a term can score above zero; the term postings find them.
+        return self.get_index()["tokens"].match_overlap(user_message, boosts, boost_floor)
+
+    def get_response(self, user_message: str) -> str:
+        message = (user_message or "").strip()
+        if not message:
+            return "Please type a message."
+
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return "No intents are configured yet."
 
-        fallback = next((x for x in intents if x.get("tag") == "fallback"), None)
-        if fallback and fallback.get("responses"):
-            return random.choice(fallback["responses"])
+        matcher, table = snapshot
+        best_tag, _ = matcher.match_overlap(message)
+        response = self.selector.choose(table, best_tag)
+        response = response or self.selector.choose(table, "fallback")
+        if response:
+            return response
 
         return "I'm sorry, I didn't catch that. Could you rephrase?"
 
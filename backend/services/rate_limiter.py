@@ -0,0 +1,190 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from backend.config import Config
+
+
+class MemoryRateLimiter:
+    """Per-process token buckets: `burst` requests at once, refilled at `per_minute`.
+
+    Buckets are kept in last-seen order and the least recently seen ones are
+    dropped beyond `max_keys`; a dropped bucket just starts full again.
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: int, max_keys: int = 100000):
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.max_keys = max(1, max_keys)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """Take `cost` tokens; returns 0 if allowed, else seconds until it would be."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            tokens = self.capacity if bucket is None else min(
+                self.capacity, bucket[0] + (now - bucket[1]) * self.rate
+            )
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteRateLimiter:
+    """Token buckets in a SQLite file shared by all gunicorn workers.
+
+    Each check is one short BEGIN IMMEDIATE transaction. If the file is
+    locked or unavailable the request is allowed rather than failed.
+    """
+
+    PRUNE_EVERY = 500
+
+    def __init__(self, name: str, path: str, per_minute: float, burst: int, max_keys: int = 100000):
+        self.name = name
+        self.path = path
+        self.rate = per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.max_keys = max(1, max_keys)
+        self._local = threading.local()
+        self._checks = 0
+        self._lock = threading.Lock()
+        self._connect().execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._connect().execute("CREATE INDEX IF NOT EXISTS ix_rate_buckets_updated_at ON rate_buckets (updated_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        key = f"{self.name}:{key}"
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+                tokens = self.capacity if row is None else min(
+                    self.capacity, row[0] + max(0.0, now - row[1]) * self.rate
+                )
+                if tokens >= cost:
+                    tokens -= cost
+                    wait = 0.0
+                else:
+                    wait = (cost - tokens) / self.rate
+                conn.execute(
+                    """
+                    INSERT INTO rate_buckets (key, tokens, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at
+                    """,
+                    (key, tokens, now),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            print(f"Rate limiter '{self.name}' unavailable, allowing request:", e)
+            return 0.0
+
+        with self._lock:
+            self._checks += 1
+            prune = self._checks % self.PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+        return wait
+
+    def prune(self) -> None:
+        # A bucket idle for longer than a full refill is indistinguishable from a new one.
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM rate_buckets WHERE updated_at < ?", (time.time() - self.capacity / self.rate,))
+            conn.execute(
+                """
+                DELETE FROM rate_buckets WHERE key IN (
+                    SELECT key FROM rate_buckets ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_keys,),
+            )
+        except sqlite3.Error as e:
+            print(f"Rate limiter '{self.name}' prune failed:", e)
+
+
+def create_rate_limiter(name: str, per_minute: float, burst: int):
+    """Build a limiter for the configured backend; None when per_minute <= 0 (disabled)."""
+    if per_minute <= 0:
+        return None
+    if Config.RATE_LIMIT_BACKEND == "sqlite":
+        os.makedirs(os.path.dirname(Config.RATE_LIMIT_DB_PATH) or ".", exist_ok=True)
+        return SQLiteRateLimiter(name, Config.RATE_LIMIT_DB_PATH, per_minute, burst, Config.RATE_LIMIT_MAX_KEYS)
+    return MemoryRateLimiter(name, per_minute, burst, Config.RATE_LIMIT_MAX_KEYS)
+
+
+def client_identity() -> str:
+    """JWT identity when a valid token is sent, otherwise the client IP."""
+    identity = None
+    if request.headers.get("Authorization"):
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+        except Exception:
+            identity = None
+    if identity:
+        return f"user:{identity}"
+    return f"ip:{request.remote_addr or 'unknown'}"
+
+
+def retry_after_response(message: str, status: int, seconds: float):
+    response = jsonify({"error": message})
+    response.status_code = status
+    response.headers["Retry-After"] = str(max(1, math.ceil(seconds)))
+    return response
+
+
+def rate_limited(limiter):
+    """Reject with 429 + Retry-After once the caller's bucket is empty."""
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if limiter is not None:
+                wait = limiter.acquire(client_identity())
+                if wait > 0:
+                    return retry_after_response("Too many requests. Please retry later.", 429, wait)
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,10 +1,13 @@
+import math
 import re
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import IO, Dict, List, Tuple
 
 import pytesseract
-from PIL import Image, ImageOps
+from PIL import Image, ImageOps, UnidentifiedImageError
+from backend.config import Config
 from backend.services.result_preference_service import ResultPreferenceService
+from backend.services.subject_alias_service import DEFAULT_SUBJECT_ALIASES, SubjectAliasService, subject_aliases
 
 # Use the common Windows install path when PATH is not picked up by Flask.
 _default_tesseract_path = Path(r"C:\Program Files\Tesseract-OCR\tesseract.exe")
@@ -12,44 +15,104 @@ if _default_tesseract_path.exists():
     pytesseract.pytesseract.tesseract_cmd = str(_default_tesseract_path)
 
 
+class ImageTooLargeError(ValueError):
+    """Raised when an uploaded image has more pixels than OCR_MAX_PIXELS."""
+
 
 class ResultAnalysisService:
     """Service that handles OCR extraction and subject-performance analysis."""
 
-    # Subject aliases normalized to a canonical output name.
-    SUBJECT_ALIASES = {
-        "MATH": "Maths",
-        "MATHS": "Maths",
-        "MATHEMATICS": "Maths",
-        "PHYSICS": "Physics",
-        "CHEMISTRY": "Chemistry",
-        "BIOLOGY": "Biology",
-        "ENGLISH": "English",
-        "COMPUTER": "Computer",
-        "COMPUTER SCIENCE": "Computer",
-        "INFORMATICS": "Computer",
-        "ACCOUNTANCY": "Accountancy",
-        "ECONOMICS": "Economics",
-        "BUSINESS STUDIES": "Business Studies",
-        "HISTORY": "History",
-        "GEOGRAPHY": "Geography",
-        "POLITICAL SCIENCE": "Political Science",
-    }
+    # Built-in aliases; admins can replace them via /api/admin/subject-aliases.
+    SUBJECT_ALIASES = DEFAULT_SUBJECT_ALIASES
 
     # OCR-friendly patterns for lines like:
-    # "Maths 92", "Physics - 85/100", "English: 90"
+    # "Maths 92", "Physics - 85/100", "English: 90", "PHYS1CS 85" (digits glued to
+    # letters are OCR noise in the subject, not the mark)
     SUBJECT_LINE_PATTERN = re.compile(
-        r"([A-Za-z][A-Za-z\s&.-]{1,40})\s*[:=\-]?\s*(\d{1,3})(?:\s*/\s*100)?\b"
+        r"([A-Za-z][A-Za-z0-9\s&.-]{1,40}?)\s*[:=\-]?\s*(?<![A-Za-z0-9])(\d{1,3})(?:\s*/\s*100)?\b"
+    )
+    # Fallback for marks glued to the subject ("Maths92"), tried when no line match is found.
+    GLUED_SUBJECT_LINE_PATTERN = re.compile(
+        r"([A-Za-z][A-Za-z0-9\s&.-]{1,40}?)\s*[:=\-]?\s*(\d{1,3})(?:\s*/\s*100)?\b"
     )
     NAME_PATTERN = re.compile(r"\b(?:student\s*name|name)\s*[:=\-]\s*([A-Za-z\s.]{2,60})", re.IGNORECASE)
+    IMAGE_FORMATS = {"JPEG", "PNG"}
+    # Modes Image.reduce supports; others ("P", "1", "I;16") are made grayscale first.
+    REDUCIBLE_MODES = {"L", "LA", "RGB", "RGBA", "CMYK", "I", "F"}
+    EXTRACTION_MODES = ("lines", "table", "auto")
+    METADATA_KEYWORDS = ("total", "grand", "result", "roll", "reg", "code")
+
+    # Word-box (table) mode: a mark cell like "92" or "92/100", and header words
+    # that locate the obtained-marks column.
+    MARK_TOKEN_PATTERN = re.compile(r"^(\d{1,3})(?:/100)?$")
+    OBTAINED_HEADER_PATTERN = re.compile(r"^(obtained|secured|scored|score)$", re.IGNORECASE)
+    MARKS_HEADER_PATTERN = re.compile(r"^marks?$", re.IGNORECASE)
+    OTHER_MARKS_HEADER_PATTERN = re.compile(r"^(max|maximum|full|min|minimum|pass)$", re.IGNORECASE)
+    # Words whose vertical centers differ by less than this fraction of the word height share a row.
+    ROW_TOLERANCE = 0.5
+
+    def __init__(self, alias_service: SubjectAliasService | None = None):
+        self.alias_service = alias_service or subject_aliases
+
+    def load_image(
+        self,
+        stream: IO[bytes],
+        max_pixels: int = Config.OCR_MAX_PIXELS,
+        target_pixels: int = Config.OCR_TARGET_PIXELS,
+    ) -> Image.Image:
+        """Decode an upload with bounded memory.
+
+        Dimensions are read from the header before any pixel data: images
+        above `max_pixels` are rejected undecoded. JPEGs are decoded in draft
+        mode straight to grayscale at the smallest 1/2, 1/4 or 1/8 scale that
+        still covers `target_pixels`; anything still above it is reduced after decoding.
+        Modes `reduce` does not handle (palette, bilevel, 16-bit) are converted
+        to grayscale first, as OCR preprocessing would do anyway.
+        """
+        try:
+            image = Image.open(stream)
+        except Image.DecompressionBombError as exc:
+            raise ImageTooLargeError(str(exc)) from exc
+        if image.format not in self.IMAGE_FORMATS:
+            raise UnidentifiedImageError(f"Unsupported image format: {image.format}")
+
+        width, height = image.size
+        pixels = width * height
+        if pixels > max_pixels:
+            raise ImageTooLargeError(
+                f"Image is {width}x{height}; the limit is {max_pixels // 1_000_000} megapixels."
+            )
+
+        if image.format == "JPEG":
+            scale = min(1.0, math.sqrt(target_pixels / pixels))
+            image.draft("L", (math.ceil(width * scale), math.ceil(height * scale)))
+        image.load()
+
+        if image.width * image.height > target_pixels:
+            if image.mode not in self.REDUCIBLE_MODES:
+                image = ImageOps.grayscale(image)
+            image = image.reduce(math.ceil(math.sqrt(image.width * image.height / target_pixels)))
+        return image
+
+    def analyze(self, image: Image.Image, mode: str | None = None) -> Dict:
+        """Run OCR and return structured result JSON-ready dict.
 
-    def analyze(self, image: Image.Image) -> Dict:
-        """Run OCR and return structured result JSON-ready dict."""
-        extracted_text = self._extract_text(image)
-        cleaned_text = self._clean_text(extracted_text)
+        `mode` (default Config.RESULT_EXTRACTION_MODE):
+        - "lines": `image_to_string` text parsed line by line
+        - "table": `image_to_data` word boxes regrouped into rows by position,
+          so subject and mark columns that OCR reads as separate lines still pair up
+        - "auto": one `image_to_data` pass, parsed both ways; the result with more subjects wins
+        """
+        mode = mode or Config.RESULT_EXTRACTION_MODE
+        if mode not in self.EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode '{mode}'.")
 
-        name = self._extract_name(cleaned_text)
-        subjects = self._extract_subject_marks(cleaned_text)
+        if mode == "lines":
+            cleaned_text = self._clean_text(self._extract_text(image))
+            name = self._extract_name(cleaned_text)
+            subjects = self._extract_subject_marks(cleaned_text)
+        else:
+            name, subjects = self.extract_from_data(self._extract_data(image), mode)
 
         if not subjects:
             raise ValueError("No valid subject marks were found in the uploaded result image.")
@@ -66,12 +129,142 @@ class ResultAnalysisService:
             "recommended_courses": self._recommend_courses(average),
         }
 
-    def _extract_text(self, image: Image.Image) -> str:
-        """Preprocess image and run OCR with Tesseract."""
+    def _preprocess(self, image: Image.Image) -> Image.Image:
         # Convert to grayscale and auto-contrast for better OCR quality.
         processed = ImageOps.grayscale(image)
-        processed = ImageOps.autocontrast(processed)
-        return pytesseract.image_to_string(processed)
+        return ImageOps.autocontrast(processed)
+
+    def _extract_text(self, image: Image.Image) -> str:
+        """Preprocess image and run OCR with Tesseract."""
+        return pytesseract.image_to_string(self._preprocess(image))
+
+    def _extract_data(self, image: Image.Image) -> Dict[str, list]:
+        """Preprocess image and run OCR with Tesseract, keeping word boxes."""
+        return pytesseract.image_to_data(self._preprocess(image), output_type=pytesseract.Output.DICT)
+
+    def extract_from_data(self, data: Dict[str, list], mode: str = "table") -> Tuple[str, Dict[str, int]]:
+        """Name and subject marks from an `image_to_data` dict ("table" or "auto" mode)."""
+        words = self._words_from_data(data)
+        rows = self._group_rows(words)
+        cleaned_text = self._clean_text("\n".join(" ".join(w["text"] for w in row) for row in rows))
+        subjects = self._extract_table_marks(rows)
+        if mode == "auto":
+            line_subjects = self._extract_subject_marks(self._clean_text(self._data_to_text(words)))
+            if len(line_subjects) > len(subjects):
+                subjects = line_subjects
+        return self._extract_name(cleaned_text), subjects
+
+    @staticmethod
+    def _words_from_data(data: Dict[str, list]) -> List[Dict]:
+        words = []
+        for i, text in enumerate(data.get("text", [])):
+            text = (text or "").strip()
+            # conf is -1 for page/block/line entries that carry no text.
+            if not text or float(data["conf"][i]) < 0:
+                continue
+            words.append(
+                {
+                    "text": text,
+                    "left": int(data["left"][i]),
+                    "top": int(data["top"][i]),
+                    "width": int(data["width"][i]),
+                    "height": int(data["height"][i]),
+                    "line": (data["block_num"][i], data["par_num"][i], data["line_num"][i]),
+                }
+            )
+        return words
+
+    @staticmethod
+    def _data_to_text(words: List[Dict]) -> str:
+        """Rebuild the text Tesseract itself would print, one OCR line per line."""
+        lines: Dict[tuple, List[str]] = {}
+        for word in words:
+            lines.setdefault(word["line"], []).append(word["text"])
+        return "\n".join(" ".join(texts) for texts in lines.values())
+
+    def _group_rows(self, words: List[Dict]) -> List[List[Dict]]:
+        """Cluster words into visual rows by vertical center, each sorted left to right."""
+        rows: List[Dict] = []
+        for word in sorted(words, key=lambda w: w["top"] + w["height"] / 2):
+            center = word["top"] + word["height"] / 2
+            if rows:
+                row = rows[-1]
+                if abs(center - row["center"]) <= max(row["height"], word["height"]) * self.ROW_TOLERANCE:
+                    row["words"].append(word)
+                    row["center"] += (center - row["center"]) / len(row["words"])
+                    row["height"] = max(row["height"], word["height"])
+                    continue
+            rows.append({"center": center, "height": word["height"], "words": [word]})
+        return [sorted(row["words"], key=lambda w: w["left"]) for row in rows]
+
+    def _marks_column(self, row: List[Dict]) -> float | None:
+        """x-center of the obtained-marks header if this row is a table header."""
+        if any(self._mark_value(w["text"]) is not None for w in row):
+            return None
+        for word in row:
+            if self.OBTAINED_HEADER_PATTERN.match(self._strip_cell(word["text"])):
+                return word["left"] + word["width"] / 2
+        for index, word in enumerate(row):
+            previous = self._strip_cell(row[index - 1]["text"]) if index else ""
+            if self.MARKS_HEADER_PATTERN.match(self._strip_cell(word["text"])) and not (
+                self.OTHER_MARKS_HEADER_PATTERN.match(previous)
+            ):
+                return word["left"] + word["width"] / 2
+        return None
+
+    @staticmethod
+    def _strip_cell(text: str) -> str:
+        # Table borders and separators come through as | : - characters.
+        return text.strip("|:;,-=_()[]")
+
+    def _mark_value(self, text: str) -> int | None:
+        match = self.MARK_TOKEN_PATTERN.match(self._strip_cell(text))
+        return int(match.group(1)) if match else None
+
+    def _extract_table_marks(self, rows: List[List[Dict]]) -> Dict[str, int]:
+        """Pair subject words with a mark cell in the same visual row.
+
+        Once a header row names the obtained-marks column, the mark closest to
+        it is used; otherwise the last number in the row (the obtained mark in
+        "subject | max | obtained" layouts, and the only one in "subject mark").
+        """
+        subjects: Dict[str, int] = {}
+        marks_x = None
+
+        for row in rows:
+            header_x = self._marks_column(row)
+            if header_x is not None:
+                marks_x = header_x
+                continue
+
+            first_mark = next((i for i, w in enumerate(row) if self._mark_value(w["text"]) is not None), None)
+            if not first_mark:
+                continue
+            subject_raw = " ".join(
+                self._strip_cell(w["text"]) for w in row[:first_mark] if re.search(r"[A-Za-z]", w["text"])
+            )
+            subject_raw = re.sub(r"[^A-Za-z0-9&.\s-]", " ", subject_raw).strip()
+            if len(re.sub(r"[^A-Za-z]", "", subject_raw)) < 2 or self._is_metadata(subject_raw):
+                continue
+
+            cells = [
+                (w["left"] + w["width"] / 2, self._mark_value(w["text"]))
+                for w in row[first_mark:]
+                if self._mark_value(w["text"]) is not None
+            ]
+            if marks_x is not None:
+                marks = min(cells, key=lambda cell: abs(cell[0] - marks_x))[1]
+            else:
+                marks = cells[-1][1]
+            if marks > 100:
+                continue
+            subjects[self._normalize_subject(subject_raw)] = marks
+
+        return subjects
+
+    def _is_metadata(self, subject_raw: str) -> bool:
+        # Ignore obvious non-subject metadata lines.
+        return any(keyword in subject_raw.lower() for keyword in self.METADATA_KEYWORDS)
 
     def _clean_text(self, text: str) -> str:
         """Normalize OCR text noise so regex parsing is more reliable."""
@@ -93,21 +286,17 @@ class ResultAnalysisService:
         return candidate.title() if candidate else "Unknown"
 
     def _normalize_subject(self, raw_subject: str) -> str:
-        """Map OCR'd subject names to canonical subject labels."""
-        subject = re.sub(r"\s+", " ", raw_subject).strip().upper()
-        subject = subject.replace("&", "AND")
-
-        # Exact alias match.
-        if subject in self.SUBJECT_ALIASES:
-            return self.SUBJECT_ALIASES[subject]
+        """Map OCR'd subject names to canonical subject labels.
 
-        # Partial fallback (e.g., 'COMPUTER SCIENCE THEORY').
-        for alias, canonical in self.SUBJECT_ALIASES.items():
-            if alias in subject:
-                return canonical
+        Handles exact aliases, aliases inside longer labels (e.g. 'COMPUTER
+        SCIENCE THEORY') and OCR typos such as 'PHYS1CS' or 'MATHEMATCS'.
+        """
+        canonical = self.alias_service.match(raw_subject)
+        if canonical:
+            return canonical
 
         # Keep unknown but readable subjects.
-        return raw_subject.strip().title()
+        return re.sub(r"\s+", " ", raw_subject).strip().title()
 
     def _extract_subject_marks(self, text: str) -> Dict[str, int]:
         """Extract subject->marks dictionary from cleaned OCR text."""
@@ -118,14 +307,13 @@ class ResultAnalysisService:
             if not line:
                 continue
 
-            match = self.SUBJECT_LINE_PATTERN.search(line)
+            match = self.SUBJECT_LINE_PATTERN.search(line) or self.GLUED_SUBJECT_LINE_PATTERN.search(line)
             if not match:
                 continue
 
             subject_raw, marks_raw = match.groups()
 
-            # Ignore obvious non-subject metadata lines.
-            if any(keyword in subject_raw.lower() for keyword in ("total", "grand", "result", "roll", "reg", "code")):
+            if self._is_metadata(subject_raw):
                 continue
 
             marks = int(marks_raw)
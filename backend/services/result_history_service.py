@@ -0,0 +1,70 @@
+import threading
+from datetime import datetime
+
+from flask import Flask
+from sqlalchemy import insert
+
+from backend.config import Config
+from backend.extensions import db
+from backend.models import ResultAnalysisHistory
+from backend.services.buffered_writer import BufferedWriter
+
+
+class ResultHistoryService:
+    """Persists result-analysis history, inline or through a write-behind buffer.
+
+    RESULT_HISTORY_DURABILITY=sync commits each row before the response (the
+    default). With "buffered", rows are queued and inserted in executemany
+    batches by a background thread; a crash can lose up to one batch /
+    flush interval of history, but uploads no longer wait on the commit.
+    """
+
+    def __init__(self):
+        self._writer = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def build_row(result: dict, source_filename: str | None) -> dict:
+        return {
+            "student_name": result.get("name", "Unknown"),
+            "total": int(result.get("total", 0)),
+            "average": float(result.get("average", 0)),
+            "subjects": result.get("subjects", {}),
+            "strength_subjects": result.get("strength_subjects", []),
+            "recommended_courses": result.get("recommended_courses", []),
+            "source_filename": source_filename,
+            # Stamped at request time so buffered rows keep their real order.
+            "analyzed_at": datetime.utcnow(),
+        }
+
+    def record(self, row: dict, app: Flask) -> None:
+        if Config.RESULT_HISTORY_DURABILITY == "buffered" and self._get_writer(app).submit(row):
+            return
+        db.session.add(ResultAnalysisHistory(**row))
+        db.session.commit()
+
+    def _get_writer(self, app: Flask) -> BufferedWriter:
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = BufferedWriter(
+                        lambda rows: self._insert_batch(app, rows),
+                        batch_size=Config.RESULT_HISTORY_BATCH_SIZE,
+                        flush_interval=Config.RESULT_HISTORY_FLUSH_INTERVAL,
+                        max_queue=Config.RESULT_HISTORY_MAX_QUEUE,
+                        name="result-history-writer",
+                    )
+        return self._writer
+
+    @staticmethod
+    def _insert_batch(app: Flask, rows: list[dict]) -> None:
+        with app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(insert(ResultAnalysisHistory), rows)
+
+    def flush(self) -> int:
+        return self._writer.flush() if self._writer else 0
+
+    def close(self) -> None:
+        if self._writer:
+            self._writer.close()
@@ -1,5 +1,6 @@
 from backend.extensions import db
 from backend.models import ResultAnalysisPreference
+from backend.services.table_version_service import table_versions
 
 
 DEFAULT_RULES = [
@@ -90,11 +91,13 @@ class ResultPreferenceService:
             normalized = self.normalize_rules(pref.rules)
             if pref.rules != normalized:
                 pref.rules = normalized
+                table_versions.bump("result_preferences")
                 db.session.commit()
             return pref
 
         pref = ResultAnalysisPreference(rules=DEFAULT_RULES)
         db.session.add(pref)
+        table_versions.bump("result_preferences")
         db.session.commit()
         return pref
 
@@ -105,6 +108,7 @@ class ResultPreferenceService:
     def update_rules(self, rules: list[dict]) -> ResultAnalysisPreference:
         pref = self.get_or_create()
         pref.rules = self.normalize_rules(rules)
+        table_versions.bump("result_preferences")
         db.session.commit()
         return pref
 
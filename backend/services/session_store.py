@@ -0,0 +1,145 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+
+from backend.config import Config
+
+
+class MemorySessionStore:
+    """Per-process LRU session store with sliding TTL and a hard session cap.
+
+    Sessions are kept in last-touched order, so both LRU eviction and TTL
+    expiry only ever look at the oldest entries: O(1) amortized per request
+    regardless of how many sessions are live.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 1800, history_size: int = 5):
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_seconds = ttl_seconds
+        self.history_size = max(1, history_size)
+        self._sessions: OrderedDict[str, tuple[float, deque]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        while self._sessions:
+            _, (touched_at, _) = next(iter(self._sessions.items()))
+            if len(self._sessions) > self.max_sessions or now - touched_at > self.ttl_seconds:
+                self._sessions.popitem(last=False)
+            else:
+                break
+
+    def get_history(self, session_id: str) -> list[str]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return []
+            if now - entry[0] > self.ttl_seconds:
+                del self._sessions[session_id]
+                return []
+            return list(entry[1])
+
+    def record(self, session_id: str, tag: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            history = entry[1] if entry and now - entry[0] <= self.ttl_seconds else deque(maxlen=self.history_size)
+            history.append(tag)
+            self._sessions[session_id] = (now, history)
+            self._evict(now)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SQLiteSessionStore:
+    """Session store in a SQLite file so all gunicorn workers share context."""
+
+    PRUNE_EVERY = 200
+
+    def __init__(
+        self,
+        path: str,
+        max_sessions: int = 10000,
+        ttl_seconds: float = 1800,
+        history_size: int = 5,
+    ):
+        self.path = path
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_seconds = ttl_seconds
+        self.history_size = max(1, history_size)
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chat_sessions (
+                session_id TEXT PRIMARY KEY,
+                history TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_chat_sessions_updated_at ON chat_sessions (updated_at)")
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_history(self, session_id: str) -> list[str]:
+        row = self._connect().execute(
+            "SELECT history FROM chat_sessions WHERE session_id = ? AND updated_at >= ?",
+            (session_id, time.time() - self.ttl_seconds),
+        ).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def record(self, session_id: str, tag: str) -> None:
+        history = self.get_history(session_id)
+        history = (history + [tag])[-self.history_size:]
+        self._connect().execute(
+            """
+            INSERT INTO chat_sessions (session_id, history, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET history = excluded.history, updated_at = excluded.updated_at
+            """,
+            (session_id, json.dumps(history), time.time()),
+        )
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> None:
+        # Both deletes walk ix_chat_sessions_updated_at; amortized over PRUNE_EVERY writes.
+        conn = self._connect()
+        conn.execute("DELETE FROM chat_sessions WHERE updated_at < ?", (time.time() - self.ttl_seconds,))
+        conn.execute(
+            """
+            DELETE FROM chat_sessions WHERE session_id IN (
+                SELECT session_id FROM chat_sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_sessions,),
+        )
+
+
+def create_session_store():
+    kwargs = {
+        "max_sessions": Config.SESSION_MAX_SESSIONS,
+        "ttl_seconds": Config.SESSION_TTL_SECONDS,
+        "history_size": Config.SESSION_HISTORY_SIZE,
+    }
+    if Config.SESSION_BACKEND == "sqlite":
+        os.makedirs(os.path.dirname(Config.SESSION_DB_PATH) or ".", exist_ok=True)
+        return SQLiteSessionStore(Config.SESSION_DB_PATH, **kwargs)
+    return MemorySessionStore(**kwargs)
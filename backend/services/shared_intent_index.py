@@ -0,0 +1,422 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from functools import lru_cache
+
+from backend.config import Config
+from backend.nlp.intent_index import pick_overlap
+from backend.nlp.text_normalizer import SpellingCorrector, TextNormalizer, symmetric_deletes
+
+try:
+    import fcntl
+except ImportError:  # Windows: builders may race, but each file is still swapped in atomically.
+    fcntl = None
+
+MAGIC = b"GIX2"
+# magic, generation, 16-byte fingerprint of the DB state, then (offset, length) of each section
+HEADER = struct.Struct("<4sQ16s")
+SECTIONS = (
+    "tag_offsets", "tag_blob",              # intent tags, sorted; intent id = position
+    "token_offsets", "token_blob",          # pattern tokens, sorted; token id = position
+    "posting_offsets", "postings",          # token id -> intent ids containing it
+    "intent_sizes",                         # distinct tokens per intent (Jaccard union size)
+    "exact_offsets", "exact_blob", "exact_intents",  # normalized patterns, sorted -> intent id
+    "response_ranges",                      # intent id -> range in the response strings
+    "response_offsets", "response_blob",
+    "delete_offsets", "delete_blob",        # spelling-corrector delete variants, sorted
+    "delete_posting_offsets", "delete_postings",  # variant id -> token ids it was derived from
+)
+SECTION = struct.Struct("<QQ")
+GENERATION = struct.Struct("<Q")
+
+
+def _strings(values: list[str]) -> tuple[array, bytes]:
+    offsets = array("I", [0])
+    blob = bytearray()
+    for value in values:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def compile_intents(intents: list, tokenize, generation: int, fingerprint: bytes) -> bytes:
+    """Serialize IntentRecords into the shared index layout; `tokenize(pattern)` gives its terms."""
+    intents = sorted((i for i in intents if i.tag), key=lambda i: i.tag)
+    token_sets = []
+    exact = {}
+    for intent_id, intent in enumerate(intents):
+        tokens = set()
+        for pattern in intent.patterns:
+            pattern_tokens = tokenize(pattern)
+            tokens.update(pattern_tokens)
+            if pattern_tokens:
+                exact.setdefault(" ".join(pattern_tokens), intent_id)
+        token_sets.append(tokens)
+
+    vocabulary = sorted(set().union(*token_sets)) if token_sets else []
+    token_ids = {token: i for i, token in enumerate(vocabulary)}
+    postings_by_token = [[] for _ in vocabulary]
+    for intent_id, tokens in enumerate(token_sets):
+        for token in tokens:
+            postings_by_token[token_ids[token]].append(intent_id)
+    posting_offsets = array("I", [0])
+    postings = array("I")
+    for intent_ids in postings_by_token:
+        postings.extend(intent_ids)
+        posting_offsets.append(len(postings))
+
+    exact_keys = sorted(exact)
+    # The SpellingCorrector's delete index, so workers don't each build it as a dict.
+    deletes = {}
+    for token_id, token in enumerate(vocabulary):
+        depth = min(SpellingCorrector.INDEX_DELETES, SpellingCorrector.max_distance(token))
+        for variant in symmetric_deletes(token, depth):
+            deletes.setdefault(variant, []).append(token_id)
+    delete_keys = sorted(deletes)
+    delete_posting_offsets = array("I", [0])
+    delete_postings = array("I")
+    for key in delete_keys:
+        delete_postings.extend(deletes[key])
+        delete_posting_offsets.append(len(delete_postings))
+
+    responses = []
+    response_ranges = array("I", [0])
+    for intent in intents:
+        responses.extend(r for r in intent.responses if r)
+        response_ranges.append(len(responses))
+
+    tag_offsets, tag_blob = _strings([intent.tag for intent in intents])
+    token_offsets, token_blob = _strings(vocabulary)
+    exact_offsets, exact_blob = _strings(exact_keys)
+    response_offsets, response_blob = _strings(responses)
+    delete_offsets, delete_blob = _strings(delete_keys)
+    sections = {
+        "tag_offsets": tag_offsets, "tag_blob": tag_blob,
+        "token_offsets": token_offsets, "token_blob": token_blob,
+        "posting_offsets": posting_offsets, "postings": postings,
+        "intent_sizes": array("I", [len(tokens) for tokens in token_sets]),
+        "exact_offsets": exact_offsets, "exact_blob": exact_blob,
+        "exact_intents": array("I", [exact[key] for key in exact_keys]),
+        "response_ranges": response_ranges,
+        "response_offsets": response_offsets, "response_blob": response_blob,
+        "delete_offsets": delete_offsets, "delete_blob": delete_blob,
+        "delete_posting_offsets": delete_posting_offsets, "delete_postings": delete_postings,
+    }
+
+    out = bytearray(HEADER.size + SECTION.size * len(SECTIONS))
+    HEADER.pack_into(out, 0, MAGIC, generation, fingerprint)
+    for i, name in enumerate(SECTIONS):
+        data = sections[name]
+        data = data.tobytes() if isinstance(data, array) else data
+        out += b"\0" * (-len(out) % 8)  # keep int arrays aligned
+        SECTION.pack_into(out, HEADER.size + SECTION.size * i, len(out), len(data))
+        out += data
+    return bytes(out)
+
+
+class _StringView:
+    """Strings stored as one UTF-8 blob plus an offsets array, decoded on access."""
+
+    __slots__ = ("offsets", "buffer", "base")
+
+    def __init__(self, offsets: memoryview, buffer, base: int):
+        self.offsets = offsets
+        self.buffer = buffer
+        self.base = base
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def raw(self, i: int) -> bytes:
+        return self.buffer[self.base + self.offsets[i]:self.base + self.offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> str:
+        return self.raw(i).decode("utf-8")
+
+    def find(self, value: str) -> int | None:
+        """Position of `value` in a sorted view (binary search), or None."""
+        key = value.encode("utf-8")
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if self.raw(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low if low < len(self) and self.raw(low) == key else None
+
+
+class _ResponseView:
+    __slots__ = ("ranges", "strings")
+
+    def __init__(self, ranges: memoryview, strings: _StringView):
+        self.ranges = ranges
+        self.strings = strings
+
+    def __getitem__(self, intent_id: int) -> tuple[str, ...]:
+        return tuple(self.strings[i] for i in range(self.ranges[intent_id], self.ranges[intent_id + 1]))
+
+
+class _MappedCorrector(SpellingCorrector):
+    """SpellingCorrector reading its vocabulary, counts and delete index from the mapped file.
+
+    Same lookups and tie-breaking as the dict-based corrector; only the
+    per-token LRU of results lives in the worker.
+    """
+
+    def __init__(self, index: "CompiledIntentIndex", cache_size: int = 10000):
+        self.index = index
+        self.vocabulary = self
+        self.counts = self
+        self.deletes = _DeleteView(index)
+        self.correct = lru_cache(maxsize=cache_size)(self._correct)
+
+    def __contains__(self, token: str) -> bool:
+        return self.index.tokens.find(token) is not None
+
+    def get(self, token: str, default: int = 0) -> int:
+        # Word frequency = number of intents using it, as for the in-process index.
+        token_id = self.index.tokens.find(token)
+        if token_id is None:
+            return default
+        return self.index.posting_offsets[token_id + 1] - self.index.posting_offsets[token_id]
+
+
+class _DeleteView:
+    __slots__ = ("index",)
+
+    def __init__(self, index: "CompiledIntentIndex"):
+        self.index = index
+
+    def get(self, variant: str, default=()):
+        index = self.index
+        position = index.deletes.find(variant)
+        if position is None:
+            return default
+        start, stop = index.delete_posting_offsets[position], index.delete_posting_offsets[position + 1]
+        return [index.tokens[index.delete_postings[i]] for i in range(start, stop)]
+
+
+class CompiledIntentIndex:
+    """Read-only view over one serialized index (an mmap, or bytes).
+
+    Nothing is copied into Python objects up front: lookups binary-search the
+    sorted string tables and walk the posting arrays in place. It also serves
+    as the response table (`id_for`, `tags`, `responses`) for the selector.
+    Messages are normalized with `normalizer`, the one the file was compiled
+    with; its spelling corrector reads the delete index stored in the file.
+    """
+
+    def __init__(self, buffer, normalizer: TextNormalizer | None = None):
+        self.buffer = buffer
+        self.normalizer = normalizer or TextNormalizer()
+        self._corrector = None
+        magic, self.generation, self.fingerprint = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not an intent index file")
+        view = memoryview(buffer)
+        ints, blobs = {}, {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(buffer, HEADER.size + SECTION.size * i)
+            if name.endswith("_blob"):
+                blobs[name] = offset
+            else:
+                ints[name] = view[offset:offset + length].cast("I")
+        self.tags = _StringView(ints["tag_offsets"], buffer, blobs["tag_blob"])
+        self.tokens = _StringView(ints["token_offsets"], buffer, blobs["token_blob"])
+        self.exact = _StringView(ints["exact_offsets"], buffer, blobs["exact_blob"])
+        self.exact_intents = ints["exact_intents"]
+        self.posting_offsets = ints["posting_offsets"]
+        self.postings = ints["postings"]
+        self.intent_sizes = ints["intent_sizes"]
+        self.response_ranges = ints["response_ranges"]
+        self.responses = _ResponseView(
+            self.response_ranges, _StringView(ints["response_offsets"], buffer, blobs["response_blob"])
+        )
+        self.deletes = _StringView(ints["delete_offsets"], buffer, blobs["delete_blob"])
+        self.delete_posting_offsets = ints["delete_posting_offsets"]
+        self.delete_postings = ints["delete_postings"]
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def id_for(self, tag: str | None) -> int | None:
+        """Intent id of `tag` if it has responses (ResponseTable contract)."""
+        intent_id = self.tags.find(tag) if tag else None
+        if intent_id is None or self.response_ranges[intent_id] == self.response_ranges[intent_id + 1]:
+            return None
+        return intent_id
+
+    def terms(self, message: str) -> list[str]:
+        terms = self.normalizer.terms(message)
+        if not self.normalizer.spelling:
+            return terms
+        if self._corrector is None:
+            self._corrector = _MappedCorrector(self, self.normalizer.cache_size)
+        return [self._corrector.correct(term) for term in terms]
+
+    def match_exact(self, message: str) -> str | None:
+        key = " ".join(self.terms(message))
+        position = self.exact.find(key) if key else None
+        return None if position is None else self.tags[self.exact_intents[position]]
+
+    def match_overlap(
+        self, message: str, boosts: dict[str, float] | None = None, boost_floor: float = 0.0
+    ) -> tuple[str | None, float]:
+        user_tokens = set(self.terms(message))
+        overlaps: dict[int, int] = {}
+        for token in user_tokens:
+            token_id = self.tokens.find(token)
+            if token_id is None:
+                continue
+            for i in range(self.posting_offsets[token_id], self.posting_offsets[token_id + 1]):
+                intent_id = self.postings[i]
+                overlaps[intent_id] = overlaps.get(intent_id, 0) + 1
+
+        # Intent ids follow tag order, so ties resolve like the in-process index.
+        scores = (
+            (self.tags[i], overlaps[i] / (len(user_tokens) + self.intent_sizes[i] - overlaps[i]))
+            for i in sorted(overlaps)
+        )
+        return pick_overlap(scores, boosts, boost_floor)
+
+
+class SharedIntentIndex:
+    """Intent index published as an mmap'd file shared by every worker on a host.
+
+    `<dir>/intents.gen` holds the current generation (8 bytes, itself mapped);
+    `<dir>/intents.<generation>.idx` is the index for it. Workers compare the
+    mapped generation on every call and re-attach when it moves, so one
+    publish is picked up by all of them together. At most every
+    `refresh_seconds` a worker also compares the DB fingerprint with the
+    attached index; on a mismatch the first worker to take the lock builds
+    and publishes the next generation, the others attach to it. A worker
+    that writes intents itself calls `refresh()` to publish at once instead
+    of at its next poll.
+    """
+
+    def __init__(self, directory: str, refresh_seconds: float = 1.0):
+        self.directory = directory
+        self.refresh_seconds = refresh_seconds
+        self._view: CompiledIntentIndex | None = None
+        self._checked_at = 0.0
+        self._sources = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._gen_path = os.path.join(directory, "intents.gen")
+        with self._file_lock():
+            fd = os.open(self._gen_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size < GENERATION.size:
+                    os.ftruncate(fd, GENERATION.size)
+                self._generation = mmap.mmap(fd, GENERATION.size)
+            finally:
+                os.close(fd)
+
+    @contextmanager
+    def _file_lock(self):
+        with open(os.path.join(self.directory, "intents.lock"), "a+b") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"intents.{generation}.idx")
+
+    @property
+    def generation(self) -> int:
+        return GENERATION.unpack_from(self._generation, 0)[0]
+
+    def _attach(self, generation: int, normalizer) -> CompiledIntentIndex | None:
+        try:
+            with open(self._path(generation), "rb") as f:
+                return CompiledIntentIndex(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), normalizer)
+        except (OSError, ValueError):
+            return None
+
+    def view(self, fingerprint_fn, intents_fn, normalizer) -> CompiledIntentIndex:
+        """The current index; `fingerprint_fn()` -> bytes detects DB changes, `intents_fn()` loads them.
+
+        The fingerprint must also cover the normalizer settings, since the
+        file stores normalized terms.
+        """
+        self._sources = (fingerprint_fn, intents_fn, normalizer)
+        generation = self.generation
+        view = self._view
+        if view is not None and view.generation == generation and (
+            time.monotonic() - self._checked_at < self.refresh_seconds
+        ):
+            return view
+
+        with self._lock:
+            if self._view is None or self._view.generation != self.generation:
+                self._view = self._attach(self.generation, normalizer) or self._view
+            if time.monotonic() - self._checked_at >= self.refresh_seconds or self._view is None:
+                fingerprint = fingerprint_fn()
+                if self._view is None or self._view.fingerprint != fingerprint:
+                    self._view = self._publish(fingerprint, intents_fn, normalizer)
+                self._checked_at = time.monotonic()
+            return self._view
+
+    def refresh(self) -> None:
+        """Compare the DB with the index now and publish if it changed (after a write in this process)."""
+        self._checked_at = float("-inf")
+        if self._sources is not None:
+            self.view(*self._sources)
+
+    def _publish(self, fingerprint: bytes, intents_fn, normalizer) -> CompiledIntentIndex:
+        with self._file_lock():
+            # Another worker may have published this state while we waited.
+            current = self._attach(self.generation, normalizer)
+            if current is not None and current.fingerprint == fingerprint:
+                return current
+            generation = self.generation + 1
+            data = compile_intents(intents_fn(), normalizer.terms, generation, fingerprint)
+            path = self._path(generation)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            GENERATION.pack_into(self._generation, 0, generation)
+            self._generation.flush()
+            print(f"Published intent index generation {generation} ({len(data)} bytes).")
+            # Workers still mapping an older file keep it until they re-attach (POSIX).
+            for name in os.listdir(self.directory):
+                if name.startswith("intents.") and name.endswith(".idx") and name != os.path.basename(path):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+        return self._attach(generation, normalizer) or CompiledIntentIndex(data, normalizer)
+
+
+_shared_index: SharedIntentIndex | None = None
+
+
+def create_shared_intent_index():
+    """This process's SharedIntentIndex when INTENT_INDEX_BACKEND=shared, else None (per-process index)."""
+    global _shared_index
+    if Config.INTENT_INDEX_BACKEND != "shared":
+        return None
+    if _shared_index is None:
+        _shared_index = SharedIntentIndex(Config.INTENT_INDEX_DIR, Config.INTENT_INDEX_REFRESH_SECONDS)
+    return _shared_index
+
+
+def refresh_shared_intent_index() -> None:
+    """Publish intent changes committed by this process now rather than at the next refresh poll."""
+    if _shared_index is None:
+        return
+    try:
+        _shared_index.refresh()
+    except Exception as e:
+        # The write is committed; other workers still pick it up on their next poll.
+        print("Failed to refresh shared intent index:", e)
@@ -0,0 +1,206 @@
+import re
+import threading
+import time
+from functools import lru_cache
+
+from flask import has_app_context
+from sqlalchemy import delete, insert
+
+from backend.extensions import db
+from backend.models import SubjectAlias
+from backend.nlp.text_normalizer import edit_distance, symmetric_deletes
+from backend.services.table_version_service import table_versions
+
+# Subject aliases normalized to a canonical output name; used until admins store their own.
+DEFAULT_SUBJECT_ALIASES = {
+    "MATH": "Maths",
+    "MATHS": "Maths",
+    "MATHEMATICS": "Maths",
+    "PHYSICS": "Physics",
+    "CHEMISTRY": "Chemistry",
+    "BIOLOGY": "Biology",
+    "ENGLISH": "English",
+    "COMPUTER": "Computer",
+    "COMPUTER SCIENCE": "Computer",
+    "INFORMATICS": "Computer",
+    "ACCOUNTANCY": "Accountancy",
+    "ECONOMICS": "Economics",
+    "BUSINESS STUDIES": "Business Studies",
+    "HISTORY": "History",
+    "GEOGRAPHY": "Geography",
+    "POLITICAL SCIENCE": "Political Science",
+}
+
+# Characters OCR commonly reads in place of letters inside subject names.
+OCR_CONFUSIONS = str.maketrans({"1": "I", "0": "O", "5": "S", "8": "B", "|": "I", "$": "S", "@": "A"})
+_END = "$"  # trie key marking the end of an alias; never a normalized character
+
+
+def normalize_alias(text: str) -> str:
+    """Upper-case, fold OCR confusions and keep only letters and single spaces."""
+    key = (text or "").upper().replace("&", " AND ").translate(OCR_CONFUSIONS)
+    return re.sub(r"\s+", " ", re.sub(r"[^A-Z]", " ", key)).strip()
+
+
+class SubjectAliasMatcher:
+    """Alias lookup built once per alias set.
+
+    `match` tries, in order: the normalized string itself, the longest alias
+    contained in it (walking a character trie from each position), then the
+    closest alias within a small edit distance, whole string first and then
+    1-3 word windows. Edit-distance candidates come from a symmetric-delete
+    index (every alias with up to MAX_EDITS characters removed), so each step
+    costs the same whether there are ten aliases or thousands. Results are
+    memoized per raw label.
+    """
+
+    MAX_WINDOW_WORDS = 3
+    MAX_EDITS = 2
+
+    def __init__(self, aliases: dict[str, str]):
+        self.exact: dict[str, str] = {}
+        self.root: dict = {}
+        self.deletes: dict[str, set[str]] = {}
+        for alias, canonical in aliases.items():
+            key = normalize_alias(alias)
+            if not key or not str(canonical).strip():
+                continue
+            self.exact[key] = str(canonical).strip()
+            node = self.root
+            for char in key:
+                node = node.setdefault(char, {})
+            node[_END] = self.exact[key]
+            for variant in symmetric_deletes(key, self.MAX_EDITS):
+                self.deletes.setdefault(variant, set()).add(key)
+        self.match = lru_cache(maxsize=4096)(self._match)
+
+    def __len__(self) -> int:
+        return len(self.exact)
+
+    @staticmethod
+    def max_distance(length: int) -> int:
+        if length <= 4:
+            return 0
+        return 1 if length <= 8 else 2
+
+    def _match(self, raw_subject: str) -> str | None:
+        key = normalize_alias(raw_subject)
+        if not key:
+            return None
+        if key in self.exact:
+            return self.exact[key]
+
+        contained = self._longest_contained(key)
+        if contained is not None:
+            return contained
+
+        best = self._closest(key)
+        words = key.split()
+        for size in range(min(self.MAX_WINDOW_WORDS, len(words) - 1), 0, -1):
+            for start in range(len(words) - size + 1):
+                candidate = self._closest(" ".join(words[start:start + size]))
+                if candidate and (best is None or candidate[:2] < best[:2]):
+                    best = candidate
+        return best[2] if best else None
+
+    def _longest_contained(self, key: str) -> str | None:
+        best_length, best = 0, None
+        for start in range(len(key)):
+            node = self.root
+            for offset in range(start, len(key)):
+                node = node.get(key[offset])
+                if node is None:
+                    break
+                length = offset - start + 1
+                if _END in node and length > best_length:
+                    best_length, best = length, node[_END]
+        return best
+
+    def _closest(self, word: str) -> tuple[int, int, str] | None:
+        """(distance, -alias length, canonical) of the nearest alias, or None."""
+        limit = self.max_distance(len(word))
+        if limit == 0:
+            return None
+        best = None
+        seen = set()
+        for variant in symmetric_deletes(word, limit):
+            for key in self.deletes.get(variant, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                distance = edit_distance(word, key, limit)
+                if distance <= limit:
+                    candidate = (distance, -len(key), self.exact[key])
+                    if best is None or candidate < best:
+                        best = candidate
+        return best
+
+
+class SubjectAliasService:
+    """Admin-editable subject aliases with a cached matcher.
+
+    The matcher is rebuilt only when the `subject_aliases` table version
+    changes (checked at most every REFRESH_SECONDS per process). An empty
+    table means the built-in defaults.
+    """
+
+    REFRESH_SECONDS = 1.0
+
+    def __init__(self):
+        self._default_matcher = SubjectAliasMatcher(DEFAULT_SUBJECT_ALIASES)
+        self._matcher = self._default_matcher
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_aliases(self) -> dict[str, str]:
+        rows = db.session.query(SubjectAlias.alias, SubjectAlias.subject).order_by(SubjectAlias.alias.asc()).all()
+        if not rows:
+            return dict(DEFAULT_SUBJECT_ALIASES)
+        return {row.alias: row.subject for row in rows}
+
+    def list_aliases(self) -> list[dict]:
+        return [{"alias": alias, "subject": subject} for alias, subject in self.get_aliases().items()]
+
+    def replace_aliases(self, aliases: list[dict]) -> int:
+        """Replace the whole alias table; returns the number of aliases stored."""
+        rows = {}
+        for item in aliases:
+            alias = normalize_alias(item["alias"])
+            if alias:
+                rows[alias] = item["subject"].strip()
+        db.session.execute(delete(SubjectAlias))
+        if rows:
+            db.session.execute(
+                insert(SubjectAlias), [{"alias": alias, "subject": subject} for alias, subject in rows.items()]
+            )
+        table_versions.bump("subject_aliases")
+        db.session.commit()
+        self._checked_at = 0.0
+        return len(rows)
+
+    def matcher(self) -> SubjectAliasMatcher:
+        if not has_app_context():
+            return self._default_matcher
+        now = time.monotonic()
+        if now - self._checked_at < self.REFRESH_SECONDS:
+            return self._matcher
+        with self._lock:
+            if now - self._checked_at < self.REFRESH_SECONDS:
+                return self._matcher
+            try:
+                version = table_versions.get("subject_aliases")
+                if version != self._version:
+                    self._matcher = SubjectAliasMatcher(self.get_aliases())
+                    self._version = version
+            except Exception as e:
+                db.session.rollback()
+                print("Subject aliases unavailable, using the current set:", e)
+            self._checked_at = now
+        return self._matcher
+
+    def match(self, raw_subject: str) -> str | None:
+        return self.matcher().match(raw_subject)
+
+
+subject_aliases = SubjectAliasService()
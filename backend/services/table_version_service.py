@@ -0,0 +1,83 @@
+import threading
+from datetime import datetime
+
+from sqlalchemy import Integer, String, cast, exists, insert, literal, select, update
+
+from backend.extensions import db
+from backend.models import AppSetting
+
+
+class PayloadCache:
+    """Serialized response bodies per table, valid for one table version."""
+
+    def __init__(self):
+        self._entries: dict[str, tuple[int, str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table: str, version: int) -> str | None:
+        entry = self._entries.get(table)
+        if entry and entry[0] == version:
+            return entry[1]
+        return None
+
+    def put(self, table: str, version: int, body: str) -> None:
+        with self._lock:
+            current = self._entries.get(table)
+            if current is None or current[0] <= version:
+                self._entries[table] = (version, body)
+
+    def invalidate(self, table: str) -> None:
+        with self._lock:
+            self._entries.pop(table, None)
+
+
+class TableVersionService:
+    """Per-table change counters stored in app_settings as `version:<table>`.
+
+    Write paths call `bump` inside their own transaction, so the counter
+    moves exactly when the change commits and every worker sees it. Readers
+    use the counter as an ETag and as the key of the in-process payload
+    cache; a missing row reads as version 0.
+    """
+
+    KEY_PREFIX = "version:"
+
+    def __init__(self, cache: PayloadCache):
+        self.cache = cache
+
+    def _key(self, table: str) -> str:
+        return f"{self.KEY_PREFIX}{table}"
+
+    def get(self, table: str) -> int:
+        value = db.session.execute(
+            select(AppSetting.value).where(AppSetting.key == self._key(table))
+        ).scalar()
+        try:
+            return int(value or 0)
+        except ValueError:
+            return 0
+
+    def bump(self, table: str) -> None:
+        """Stage an increment; the caller commits (or rolls back) it with its change."""
+        key = self._key(table)
+        now = datetime.utcnow()
+        # Create the row on first use; INSERT ... SELECT keeps it one statement.
+        db.session.execute(
+            insert(AppSetting).from_select(
+                ["key", "value", "updated_at"],
+                select(literal(key), literal("0"), literal(now)).where(
+                    ~exists().where(AppSetting.key == key)
+                ),
+            )
+        )
+        db.session.execute(
+            update(AppSetting)
+            .where(AppSetting.key == key)
+            .values(value=cast(cast(AppSetting.value, Integer) + 1, String), updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        self.cache.invalidate(table)
+
+
+payload_cache = PayloadCache()
+table_versions = TableVersionService(payload_cache)
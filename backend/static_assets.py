@@ -0,0 +1,73 @@
+import mimetypes
+import os
+import re
+
+from flask import Flask, request, send_from_directory
+from werkzeug.security import safe_join
+
+from backend.config import Config
+
+MANIFEST_NAME = "manifest.json"
+# name.<hash8>.ext or a WebP thumbnail name.<hash8>.w640.webp, as written by scripts/build_assets.py
+FINGERPRINT_PATTERN = re.compile(r"\.[0-9a-f]{8}(\.w\d+)?\.[A-Za-z0-9]+$")
+COMPRESSIBLE_SUFFIXES = {".html", ".css", ".js", ".json", ".svg", ".txt"}
+# Preferred first: brotli is smaller when the build had it available.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def _precompressed_variant(root: str, filename: str) -> tuple[str, str] | tuple[None, None]:
+    if os.path.splitext(filename)[1].lower() not in COMPRESSIBLE_SUFFIXES:
+        return None, None
+    for encoding, suffix in ENCODINGS:
+        if not request.accept_encodings[encoding]:
+            continue
+        path = safe_join(root, filename + suffix)
+        if path and os.path.isfile(path):
+            return encoding, filename + suffix
+    return None, None
+
+
+def send_static_asset(root: str, filename: str):
+    """send_from_directory plus precompressed variants and cache headers.
+
+    Fingerprinted files never change under the same name, so they are cached
+    for a year; everything else (HTML, unbuilt sources) must be revalidated,
+    which the ETag/Last-Modified from send_from_directory turns into a 304.
+    """
+    encoding, variant = _precompressed_variant(root, filename)
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response = send_from_directory(root, variant or filename, mimetype=mimetype)
+
+    if os.path.splitext(filename)[1].lower() in COMPRESSIBLE_SUFFIXES:
+        response.vary.add("Accept-Encoding")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if FINGERPRINT_PATTERN.search(filename):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.max_age = None
+        response.cache_control.no_cache = True
+    return response
+
+
+def init_static_assets(app: Flask) -> str:
+    """Serve frontend/dist when it has been built, otherwise frontend/ as-is.
+
+    Returns the directory static files are served from.
+    """
+    root = app.static_folder
+    build_dir = os.path.abspath(Config.STATIC_BUILD_DIR)
+    if Config.STATIC_USE_BUILD:
+        if os.path.isfile(os.path.join(build_dir, MANIFEST_NAME)):
+            root = build_dir
+        else:
+            print("Static build not found, serving frontend/ sources. Run backend/scripts/build_assets.py")
+
+    app.static_folder = root
+    app.config["USE_X_SENDFILE"] = Config.STATIC_X_SENDFILE
+    app.view_functions["static"] = lambda filename: send_static_asset(root, filename)
+    return root
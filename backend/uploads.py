@@ -0,0 +1,16 @@
+import tempfile
+
+from flask import Request
+
+from backend.config import Config
+
+
+class SpooledUploadRequest(Request):
+    """Buffer each uploaded file in memory up to UPLOAD_SPOOL_BYTES, then on disk.
+
+    Werkzeug's default decides per request from the total Content-Length;
+    spooling per file keeps small uploads in memory and caps the rest.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=Config.UPLOAD_SPOOL_BYTES, mode="rb+")
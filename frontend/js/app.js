@@ -9,6 +9,7 @@ const resultImageInput = document.getElementById('result-image-input');
 const typingIndicator = document.getElementById('typing-indicator');
 const BOT_AVATAR_PATH = 'IMG/gemsbotblue.png'; // Change path if you use another bot logo
 const typingAvatar = typingIndicator?.querySelector('.bot-reply-avatar');
+const SESSION_STORAGE_KEY = 'gems-chat-session-id';
 
 function showTypingIndicator() {
   if (!typingIndicator) return;
@@ -51,6 +52,18 @@ function appendMessage(message, sender) {
 
   chatHistory.appendChild(messageDiv);
   chatHistory.scrollTop = chatHistory.scrollHeight;
+  return messageBubble;
+}
+
+function parseSseEvent(block) {
+  let event = 'message';
+  const dataLines = [];
+  block.split('\n').forEach((line) => {
+    if (line.startsWith('event:')) event = line.slice(6).trim();
+    else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+  });
+  if (!dataLines.length) return null;
+  return { event, data: JSON.parse(dataLines.join('\n')) };
 }
 
 chatForm.addEventListener('submit', async (e) => {
@@ -65,27 +78,63 @@ chatForm.addEventListener('submit', async (e) => {
 
   try {
     // if you later change API path, update here
-    const response = await fetch('https://gems-chatbot-docker.onrender.com/chat', {
+    const response = await fetch('https://gems-chatbot-docker.onrender.com/chat/stream', {
 
 
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ message: userMessage }),
+      body: JSON.stringify({
+        message: userMessage,
+        session_id: sessionStorage.getItem(SESSION_STORAGE_KEY) || undefined,
+      }),
     });
 
-    hideTypingIndicator();
-
-    if (!response.ok) {
+    if (!response.ok || !response.body) {
+      hideTypingIndicator();
       appendMessage(`Error: Server returned ${response.status}`, 'gemini');
       return;
     }
 
-    const data = await response.json();
-    if (data.response) {
-      appendMessage(data.response, 'gemini');
-    } else if (data.error) {
-      appendMessage(`⚠️ ${data.error}`, 'gemini');
-    } else {
+    // Render the reply as server-sent `message` deltas arrive.
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let botBubble = null;
+    let finished = false;
+
+    while (!finished) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const parsed = parseSseEvent(buffer.slice(0, boundary));
+        buffer = buffer.slice(boundary + 2);
+        if (!parsed) continue;
+
+        if (parsed.event === 'session' && parsed.data.session_id) {
+          // Lets the server treat follow-up questions in this tab as one conversation.
+          sessionStorage.setItem(SESSION_STORAGE_KEY, parsed.data.session_id);
+        } else if (parsed.event === 'message') {
+          if (!botBubble) {
+            hideTypingIndicator();
+            botBubble = appendMessage('', 'gemini');
+          }
+          botBubble.textContent += parsed.data.delta;
+          chatHistory.scrollTop = chatHistory.scrollHeight;
+        } else if (parsed.event === 'error') {
+          hideTypingIndicator();
+          appendMessage(`⚠️ ${parsed.data.error}`, 'gemini');
+          finished = true;
+        } else if (parsed.event === 'done') {
+          finished = true;
+        }
+      }
+    }
+
+    hideTypingIndicator();
+    if (!botBubble && !finished) {
       appendMessage('⚠️ Unexpected response from server.', 'gemini');
     }
   } catch (err) {
@@ -1,19 +1,24 @@
 # ml/train.py
 import os
+import sys
 import json
 import random
 import argparse
 
-import nltk
 import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
 from torch.utils.data import DataLoader, TensorDataset
 
-# Ensure you have downloaded NLTK data once:
-# nltk.download('punkt')
-# nltk.download('wordnet')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import Config  # noqa: E402
+from backend.nlp.text_normalizer import TextNormalizer  # noqa: E402
+
+# Patterns are tokenized with the chat engines' TextNormalizer so the features
+# match what ChatbotML sees at runtime. With --stemmer wordnet, download the
+# NLTK data once: nltk.download('wordnet')
 
 class ChatbotModel(nn.Module):
     def __init__(self, input_size, output_size):
@@ -33,21 +38,17 @@ class ChatbotModel(nn.Module):
         return x
 
 class Trainer:
-    def __init__(self, intents_path):
+    def __init__(self, intents_path, normalizer=None):
         self.intents_path = intents_path
+        # Spelling correction only applies to messages, never to training patterns
+        self.normalizer = normalizer or TextNormalizer(spelling=False)
         self.documents = []
         self.vocabulary = []
         self.intents = []
         self.intents_responses = {}
 
-    @staticmethod
-    def tokenize_and_lemmatize(text):
-        from nltk.stem import WordNetLemmatizer
-        from nltk.tokenize import word_tokenize
-        lemmatizer = WordNetLemmatizer()
-        words = word_tokenize(text)
-        words = [lemmatizer.lemmatize(word.lower()) for word in words]
-        return words
+    def tokenize_and_lemmatize(self, text):
+        return self.normalizer.terms(text)
 
     def parse_intents(self):
         with open(self.intents_path, 'r', encoding='utf-8') as f:
@@ -108,9 +109,11 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--intents", default="../backend/nlp/intents.json")
     parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--stemmer", default=Config.CHAT_STEMMER, choices=("none", "suffix", "wordnet"),
+                        help="must match CHAT_STEMMER at runtime")
     args = parser.parse_args()
 
-    trainer = Trainer(args.intents)
+    trainer = Trainer(args.intents, TextNormalizer(args.stemmer, spelling=False))
     trainer.parse_intents()
     trainer.prepare_data()
     trainer.train(epochs=args.epochs, model_out="./ml/model/chatbot_model.pth", dims_out="./ml/model/dimensions.json")
@@ -1,19 +1,60 @@
 import os
 import sys
 
+import click
+
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from backend import create_app
 from backend.config import Config
 from backend.seed import seed_database
+from backend.services import intent_bulk_service
 
 app = create_app()
 
 
 @app.cli.command("seed-admin")
 def seed_admin_command():
-    seed_database()
-    print("Seed completed: admin@example.com / Admin@12345")
+    seed_database(
+        admin_email=Config.DEFAULT_ADMIN_EMAIL,
+        admin_password=Config.DEFAULT_ADMIN_PASSWORD,
+        intents_json_path=Config.INTENTS_PATH,
+        force=True,
+    )
+    print(f"Seed completed: {Config.DEFAULT_ADMIN_EMAIL} / {Config.DEFAULT_ADMIN_PASSWORD}")
+
+
+@app.cli.command("import-intents")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(intent_bulk_service.SUPPORTED_FORMATS), default=None)
+@click.option("--no-update", is_flag=True, help="Skip tags that already exist instead of overwriting them.")
+@click.option("--batch-size", default=500, show_default=True)
+def import_intents_command(path, fmt, no_update, batch_size):
+    fmt = fmt or intent_bulk_service.detect_format(path)
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        records = intent_bulk_service.parse_records(raw, fmt)
+    except intent_bulk_service.BulkImportError as exc:
+        raise click.ClickException(str(exc)) from exc
+    report = intent_bulk_service.import_intents(records, update_existing=not no_update, batch_size=batch_size)
+    print(f"Import completed: {report['added']} added, {report['updated']} updated, {report['skipped']} skipped")
+    for error in report["errors"]:
+        print(f"  record {error['index']}: {error['error']}")
+
+
+@app.cli.command("export-intents")
+@click.argument("path", type=click.Path(dir_okay=False, writable=True), required=False)
+@click.option("--format", "fmt", type=click.Choice(intent_bulk_service.SUPPORTED_FORMATS), default=None)
+def export_intents_command(path, fmt):
+    fmt = fmt or intent_bulk_service.detect_format(path)
+    out = open(path, "w", encoding="utf-8", newline="") if path else sys.stdout
+    try:
+        for chunk in intent_bulk_service.iter_export(fmt):
+            out.write(chunk)
+    finally:
+        if path:
+            out.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+import pytest
+
+from backend.nlp.intent_index import pick_overlap
+from backend.services.chat_service import ChatService
+
+
+@pytest.fixture
+def chat():
+    service = ChatService()
+    service.semantic_engine = None
+    service.ml_engine = None
+    return service
+
+
+@pytest.mark.parametrize("opener", ["hello", "hostel facilities?"])
+def test_new_topic_after_opener_is_not_pulled_to_session_intent(chat, opener):
+    alone = chat.resolve("what are the fees")
+    chat.resolve(opener, "session-" + opener)
+    followup = chat.resolve("what are the fees", "session-" + opener)
+    assert (followup["tag"], followup["tier"], followup["score"]) == (alone["tag"], alone["tier"], alone["score"])
+
+
+def test_boost_breaks_ties_only_between_confident_intents():
+    scores = [("admissions", 0.4), ("fees", 0.35), ("greeting", 0.2)]
+    assert pick_overlap(scores, {"fees": 0.15}, boost_floor=0.25) == ("fees", 0.35)
+    assert pick_overlap(scores, {"greeting": 0.3}, boost_floor=0.25) == ("admissions", 0.4)
@@ -0,0 +1,20 @@
+import io
+
+import pytest
+from PIL import Image
+
+from backend.services.result_analysis_service import ResultAnalysisService
+
+
+def _png(mode: str, size: tuple[int, int]) -> io.BytesIO:
+    buffer = io.BytesIO()
+    Image.new(mode, size).save(buffer, "PNG")
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.mark.parametrize("mode", ["P", "1", "I;16", "L", "RGB", "RGBA"])
+def test_large_png_is_reduced_in_any_mode(mode):
+    image = ResultAnalysisService().load_image(_png(mode, (5000, 3000)), target_pixels=9_000_000)
+    assert image.width * image.height <= 9_000_000
+    assert image.size == (2500, 1500)
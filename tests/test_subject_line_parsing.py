@@ -0,0 +1,19 @@
+import pytest
+
+from backend.services.result_analysis_service import ResultAnalysisService
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("Maths 92", {"Maths": 92}),
+        ("Physics - 85/100", {"Physics": 85}),
+        ("English: 90", {"English": 90}),
+        ("PHYS1CS 85", {"Physics": 85}),
+        ("Maths92", {"Maths": 92}),
+        ("Chemistry92/100", {"Chemistry": 92}),
+    ],
+)
+def test_subject_line_marks(line, expected):
+    service = ResultAnalysisService()
+    assert service._extract_subject_marks(service._clean_text(line)) == expected